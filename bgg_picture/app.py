@@ -7,8 +7,13 @@ import os
 import botocore
 import json
 
+# Manifest of the stored images ({"bgg_ids": [...]}) that manage_events checks instead of a HEAD per image
+GAME_IMAGES_KEY = 'game_images.json'
+
 def lambda_handler(event, context):
     s3 = boto3.client("s3", region_name="us-east-1")
+    manifests = {}
+    stamped_dates = set()
     for record in event['Records']:
         if 'Sns' not in record: 
             print(json.dumps(event))
@@ -19,8 +24,16 @@ def lambda_handler(event, context):
         bgg_id = record['Sns']['MessageAttributes']['bgg_id']['Value']
         bucket = record['Sns']['MessageAttributes']['s3_bucket']['Value']
 
+        if bucket not in manifests:
+            manifests[bucket] = get_game_images(s3, bucket)
+        if int(bgg_id) in manifests[bucket][0]:
+          print(f"{bgg_id}.png already exists (manifest)")
+          stamped_dates.update(stamp_image_ready(bgg_id))
+          continue
         if key_exists(s3, bucket, f'{bgg_id}.png'):
           print(f"{bgg_id}.png already exists")
+          manifests[bucket] = add_game_image(s3, bucket, bgg_id)
+          stamped_dates.update(stamp_image_ready(bgg_id))
           continue
         retrieve_bgg_image(bgg_id)
 
@@ -50,6 +63,98 @@ def lambda_handler(event, context):
           bucket,
           f"{bgg_id}.png",
         )
+        manifests[bucket] = add_game_image(s3, bucket, bgg_id)
+        stamped_dates.update(stamp_image_ready(bgg_id))
+    publish_events(stamped_dates)
+
+# The public events feed carries image_ready: have manage_events republish the months of the stamped events
+def publish_events(dates):
+    function_name = os.environ.get('manage_events_fn')
+    if not function_name or not dates:
+        return
+    boto3.client('lambda', region_name='us-east-1').invoke(
+        FunctionName=function_name,
+        InvocationType='Event',
+        Payload=json.dumps({'action': 'publishEvents', 'changed_dates': sorted(dates)}),
+    )
+    print(f"Requested events publish for {len(dates)} date(s)")
+
+# (bgg_ids, etag) of the manifest; etag None when it doesn't exist yet
+def get_game_images(s3, bucket):
+    try:
+        response = s3.get_object(Bucket=bucket, Key=GAME_IMAGES_KEY)
+    except botocore.exceptions.ClientError as e:
+        if e.response["Error"]["Code"] in ["NoSuchKey", "404"]:
+            return set(), None
+        raise
+    return set(json.loads(response['Body'].read())['bgg_ids']), response['ETag']
+
+# Add an id to the manifest with a conditional PUT (If-Match the version read, or If-None-Match when creating),
+# re-reading and retrying when another invocation updated it in between
+def add_game_image(s3, bucket, bgg_id, attempts=10):
+    for attempt in range(attempts):
+        bgg_ids, etag = get_game_images(s3, bucket)
+        if int(bgg_id) in bgg_ids:
+            return bgg_ids, etag
+        bgg_ids.add(int(bgg_id))
+        condition = {'IfMatch': etag} if etag else {'IfNoneMatch': '*'}
+        try:
+            response = s3.put_object(
+                Bucket=bucket,
+                Key=GAME_IMAGES_KEY,
+                Body=json.dumps({'bgg_ids': sorted(bgg_ids)}, separators=(',', ':')).encode('utf-8'),
+                ContentType='application/json',
+                **condition,
+            )
+            return bgg_ids, response['ETag']
+        except botocore.exceptions.ClientError as e:
+            if e.response["Error"]["Code"] not in ["PreconditionFailed", "ConditionalRequestConflict", "412", "409"]:
+                raise
+            print(f"{GAME_IMAGES_KEY} changed concurrently; retrying ({attempt + 1})")
+    raise Exception(f"Could not add {bgg_id} to {GAME_IMAGES_KEY} after {attempts} attempts")
+
+# Signal the events of this game that their image is in place (manage_events writes them with 
+# image_ready false and doesn't wait for the image). Returns the dates of the stamped events
+def stamp_image_ready(bgg_id):
+    table_name = os.environ.get('table_name')
+    if not table_name:
+        return set()
+    ddb = boto3.client('dynamodb', region_name='us-east-1')
+    query_args = {
+        'TableName': table_name,
+        'IndexName': 'BggIdByDate',
+        'KeyConditionExpression': 'bgg_id = :bgg_id',
+        'FilterExpression': 'image_ready = :false',
+        'ProjectionExpression': 'event_id, #date',
+        'ExpressionAttributeNames': {'#date': 'date'},
+        'ExpressionAttributeValues': {':bgg_id': {'N': str(bgg_id)}, ':false': {'BOOL': False}},
+    }
+    # BggIdByDate is created at events index stage 4 (see template EventIndexStage); scan until then
+    bgg_index_ready = int(os.environ.get('event_index_stage', '0')) >= 4
+    if not bgg_index_ready:
+        del query_args['IndexName']
+        query_args['FilterExpression'] = 'bgg_id = :bgg_id AND image_ready = :false'
+        del query_args['KeyConditionExpression']
+    stamped = set()
+    while True:
+        response = ddb.query(**query_args) if bgg_index_ready else ddb.scan(**query_args)
+        for item in response['Items']:
+            try:
+                ddb.update_item(
+                    TableName=table_name,
+                    Key={'event_id': item['event_id']},
+                    UpdateExpression='SET image_ready = :true',
+                    ConditionExpression='attribute_exists(event_id)',
+                    ExpressionAttributeValues={':true': {'BOOL': True}},
+                )
+                stamped.add(item['date']['S'])
+            except ddb.exceptions.ConditionalCheckFailedException:
+                pass
+        if 'LastEvaluatedKey' not in response:
+            break
+        query_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    print(f"image_ready set on {len(stamped)} event date(s) of {bgg_id}")
+    return stamped
 
 def key_exists(s3, bucket, key):
     try:
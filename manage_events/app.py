@@ -2,6 +2,8 @@ import json
 import boto3
 from boto3.dynamodb.conditions import Key
 from boto3.dynamodb.conditions import Attr
+from boto3.dynamodb.conditions import ConditionExpressionBuilder
+from boto3.dynamodb.types import TypeSerializer
 from dateutil.relativedelta import relativedelta, SU
 from datetime import datetime, timedelta, timezone 
 from zoneinfo import ZoneInfo
@@ -10,7 +12,12 @@ import botocore
 import time
 import os
 import csv
+import re
+import base64
+import binascii
 from copy import deepcopy
+from decimal import Decimal
+from collections.abc import MutableMapping
 class env:
   TABLE_NAME_PROD = os.environ['table_name_prod']
   TABLE_NAME = os.environ['table_name'] # 'game_events'
@@ -33,8 +40,17 @@ class env:
   COGNITO_POOL_ID = os.environ['user_pool_id']
   COGNITO_POOL_ID_PROD = os.environ['user_pool_id_prod']
   COGNITO_CLOUDWATCH_ROLE = os.environ['cognito_cloudwatch_role']
+  ATTENDANCE_TABLE_NAME = os.environ['attendance_table']
+  LOCKS_TABLE_NAME = os.environ['locks_table']
+  # Rollout stage of the events table indexes (template EventIndexStage, see EVENT_INDEX_STAGES)
+  EVENT_INDEX_STAGE = int(os.environ.get('event_index_stage', '0'))
+  # Keep publishing the single legacy events.json alongside the monthly shards until all clients read the 
+  # manifest. It's assembled from the published shards, so only the changed months are queried either way
+  PUBLIC_EVENTS_LEGACY = os.environ.get('public_events_legacy', 'true').lower() == 'true'
+  # Seconds the public events publish after a write may be deferred and coalesced (0: publish inline).
+  # Player pools are always updated inline, since rsvpCondition reads them
+  PUBLISH_DELAY = int(os.environ.get('publish_delay', '0'))
 
-pull_bgg_pic = False
 
 class CsvTextBuilder(object):
   def __init__(self):
@@ -53,7 +69,6 @@ class CsvTextBuilder(object):
 
 
 def lambda_handler(apiEvent, context):
-  global pull_bgg_pic
   
   origin = '*'
   # if apiEvent and 'headers' in apiEvent and apiEvent['headers'] and 'Origin' in apiEvent['headers'] and apiEvent['headers']['Origin']:
@@ -89,18 +104,25 @@ def lambda_handler(apiEvent, context):
       case 'ProcessAllReservedSchedules':
         print('Process Refresh schedules for all upcoming Reserved Events')
         print(json.dumps(apiEvent, default=ddb_default))
-        upcomingEvents = getEvents(dateGte=datetime.now(ZoneInfo("America/Denver")).isoformat()[:19])
+        # Not the sparse ReservedByDate index: open_rsvp_eligibility Reserved events have refresh schedules too
+        upcomingEvents = [event for event in getEvents(dateGte=datetime.now(timezone.utc), fields=['format']) if hasRefreshSchedules(event)]
         print(json.dumps({"upcomingEvents": [{'event_id': event['event_id'], 'format': event['format'], 'date': event['date']}  for event in upcomingEvents]}, default=ddb_default))
-        for event in upcomingEvents:
-          if event['format'] == 'Reserved':
-            process_reserved_event_scheduled_tasks(reserved_event=event, action='create', target_arn=context.invoked_function_arn)
+        result = reconcileReservedSchedules(upcomingEvents, target_arn=context.invoked_function_arn)
+        return {'statusCode': 200, 'body': json.dumps(result)}
+
+      case 'publishEvents':
+        print('apiEvent.action: Publish public events.json')
+        print(json.dumps(apiEvent, default=ddb_default))
+        # changed_dates (e.g. from bgg_picture's image_ready stamps): only those months; otherwise all
+        updatePublicEventsJson(changed_dates=set(apiEvent['changed_dates']) if apiEvent.get('changed_dates') else None)
         return {'statusCode': 200, 'body': 'OK'}
 
       case 'updatePlayerPools':
         time.sleep(1)
         print('apiEvent.action: Update Player Pools')
         print(json.dumps(apiEvent, default=ddb_default))
-        updatePlayerPools()
+        # Scheduled rebalance (e.g. pools opening on the Sunday prior): apply all-or-nothing
+        updatePlayerPools(transactional=True)
         print('Publish public events.json')
         updatePublicEventsJson()
         return {'statusCode': 200, 'body': 'OK'}
@@ -111,6 +133,22 @@ def lambda_handler(apiEvent, context):
         init_bootstrap()
         return {'statusCode': 200, 'body': 'OK'}
 
+      case 'migrateEvents':
+        print('apiEvent.action: migrateEvents')
+        print(json.dumps(apiEvent, default=ddb_default))
+        return {
+          'statusCode': 200, 
+          'body': json.dumps(migrateEvents(), default=ddb_default)
+        }
+
+      case 'rebuildGameImages':
+        print('apiEvent.action: rebuildGameImages')
+        print(json.dumps(apiEvent, default=ddb_default))
+        return {
+          'statusCode': 200, 
+          'body': json.dumps(rebuildGameImages())
+        }
+
       case 'refactorGameTutorials':
         print('apiEvent.action: refactorGameTutorials')
         print(json.dumps(apiEvent, default=ddb_default))
@@ -191,22 +229,15 @@ def lambda_handler(apiEvent, context):
             'action': 'create',
           }, default=ddb_default))
           
-          print('Update Player Pools')
-          updatePlayerPools()
-          print('Event Created; Publish public events.json')
-          updatePublicEventsJson()
-          print(f'pull_bgg_pic = {pull_bgg_pic}')
-          try:
-            if pull_bgg_pic: waitForBggPic(data['bgg_id'])
-          except Exception as e:
-              print(e)
-          if data['format'] == 'Reserved':
-            data['event_id'] = response['event_id']
-            process_reserved_event_scheduled_tasks(reserved_event=data, action='create', target_arn=context.invoked_function_arn)
+          data['event_id'] = response['event_id']
+          runSideEffects({
+            'pools_and_feed': lambda: refreshPoolsAndFeed(context.invoked_function_arn, changed_event_ids={response['event_id']}, changed_users=poolDeltaUsers(data), changed_dates={data['date']}),
+            'reserved_schedules': (lambda: process_reserved_event_scheduled_tasks(reserved_event=data, action='create', target_arn=context.invoked_function_arn)) if hasRefreshSchedules(data) else None,
+          }, context=context)
           return {
             'statusCode': 201,
             'headers': {'Access-Control-Allow-Origin': origin},
-            'body': json.dumps({'result': 'Event Created'})
+            'body': json.dumps({'result': 'Event Created', 'event_id': response['event_id'], **eventImage(response['event'])})
           }
         
         # Modify Event
@@ -214,7 +245,7 @@ def lambda_handler(apiEvent, context):
           if not authorize(apiEvent, auth_groups, ['admin'], log_if_false=False): 
             print('Check for Event Host')
             data = json.loads(apiEvent['body'])
-            event = getEvent(data['event_id'])
+            event = getEvent(data['event_id'], resolve_pools=True)
             if event['host'] != auth_sub:
               print(f"WARNING: user_id '{event['host']}' is not an admin or the event host. not authorized")
               return unauthorized
@@ -230,9 +261,9 @@ def lambda_handler(apiEvent, context):
                 'headers': {'Access-Control-Allow-Origin': origin}
               }
             if 'bgg_id' in event_updates and event_updates['bgg_id'] > 0 :
-              process_bgg_id(event_updates['bgg_id'])
+              event_updates['image_ready'] = bggPicReady(event_updates['bgg_id'])
             try:
-              updateEvent(data['event_id'], event_updates)
+              updateEvent(data['event_id'], event_updates, current=event)
             except Exception as e:
               print(json.dumps({'ERROR': str(e), 'event_id': data['event_id'], 'event_updates': event_updates}))
               print(e)
@@ -241,6 +272,8 @@ def lambda_handler(apiEvent, context):
                 'headers': {'Access-Control-Allow-Origin': origin},
                 'body': json.dumps({'message': 'Internal Server Error'})
               }
+            if event_updates.get('image_ready') is False:
+              requestBggPic(event_updates['bgg_id'])
             original = {k: event[k] for k in event_updates if k in event}
             print(json.dumps({
               'log_type': 'event',
@@ -254,6 +287,7 @@ def lambda_handler(apiEvent, context):
             }, default=ddb_default))
             all_rsvp = set()
             no_change = set()
+            rsvp_outbox = RsvpOutbox(context.aws_request_id)
             for rsvp in ['attending', 'not_attending']:
               if rsvp in original:
                 all_rsvp = all_rsvp.union(original[rsvp])
@@ -280,9 +314,7 @@ def lambda_handler(apiEvent, context):
                     changes[player] = {'rsvp': 'attending', 'action': 'add'}
                 elif 'not_attending' in event_updates and player in event_updates['not_attending']:
                     changes[player] = {'rsvp': 'not_attending', 'action': 'add'}
-              for i, (player, rsvp) in enumerate(changes.items()):
-                if i == 0:
-                  process_rsvp_alert_task()   
+              for player, rsvp in changes.items():
                 rsvp_dict = {
                   'log_type': 'rsvp',
                   'auth_sub': auth_sub,
@@ -294,26 +326,22 @@ def lambda_handler(apiEvent, context):
                   'rsvp': rsvp['rsvp'],
                 }
                 print(json.dumps(rsvp_dict))
-                send_rsvp_sqs(rsvp_dict)
+                rsvp_outbox.add(rsvp_dict)
           
-            print('Update Player Pools')
-            updatePlayerPools()
-            print('Event Modified; Publish public events.json')
-            updatePublicEventsJson()
-            print(f'pull_bgg_pic = {pull_bgg_pic}')
-            try:
-              if pull_bgg_pic: waitForBggPic(data['bgg_id'])
-            except Exception as e:
-                print(e)
+            runSideEffects({
+              'rsvp_sqs': rsvp_outbox.flush if rsvp_outbox else None,
+              'rsvp_alert_task': process_rsvp_alert_task if rsvp_outbox else None,
+              'pools_and_feed': lambda: refreshPoolsAndFeed(context.invoked_function_arn, changed_event_ids={data['event_id']}, changed_users=poolDeltaUsers(event, {**event, **event_updates}), changed_dates={event['date'], event_updates.get('date', event['date'])}),
+            }, context=context)
             return {
               'statusCode': 201,
               'headers': {'Access-Control-Allow-Origin': origin},
-              'body': json.dumps({'result': 'Event Modified'})
+              'body': json.dumps({'result': 'Event Modified', **eventImage({**event, **event_updates})})
             }
           
           print('Modify Event')
           data = json.loads(apiEvent['body'])
-          current_event = getEvent(data['event_id'])
+          current_event = getEvent(data['event_id'], resolve_pools=True)
           if len(data['date']) <= 19:
             data['date'] = datetime.fromisoformat(data['date']).replace(tzinfo=ZoneInfo('America/Denver')).isoformat()
           # Check if event format has changed to/from 'Reserved' or if reserved event date has changed
@@ -333,7 +361,7 @@ def lambda_handler(apiEvent, context):
               _action = 'update'
             process_reserved_event_scheduled_tasks(reserved_event=data, action=_action, target_arn=context.invoked_function_arn)
           response = modifyEvent(data)
-          diff = compareAttributes(current_event, data)
+          diff = compareAttributes(current_event, {k: v for k, v in data.items() if k != 'image_ready'})
           event_prev = {**diff['removed'], **diff['previous']}
           event_new = {**diff['added'], **diff['modified']}
           print(json.dumps({
@@ -351,6 +379,7 @@ def lambda_handler(apiEvent, context):
           }, default=ddb_default))
           all_rsvp = set()
           no_change = set()
+          rsvp_outbox = RsvpOutbox(context.aws_request_id)
           for rsvp in ['attending', 'not_attending']:
             if rsvp in event_prev:
               all_rsvp = all_rsvp.union(set(event_prev[rsvp]))
@@ -377,9 +406,7 @@ def lambda_handler(apiEvent, context):
                   changes[player] = {'rsvp': 'attending', 'action': 'add'}
               elif 'not_attending' in event_new and player in event_new['not_attending']:
                   changes[player] = {'rsvp': 'not_attending', 'action': 'add'}
-            for i, (player, rsvp) in enumerate(changes.items()):
-              if i == 0:
-                process_rsvp_alert_task()              
+            for player, rsvp in changes.items():
               rsvp_dict= {
                 'log_type': 'rsvp',
                 'auth_sub': auth_sub,
@@ -391,21 +418,17 @@ def lambda_handler(apiEvent, context):
                 'rsvp': rsvp['rsvp'],
               }
               print(json.dumps(rsvp_dict))
-              send_rsvp_sqs(rsvp_dict)
+              rsvp_outbox.add(rsvp_dict)
 
-          print('Update Player Pools')
-          updatePlayerPools()
-          print('Event Modified; Publish public events.json')
-          updatePublicEventsJson()
-          print(f'pull_bgg_pic = {pull_bgg_pic}')
-          try:
-            if pull_bgg_pic: waitForBggPic(data['bgg_id'])
-          except Exception as e:
-              print(e)
+          runSideEffects({
+            'rsvp_sqs': rsvp_outbox.flush if rsvp_outbox else None,
+            'rsvp_alert_task': process_rsvp_alert_task if rsvp_outbox else None,
+            'pools_and_feed': lambda: refreshPoolsAndFeed(context.invoked_function_arn, changed_event_ids={data['event_id']}, changed_users=poolDeltaUsers(current_event, data), changed_dates={current_event['date'], data.get('date', current_event['date'])}),
+          }, context=context)
           return {
             'statusCode': 201,
             'headers': {'Access-Control-Allow-Origin': origin},
-            'body': json.dumps({'result': 'Event Modified'})
+            'body': json.dumps({'result': 'Event Modified', **eventImage(response['event'])})
           }
                    
         # Delete Event
@@ -427,12 +450,10 @@ def lambda_handler(apiEvent, context):
             'previous': json.dumps(current_event, default=ddb_default),
             'action': 'delete',
           }, default=ddb_default))
-          print('Update Player Pools')
-          updatePlayerPools()
-          print('Event Deleted; Publish public events.json')
-          updatePublicEventsJson()
-          if current_event['format'] == 'Reserved':
-            process_reserved_event_scheduled_tasks(reserved_event=current_event, action='delete', target_arn=context.invoked_function_arn)
+          runSideEffects({
+            'pools_and_feed': lambda: refreshPoolsAndFeed(context.invoked_function_arn, changed_event_ids={event_id}, changed_users=poolDeltaUsers(current_event), changed_dates={current_event['date']}),
+            'reserved_schedules': (lambda: process_reserved_event_scheduled_tasks(reserved_event=current_event, action='delete', target_arn=context.invoked_function_arn)) if hasRefreshSchedules(current_event) else None,
+          }, context=context)
           return {
             'statusCode': 201,
             'headers': {'Access-Control-Allow-Origin': origin},
@@ -453,9 +474,10 @@ def lambda_handler(apiEvent, context):
           if auth_sub != data['user_id']:
             print(f"WARNING: user_id '{data['user_id']}' does not match auth_sub '{auth_sub}'. not authorized")
             return unauthorized
-          current_event = getEvent(data['event_id'], attributes=['date', 'attending', 'not_attending'])
           response = updateRSVP(data['event_id'], data['user_id'], data['rsvp'])
-          if  data['user_id'] in current_event[rsvp_change[data['rsvp']]]:
+          # Pre-image of the event (ReturnValues='ALL_OLD') determines add vs update and the event date
+          current_event = response['Attributes']
+          if  data['user_id'] in current_event.get(rsvp_change[data['rsvp']], set()):
             action = 'update'
           else:
             action = 'add'
@@ -470,12 +492,11 @@ def lambda_handler(apiEvent, context):
             'rsvp': data['rsvp'],
           }
           print(json.dumps(rsvp_dict))
-          send_rsvp_sqs(rsvp_dict)
-          process_rsvp_alert_task()
-          print('Update Player Pools')
-          updatePlayerPools()
-          print('Publish public events.json')
-          updatePublicEventsJson()
+          runSideEffects({
+            'rsvp_sqs': RsvpOutbox(context.aws_request_id, [rsvp_dict]).flush,
+            'rsvp_alert_task': process_rsvp_alert_task,
+            'pools_and_feed': lambda: refreshPoolsAndFeed(context.invoked_function_arn, changed_event_ids={data['event_id']}, changed_users={data['user_id']}, changed_dates={current_event['date']}),
+          }, context=context)
           return {
             'statusCode': 201,
             'headers': {'Access-Control-Allow-Origin': origin},
@@ -490,8 +511,8 @@ def lambda_handler(apiEvent, context):
           if auth_sub != data['user_id']:
             print(f"WARNING: user_id '{data['user_id']}' does not match auth_sub '{auth_sub}'. not authorized")
             return unauthorized
-          current_event = getEvent(data['event_id'], attributes=['date'])
           response = deleteRSVP(data['event_id'], data['user_id'], data['rsvp'])
+          current_event = response['Attributes']
           rsvp_dict = {
             'log_type': 'rsvp',
             'auth_sub': auth_sub,
@@ -503,12 +524,11 @@ def lambda_handler(apiEvent, context):
             'rsvp': data['rsvp'],
           }
           print(json.dumps(rsvp_dict))
-          send_rsvp_sqs(rsvp_dict)
-          process_rsvp_alert_task()
-          print('Update Player Pools')
-          updatePlayerPools()
-          print('Event Deleted; Publish public events.json')
-          updatePublicEventsJson()
+          runSideEffects({
+            'rsvp_sqs': RsvpOutbox(context.aws_request_id, [rsvp_dict]).flush,
+            'rsvp_alert_task': process_rsvp_alert_task,
+            'pools_and_feed': lambda: refreshPoolsAndFeed(context.invoked_function_arn, changed_event_ids={data['event_id']}, changed_users={data['user_id']}, changed_dates={current_event['date']}),
+          }, context=context)
           return {
             'statusCode': 201,
             'headers': {'Access-Control-Allow-Origin': origin},
@@ -540,18 +560,78 @@ def lambda_handler(apiEvent, context):
               dateLte = data['dateLte']
           else:
             dateLte = None
+          try:
+            for value in [dateGte, dateLte]:
+              if value: utcSortKey(value)
+          except ValueError:
+            return {
+              'statusCode': 400,
+              'headers': {'Access-Control-Allow-Origin': origin},
+              'body': json.dumps({'message': 'dateGte/dateLte must be ISO dates'})
+            }
           
           tableType = data.get('tableType', env.MODE) if data else env.MODE
-          events = getEvents(dateGte = dateGte, dateLte = dateLte, tableType = tableType)
+          is_admin = authorize(apiEvent, auth_groups, ['admin'], log_if_false=False)
+
+          # Optional projection (fields=game,date,attending) and paging (limit=25&cursor=...)
+          fields = None
+          if data and data.get('fields'):
+            fields = {field.strip() for field in data['fields'].split(',') if field.strip()}
+          limit = None
+          if data and data.get('limit'):
+            try:
+              limit = int(data['limit'])
+              if limit < 1: raise ValueError(limit)
+            except ValueError:
+              return {
+                'statusCode': 400,
+                'headers': {'Access-Control-Allow-Origin': origin},
+                'body': json.dumps({'message': 'limit must be a positive integer'})
+              }
+          cursor = data.get('cursor') if data and limit else None
+          # Optional filters, each served by its own index (host=user_id, player=user_id attending, bgg_id=game)
+          filters = {key: data[key] for key in ['host', 'player', 'bgg_id'] if data and data.get(key)}
+          if 'bgg_id' in filters and not filters['bgg_id'].isdigit():
+            return {
+              'statusCode': 400,
+              'headers': {'Access-Control-Allow-Origin': origin},
+              'body': json.dumps({'message': 'bgg_id must be an integer'})
+            }
 
-          # If not an admin, filter out 'private' events of which the member is not in the player pool
-          if not authorize(apiEvent, auth_groups, ['admin'], log_if_false=False):
-            events = [event for event in events if not (event['format'] == 'Private' and auth_sub not in event['player_pool'])]
-          return {
-            'statusCode': 200,
-            'headers': {'Access-Control-Allow-Origin': origin},
-            'body': json.dumps(events, default=ddb_default),
-          }
+          # Specific events by id (ids=a,b,c); date range, paging and index filters don't apply
+          if data and data.get('ids'):
+            event_ids = [event_id.strip() for event_id in data['ids'].split(',') if event_id.strip()]
+            if len(event_ids) > 100:
+              return {
+                'statusCode': 400,
+                'headers': {'Access-Control-Allow-Origin': origin},
+                'body': json.dumps({'message': 'At most 100 ids per request'})
+              }
+            events = getEventsByIds(event_ids, fields=fields and fields | {'event_type', 'date', 'format', 'player_pool'}, resolve_pools=True, scores=True)
+            events = [event for event in events if is_admin or isVisibleTo(event, auth_sub or '')]
+            keep = fields and fields | {'event_id', 'event_type', 'date'}
+            return etagResponse(apiEvent, origin, encodeEvents(events, keep))
+
+          try:
+            # If not an admin, filter out 'private' events of which the member is not in the player pool
+            result = getEvents(
+              dateGte = dateGte, dateLte = dateLte, tableType = tableType, resolve_pools=True, fields=fields, limit=limit, cursor=cursor, scores=True,
+              visible_to=None if is_admin else (auth_sub or ''), **filters
+            )
+          except (binascii.Error, json.JSONDecodeError, UnicodeDecodeError, botocore.exceptions.ClientError) as e:
+            # A cursor that decodes but doesn't match the index keys is rejected by DynamoDB
+            if isinstance(e, botocore.exceptions.ClientError) and not (cursor and e.response['Error']['Code'] == 'ValidationException'):
+              raise
+            return {
+              'statusCode': 400,
+              'headers': {'Access-Control-Allow-Origin': origin},
+              'body': json.dumps({'message': 'Invalid cursor', 'error': str(e)})
+            }
+          events, next_cursor = result if limit else (result, None)
+          keep = fields and fields | {'event_id', 'event_type', 'date'}
+          if limit:
+            return etagResponse(apiEvent, origin, EVENT_JSON_ENCODER.encode({'events': [event.to_api(keep) for event in events], 'cursor': next_cursor}))
+          return etagResponse(apiEvent, origin, encodeEvents(events, keep))
 
     case '/players':
       match method:        
@@ -574,18 +654,14 @@ def lambda_handler(apiEvent, context):
                 print('Get full players/groups refresh')
                 user_dict = updatePlayersGroupsJson()
             else:
-              user_dict = getJsonS3(env.BACKEND_BUCKET, 'players_groups.json')
+              user_dict = getJsonS3(env.BACKEND_BUCKET, 'players_groups.json', copy=False)
           
           # Non-admin users just retrieve the public facing (reduced details) players_groups.json
           else:
             print('Get Players (non-admin)')
-            user_dict = getJsonS3(env.S3_BUCKET, 'players_groups.json')
+            user_dict = getJsonS3(env.S3_BUCKET, 'players_groups.json', copy=False)
             
-          return {
-            'statusCode': 200,
-            'headers': {'Access-Control-Allow-Origin': origin},
-            'body': json.dumps(user_dict, indent=2, default=ddb_default)
-          }
+          return etagResponse(apiEvent, origin, json.dumps(user_dict, default=ddb_default))
         
     case '/players/import':
       match method:        
@@ -732,7 +808,7 @@ def lambda_handler(apiEvent, context):
             'attrib': '',
           }))
           updatePlayersGroupsJson(players_groups=user_dict)
-          updatePlayerPools()
+          refreshPoolsAndFeed(context.invoked_function_arn, changed_users={user_id})
           return {
             'statusCode': 201,
             'headers': {'Access-Control-Allow-Origin': origin},
@@ -828,9 +904,6 @@ def lambda_handler(apiEvent, context):
             user_dict['Groups'][group].remove(user_id)
             user_dict['Users'][user_id]['groups'].remove(group)
           
-          if (group_changes['added'] or group_changes['removed']):
-            updatePlayerPools()
-
           print(json.dumps({
             'log_type': 'player',
             'auth_sub': auth_sub,
@@ -840,6 +913,9 @@ def lambda_handler(apiEvent, context):
             'attrib': ', '.join(changes),
           }))
           updatePlayersGroupsJson(players_groups=user_dict)
+          # Recompute pools only after the new group membership is published
+          if (group_changes['added'] or group_changes['removed']):
+            refreshPoolsAndFeed(context.invoked_function_arn, changed_users={user_id})
           return {
             'statusCode': 201,
             'headers': {'Access-Control-Allow-Origin': origin},
@@ -1081,7 +1157,7 @@ def lambda_handler(apiEvent, context):
           if not authorize(apiEvent, auth_groups, ['admin']):
             print(f"WARNING: user_id '{auth_sub}' is not authorized")
             return unauthorized
-          email_alert_preferences = getJsonS3(env.BACKEND_BUCKET, 'email_alert_preferences.json')
+          email_alert_preferences = getJsonS3(env.BACKEND_BUCKET, 'email_alert_preferences.json', copy=False)
           return {
             'statusCode': 200,
             'headers': {'Access-Control-Allow-Origin': origin},
@@ -1099,7 +1175,7 @@ def lambda_handler(apiEvent, context):
           if auth_sub != data['user_id']:
             print(f"UNAUTHORIZED: user_id '{data['user_id']}' does not match auth_sub '{auth_sub}'")
             return unauthorized
-          email_alert_preferences = getJsonS3(env.BACKEND_BUCKET, 'email_alert_preferences.json')
+          email_alert_preferences = getJsonS3(env.BACKEND_BUCKET, 'email_alert_preferences.json', copy=False)
           user_alert_preferences = {}
           for alert_type, subscriber_list in email_alert_preferences.items():
             user_alert_preferences[alert_type] = user_id in subscriber_list
@@ -1124,7 +1200,7 @@ def lambda_handler(apiEvent, context):
           else:
             auth_type = 'admin'
           alert_subscriptions = data['alert_subscriptions']
-          email_alert_preferences = getJsonS3(env.BACKEND_BUCKET, 'email_alert_preferences.json')
+          email_alert_preferences = getJsonS3(env.BACKEND_BUCKET, 'email_alert_preferences.json', copy=False)
           email_alert_preferences = {alert_type: set(subscriber_list) for alert_type, subscriber_list in email_alert_preferences.items()}
 
           for alert_type, subscribed in alert_subscriptions.items():
@@ -1161,14 +1237,7 @@ def lambda_handler(apiEvent, context):
           # Those subscribed to rsvp_all_debug cannot also be subscribed to rsvp_all
           email_alert_preferences['rsvp_all'] = email_alert_preferences['rsvp_all'] - email_alert_preferences['rsvp_all_debug']
 
-          s3 = boto3.client('s3')
-          s3.put_object(
-            Body=json.dumps(email_alert_preferences, indent=2, default=ddb_default),
-            Bucket=env.BACKEND_BUCKET,
-            Key='email_alert_preferences.json',
-            ContentType='application/json',
-            CacheControl='no-cache'
-          )
+          publishJsonS3((env.BACKEND_BUCKET, 'email_alert_preferences.json', email_alert_preferences))
           return {
             'statusCode': 201,
             'headers': {'Access-Control-Allow-Origin': origin},
@@ -1195,6 +1264,41 @@ def updatePlayerPoolsAndPublicEventsJson():
   print('Publish public events.json')
   updatePublicEventsJson()
 
+# bgg_picture fan-out: ids per invocation (each one fetches and renders its images within the picture
+# function's timeout) and how many invocations are dispatched at once
+BGG_PICTURE_CHUNK = 10
+BGG_PICTURE_WORKERS = 8
+
+def bggPictureRecords(bgg_ids):
+  return {'Records': [{'Sns': {'MessageAttributes': {'bgg_id': {'Value': bgg_id}, 's3_bucket': {'Value': env.S3_BUCKET}}}} for bgg_id in bgg_ids]}
+
+# Invoke bgg_picture asynchronously for each chunk of the (deduped) ids so the images are pulled by
+# parallel picture Lambdas; returns one {'bgg_ids', 'status'|'error'} result per chunk
+def invokeBggPictures(bgg_ids):
+  from concurrent.futures import ThreadPoolExecutor
+
+  bgg_ids = list(dict.fromkeys(bgg_ids))
+  chunks = [bgg_ids[i:i + BGG_PICTURE_CHUNK] for i in range(0, len(bgg_ids), BGG_PICTURE_CHUNK)]
+  client = boto3.client('lambda')
+
+  def invoke(chunk):
+    try:
+      response = client.invoke(
+        FunctionName=env.BGG_PICTURE_FN,
+        InvocationType='Event',
+        Payload=json.dumps(bggPictureRecords(chunk), default=ddb_default)
+      )
+      return {'bgg_ids': chunk, 'status': response['StatusCode']}
+    except Exception as e:
+      print(f'bgg_picture invoke failed for {chunk}: {e}')
+      return {'bgg_ids': chunk, 'error': str(e)}
+
+  with ThreadPoolExecutor(max_workers=BGG_PICTURE_WORKERS) as executor:
+    results = list(executor.map(invoke, chunks))
+  failed = [result for result in results if 'error' in result]
+  print(f'bgg_picture: {len(results) - len(failed)}/{len(results)} chunks dispatched ({len(bgg_ids)} BGG IDs)')
+  return results
+
 def init_bootstrap():
   from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -1210,13 +1314,7 @@ def init_bootstrap():
       'rsvp_all': [],
       'rsvp_hosted': []
     }
-    s3.put_object(
-      Body=json.dumps(email_alert_preferences, indent=2, default=ddb_default),
-      Bucket=env.BACKEND_BUCKET,
-      Key='email_alert_preferences.json',
-      ContentType='application/json',
-      CacheControl='no-cache'
-    )
+    publishJsonS3((env.BACKEND_BUCKET, 'email_alert_preferences.json', email_alert_preferences))
     
   print('Initializing players_groups.json')
   try:
@@ -1239,16 +1337,17 @@ def init_bootstrap():
       'format': 'Placeholder'
     }
     createEvent(initEvent, process_bgg_id_image=False)
-    bgg_update = {'Records': [{'Sns': {'MessageAttributes': {'bgg_id': {'Value': 302388}, 's3_bucket': {'Value': env.S3_BUCKET}}}}]}
+    missing = [302388]
   else:
-    bgg_update = {'Records': [{'Sns': {'MessageAttributes': {'bgg_id': {'Value': event['bgg_id']}, 's3_bucket': {'Value': env.S3_BUCKET}}}} for event in events if 'bgg_id' in event and event['bgg_id']]}
+    # Only the games whose image isn't stored yet (per the manifest, when there is one)
+    stored = gameImageIds() or frozenset()
+    missing = sorted({int(event['bgg_id']) for event in events if event.get('bgg_id')} - stored)
   
   with ThreadPoolExecutor(max_workers=5) as executor:
     futures = {}
-    if len(bgg_update['Records']) > 0:
-      client = boto3.client('lambda')
-      print(f'Pull {len(bgg_update['Records'])} BGG IDs')
-      futures[executor.submit(client.invoke, FunctionName=env.BGG_PICTURE_FN, Payload=json.dumps(bgg_update, default=ddb_default))] = "bgg"
+    if len(missing) > 0:
+      print(f'Pull {len(missing)} BGG IDs')
+      futures[executor.submit(invokeBggPictures, missing)] = "bgg"
     futures[executor.submit(updatePlayerPoolsAndPublicEventsJson)] = "updatePlayerPoolsAndPublicEventsJson"
     for future in as_completed(futures):
       type = futures[future]
@@ -1296,9 +1395,11 @@ def compareAttributes(old_attributes, new_attributes):
 # Process ddb result classes  
 # when dumping to json string
 def ddb_default(obj):
+  if isinstance(obj, Event):
+    return obj.to_api()
   if isinstance(obj, set):
     return list(obj)
-  elif str(type(obj)) == "<class 'decimal.Decimal'>":
+  elif isinstance(obj, Decimal):
     return int(obj)
   if isinstance(obj, datetime):
     return obj.isoformat()
@@ -1322,6 +1423,23 @@ def key_exists(bucket, key):
       print('Something else went wrong')
       raise
 
+# 200 response with a strong ETag over the body, or an empty 304 when the client's If-None-Match already
+# holds it. Compression of large bodies is left to API Gateway (MinimumCompressionSize), which honors Accept-Encoding
+def etagResponse(apiEvent, origin, body):
+  import hashlib
+  etag = f'"{hashlib.sha256(body.encode("utf-8")).hexdigest()}"'
+  headers = {
+    'Access-Control-Allow-Origin': origin,
+    'Access-Control-Expose-Headers': 'ETag',
+    'Cache-Control': 'private, no-cache',
+    'ETag': etag,
+  }
+  request_headers = {name.lower(): value for name, value in (apiEvent.get('headers') or {}).items()}
+  if_none_match = [tag.strip().removeprefix('W/') for tag in request_headers.get('if-none-match', '').split(',')]
+  if etag in if_none_match or '*' in if_none_match:
+    return {'statusCode': 304, 'headers': headers}
+  return {'statusCode': 200, 'headers': headers, 'body': body}
+
 def authorize(apiEvent, membership:list, filter_groups:list, log_if_false=True ):
   if not membership:
     if log_if_false:
@@ -1341,37 +1459,199 @@ def authorize(apiEvent, membership:list, filter_groups:list, log_if_false=True )
     raise Exception('Not Authorized')
   return True
 
-def send_rsvp_sqs(rsvp_dict):
-  rsvp_dict = deepcopy(rsvp_dict)    
-  # rsvp_dict['timestamp'] = datetime.now().strftime('%Y%m%d%H%M%S%f')
-  rsvp_dict['timestamp'] = datetime.now(ZoneInfo('UTC')).isoformat()
-  sqs = boto3.client('sqs')
-  sqs.send_message(
-    QueueUrl=env.RSVP_SQS_URL, 
-    MessageBody=json.dumps(rsvp_dict, default=ddb_default),
-    MessageGroupId='rsvp',
-    # MessageAttributes={key: {'StringValue': value, 'DataType': 'String'} for key, value in rsvp_dict.items()}
-  )
+# Independent side effects of a request (RSVP log messages, the alert schedule, pools/publish, ...) 
+# run concurrently on a shared bounded executor, so the response waits for the slowest of them 
+# rather than for their sum. Tasks must not submit to this executor themselves
+SIDE_EFFECT_WORKERS = 8
+SIDE_EFFECT_TIMEOUT = 20
+# Seconds kept before the function deadline to log and return the response
+SIDE_EFFECT_DEADLINE_MARGIN = 1
+_side_effect_executor = None
+
+class SideEffectError(Exception):
+  def __init__(self, errors, results):
+    self.errors = errors
+    self.results = results
+    super().__init__('; '.join(f'{name}: {error!r}' for name, error in errors.items()))
+
+# boto3.client() and boto3.resource() create their clients from the default session, and a session 
+# isn't safe to create clients from in several threads at once (its credential resolver and loaders 
+# race). Installed as the default session, this gives each thread a boto3 session of its own
+class ThreadSessions(object):
+  def __init__(self):
+    import threading
+    self.local = threading.local()
+
+  def session(self):
+    if getattr(self.local, 'session', None) is None:
+      self.local.session = boto3.session.Session()
+    return self.local.session
+
+  def client(self, *args, **kwargs):
+    return self.session().client(*args, **kwargs)
+
+  def resource(self, *args, **kwargs):
+    return self.session().resource(*args, **kwargs)
+
+def sideEffectExecutor():
+  global _side_effect_executor
+  if _side_effect_executor is None:
+    from concurrent.futures import ThreadPoolExecutor
+    if not isinstance(boto3.DEFAULT_SESSION, ThreadSessions):
+      boto3.DEFAULT_SESSION = ThreadSessions()
+    _side_effect_executor = ThreadPoolExecutor(max_workers=SIDE_EFFECT_WORKERS, thread_name_prefix='side_effect')
+  return _side_effect_executor
+
+# tasks: {name: callable} or {name: (callable, timeout)}, None entries are skipped; {name: result} is returned.
+# The `required` tasks (default: all) are waited for until the function deadline (context's remaining time, 
+# less SIDE_EFFECT_DEADLINE_MARGIN; without a context, until they finish): once the response is returned 
+# Lambda freezes the environment, so unfinished work would be suspended, not completed. Their failures are 
+# raised together as one SideEffectError. The others are only waited for up to their timeout (default 
+# SIDE_EFFECT_TIMEOUT seconds, counted from the start) and their failures only logged; an optional task 
+# still running then is abandoned and may never finish
+def runSideEffects(tasks, required=None, context=None):
+  from concurrent.futures import TimeoutError as FutureTimeoutError
+  tasks = {name: task if isinstance(task, tuple) else (task, SIDE_EFFECT_TIMEOUT) for name, task in tasks.items() if task is not None}
+  start = time.monotonic()
+  deadline = None
+  if context is not None:
+    deadline = start + context.get_remaining_time_in_millis() / 1000 - SIDE_EFFECT_DEADLINE_MARGIN
+  executor = sideEffectExecutor()
+  futures = {name: executor.submit(fn) for name, (fn, timeout) in tasks.items()}
+  results = {}
+  errors = {}
+  for name, future in futures.items():
+    if required is None or name in required:
+      timeout = None if deadline is None else max(0, deadline - time.monotonic())
+      timeout_error = f'{name} did not finish before the function deadline'
+    else:
+      timeout = max(0, tasks[name][1] - (time.monotonic() - start))
+      timeout_error = f'{name} did not finish within {tasks[name][1]}s'
+    try:
+      results[name] = future.result(timeout=timeout)
+    except FutureTimeoutError:
+      errors[name] = TimeoutError(timeout_error)
+    except Exception as e:
+      errors[name] = e
+  for name, error in errors.items():
+    print(f'WARNING: side effect {name} failed: {error!r}')
+  required_errors = {name: error for name, error in errors.items() if required is None or name in required}
+  if required_errors:
+    raise SideEffectError(required_errors, results)
+  return results
+
+# RSVP change records of one request, sent to the RSVP alert queue with SendMessageBatch (up to 10 per call).
+# Each event is its own message group: RSVPs of one event stay ordered while different events' RSVPs can 
+# be received in parallel (rsvp_alerts drains the queue until it's empty). The deduplication id is derived 
+# from the request id, event, user and change, so a resend of the same record (a retried batch entry or a 
+# retried flush) is dropped by the FIFO queue instead of alerting twice
+SQS_BATCH_SIZE = 10
+
+class RsvpOutbox(object):
+  def __init__(self, request_id, rsvp_dicts=()):
+    self.request_id = request_id
+    self.records = []
+    for rsvp_dict in rsvp_dicts:
+      self.add(rsvp_dict)
+
+  def __len__(self):
+    return len(self.records)
+
+  def add(self, rsvp_dict):
+    self.records.append({**rsvp_dict, 'timestamp': datetime.now(ZoneInfo('UTC')).isoformat()})
+
+  def dedupId(self, rsvp_dict):
+    import hashlib
+    key = '|'.join(str(part) for part in [self.request_id, rsvp_dict['event_id'], rsvp_dict['user_id'], rsvp_dict['rsvp'], rsvp_dict['action']])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+  def flush(self, attempts=3):
+    sqs = boto3.client('sqs')
+    sent = 0
+    for i in range(0, len(self.records), SQS_BATCH_SIZE):
+      entries = {
+        str(n): {
+          'Id': str(n),
+          'MessageBody': json.dumps(rsvp_dict, default=ddb_default),
+          'MessageGroupId': rsvp_dict['event_id'],
+          'MessageDeduplicationId': self.dedupId(rsvp_dict),
+        }
+        for n, rsvp_dict in enumerate(self.records[i:i + SQS_BATCH_SIZE])
+      }
+      for attempt in range(attempts):
+        response = sqs.send_message_batch(QueueUrl=env.RSVP_SQS_URL, Entries=list(entries.values()))
+        sent += len(response.get('Successful', []))
+        failed = response.get('Failed', [])
+        # Sender faults (malformed entries) won't succeed on a resend
+        if [f for f in failed if f.get('SenderFault')]:
+          raise Exception(f'RSVP SQS batch rejected: {json.dumps(failed)}')
+        entries = {f['Id']: entries[f['Id']] for f in failed}
+        if not entries:
+          break
+        print(f'WARNING: {len(entries)} RSVP SQS entries failed; retrying ({attempt + 1})')
+      else:
+        raise Exception(f'RSVP SQS batch failed after {attempts} attempts: {json.dumps(failed)}')
+    self.records = []
+    return sent
+
+# The pending RSVP alert batch time (UTC, 'YYYY-MM-DDTHH:MM:SS') is claimed across containers with a 
+# conditional put of a marker item in the locks table, so the scheduler is only called by the one RSVP that 
+# opens a batch window. A container remembers only the windows it scheduled itself: another container's 
+# claim may still be released if its schedule update fails, so RSVPs seeing it keep checking the marker
+RSVP_ALERT_MARKER = {'lock_id': 'rsvp_alerts'}
+_rsvp_alert_task = {'at': None, 'target': None}
 
 def process_rsvp_alert_task():
-  client = boto3.client('scheduler', region_name='us-east-1')
-  response = client.get_schedule(Name=f'rsvp_alerts_schedule_{env.MODE}', GroupName=f'rsvp_alerts_{env.MODE}')
-  current_schedule = response['ScheduleExpression'][3:-1]
-  if datetime.fromisoformat(response['ScheduleExpression'][3:-1]+'Z') > datetime.now(ZoneInfo('UTC')):
-    print(f'Current rsvp process already scheduled ({current_schedule}) in the future')
+  now = datetime.now(ZoneInfo('UTC')).isoformat()[:19]
+  if _rsvp_alert_task['at'] and _rsvp_alert_task['at'] > now:
+    print(f'Current rsvp process already scheduled ({_rsvp_alert_task['at']}) in the future')
     return
-  
+
   # Schedule RSVP alert batch processing for 60 (or 30) seconds in the future
-  update_response = client.update_schedule(
-    Name=f'rsvp_alerts_schedule_{env.MODE}',
-    GroupName=f'rsvp_alerts_{env.MODE}',
-    ScheduleExpression=f'at({(datetime.now(ZoneInfo('UTC')) + timedelta(seconds=60 if env.MODE == 'prod' else 30)).isoformat()[:19]})',
-    Target=response['Target'],
-    FlexibleTimeWindow={'Mode': 'OFF'}
-  )
-  print(f'Scheduled RSVP alert batch processing for {60 if env.MODE == 'prod' else 30} seconds in the future')
-  return
-  # print(json.dumps(update_response, default=ddb_default))
+  delay = 60 if env.MODE == 'prod' else 30
+  at = (datetime.now(ZoneInfo('UTC')) + timedelta(seconds=delay)).isoformat()[:19]
+  ddb = boto3.client('dynamodb', region_name='us-east-1')
+  marker = {key: {'S': value} for key, value in RSVP_ALERT_MARKER.items()}
+  try:
+    ddb.put_item(
+      TableName=env.LOCKS_TABLE_NAME,
+      Item={**marker, 'scheduled_at': {'S': at}},
+      ConditionExpression='attribute_not_exists(scheduled_at) OR scheduled_at <= :now',
+      ExpressionAttributeValues={':now': {'S': now}},
+      ReturnValuesOnConditionCheckFailure='ALL_OLD'
+    )
+  except botocore.exceptions.ClientError as e:
+    if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+      raise
+    print(f'Current rsvp process already scheduled ({e.response.get('Item', {}).get('scheduled_at', {}).get('S')}) in the future')
+    return
+
+  try:
+    client = boto3.client('scheduler', region_name='us-east-1')
+    if _rsvp_alert_task['target'] is None:
+      _rsvp_alert_task['target'] = client.get_schedule(Name=f'rsvp_alerts_schedule_{env.MODE}', GroupName=f'rsvp_alerts_{env.MODE}')['Target']
+    client.update_schedule(
+      Name=f'rsvp_alerts_schedule_{env.MODE}',
+      GroupName=f'rsvp_alerts_{env.MODE}',
+      ScheduleExpression=f'at({at})',
+      Target=_rsvp_alert_task['target'],
+      FlexibleTimeWindow={'Mode': 'OFF'}
+    )
+  except Exception:
+    # Release the window so the next RSVP tries again
+    _rsvp_alert_task['target'] = None
+    try:
+      ddb.delete_item(
+        TableName=env.LOCKS_TABLE_NAME,
+        Key=marker,
+        ConditionExpression='scheduled_at = :at',
+        ExpressionAttributeValues={':at': {'S': at}}
+      )
+    except Exception as e:
+      print(f'WARNING: rsvp alert marker not released: {e}')
+    raise
+  _rsvp_alert_task['at'] = at
+  print(f'Scheduled RSVP alert batch processing for {delay} seconds in the future')
 
 def reserved_event_scheduled_tasks_crud(action, params):
   print(f'{action.title()} schedule {params['Name']}')
@@ -1406,13 +1686,12 @@ def reserved_event_scheduled_tasks_crud(action, params):
   print(f'{action.title()} schedule {params["Name"]} succeeded')
   return
 
-# is_after_sunday_midnight_of(datetime.fromisoformat(event['date']).replace(tzinfo=ZoneInfo('America/Denver')))
-def process_reserved_event_scheduled_tasks(reserved_event, action, target_arn):
-  group_name = f'reserved_rsvp_refresh_{env.MODE}'
+# One-time schedule in the reserved_rsvp_refresh group that invokes this function's 'updatePlayerPools'
+# action (full pool recompute, then publish). Name, ScheduleExpression and Description are added per schedule
+def reservedRefreshScheduleParams(target_arn):
   acount_id = target_arn.split(':')[4]
-  event_date = datetime.fromisoformat(reserved_event['date']).replace(tzinfo=ZoneInfo('America/Denver'))
-  base_params = {
-    'GroupName':group_name,
+  return {
+    'GroupName':f'reserved_rsvp_refresh_{env.MODE}',
     'ScheduleExpressionTimezone':'America/Denver',
     'Target':{
       'Arn': target_arn,
@@ -1427,60 +1706,208 @@ def process_reserved_event_scheduled_tasks(reserved_event, action, target_arn):
     'ActionAfterCompletion':'DELETE',
     'State':'ENABLED',
   }
-  for type in ['sunday_prior', 'event_start']:
-    _action = action
-    params = deepcopy(base_params)
-    params['Name'] = f'{type}_{reserved_event['event_id']}'
-    if _action == 'delete':
-        params = {'Name':params['Name'],'GroupName':group_name}
-    elif type == 'sunday_prior':
-      sunday_prior = event_date + relativedelta(weekday=SU(-1), hour=0, minute=0, second=0)
-      if datetime.now(ZoneInfo('America/Denver')) > sunday_prior:
-        if _action == 'create': 
-          print(f"INFO: Sunday prior to reserved event ({reserved_event['event_id']}) is in the past. Skipping Sunday refresh")
-          continue
-        _action = 'delete'
-        params = {'Name':params['Name'],'GroupName':group_name}
-      else:
-        schedule_time = (sunday_prior).isoformat()[:19]
-        params['ScheduleExpression'] = f'at({schedule_time})'
-        params['Description'] = f'Refresh RSVP eligibility midnight on Sunday ({schedule_time}) prior to the event ({event_date.isoformat()[:19]})'
-    elif type == 'event_start':
-      if datetime.now(ZoneInfo('America/Denver')) > event_date:
-        if _action == 'create': 
-          print(f"INFO: Reserved event ({reserved_event['event_id']}) is in the past. Skipping scheduled refresh")
-          continue
-        _action = 'delete'
-        params = {'Name':params['Name'],'GroupName':group_name}
-      else:
-        schedule_time = (event_date).isoformat()[:19]
-        params['ScheduleExpression'] = f'at({schedule_time})'
-        params['Description'] = f'Refresh RSVP eligibility after the event starts: {schedule_time}'
 
+# Pools and the public events feed after a write. The player pools are updated inline and incrementally 
+# (for the changed events/users): rsvpCondition enforces them on the next RSVP. With env.PUBLISH_DELAY = 0 
+# the months of the changed dates are republished inline too; otherwise the write only arms the coalesced 
+# publish (see scheduleEventsPublish) and one full publish then covers the whole burst of writes
+def refreshPoolsAndFeed(target_arn, changed_event_ids=None, changed_users=None, changed_dates=()):
+  print('Update Player Pools')
+  pool_dates = updatePlayerPools(changed_event_ids=changed_event_ids, changed_users=changed_users)
+  if env.PUBLISH_DELAY > 0:
     try:
-      reserved_event_scheduled_tasks_crud(_action, params)
+      scheduleEventsPublish(target_arn)
+      return
+    except Exception as e:
+      print(f'WARNING: Events publish not scheduled ({e}); publishing inline')
+  print('Publish public events.json')
+  updatePublicEventsJson(changed_dates={*changed_dates, *pool_dates})
+
+# Like process_rsvp_alert_task: the first write of a burst creates the 'events_publish' schedule 
+# PUBLISH_DELAY seconds out and later writes find it pending and return, so a change is published 
+# at most PUBLISH_DELAY seconds (plus the publish run) after it was written. A schedule whose time 
+# has passed may already have read the events before this write, so it is re-armed instead of joined
+def scheduleEventsPublish(target_arn):
+  now = datetime.now(ZoneInfo('America/Denver'))
+  schedule_time = (now + timedelta(seconds=env.PUBLISH_DELAY)).isoformat()[:19]
+  base_params = reservedRefreshScheduleParams(target_arn)
+  params = {
+    **base_params,
+    'Name': 'events_publish',
+    'ScheduleExpression': f'at({schedule_time})',
+    'Description': 'Coalesced public events publish',
+    'Target': {**base_params['Target'], 'Input': json.dumps({'action': 'publishEvents'})},
+  }
+  client = boto3.client('scheduler', region_name='us-east-1')
+  try:
+    client.create_schedule(**params)
+    print(f'Events publish scheduled for {schedule_time}')
+    return
+  except Exception as err:
+    if 'ConflictException' not in str(err): raise
+  try:
+    pending = client.get_schedule(Name=params['Name'], GroupName=params['GroupName'])
+    pending_time = datetime.fromisoformat(pending['ScheduleExpression'][3:-1]).replace(tzinfo=ZoneInfo('America/Denver'))
+    if pending_time > now:
+      print(f'Events publish already scheduled ({pending_time.isoformat()[:19]})')
+      return
+  except Exception as err:
+    # Completed (and deleted) in the meantime
+    if 'ResourceNotFoundException' not in str(err): raise
+  reserved_event_scheduled_tasks_crud('update', params)
+
+# Reserved events get two one-time refresh schedules: midnight on the Sunday prior (pools open) and the 
+# event start. The schedule time is part of the name (<type>_<event_id>_<YYYYMMDDTHHMM>), so the group's 
+# schedule listing alone tells which are in place: a moved event gets a new name, and reconciling is 
+# creating the missing names and deleting the unwanted ones
+RESERVED_SCHEDULE_TYPES = ['sunday_prior', 'event_start']
+RESERVED_SCHEDULE_NAME = re.compile(r'^(sunday_prior|event_start)_(.+?)(?:_(\d{8}T\d{4}))?$')
+SCHEDULE_WORKERS = 8
+
+# Events that get the refresh schedules: every Reserved event, open_rsvp_eligibility ones included. 
+# Both the per-event and the full reconcile go by this, so neither removes what the other created
+def hasRefreshSchedules(event):
+  return event.get('format') == 'Reserved'
+
+def desiredReservedSchedules(reserved_event, target_arn):
+  now = datetime.now(ZoneInfo('America/Denver'))
+  event_date = datetime.fromisoformat(reserved_event['date']).replace(tzinfo=ZoneInfo('America/Denver'))
+  times = {
+    'sunday_prior': event_date + relativedelta(weekday=SU(-1), hour=0, minute=0, second=0),
+    'event_start': event_date,
+  }
+  schedules = {}
+  for type in RESERVED_SCHEDULE_TYPES:
+    if now > times[type]:
+      print(f"INFO: {type} refresh of reserved event ({reserved_event['event_id']}) is in the past. Skipping")
+      continue
+    schedule_time = times[type].isoformat()[:19]
+    name = f"{type}_{reserved_event['event_id']}_{times[type].strftime('%Y%m%dT%H%M')}"
+    schedules[name] = {
+      **reservedRefreshScheduleParams(target_arn),
+      'Name': name,
+      'ScheduleExpression': f'at({schedule_time})',
+      'Description': (
+        f'Refresh RSVP eligibility midnight on Sunday ({schedule_time}) prior to the event ({event_date.isoformat()[:19]})' 
+        if type == 'sunday_prior' else f'Refresh RSVP eligibility after the event starts: {schedule_time}'
+      ),
+    }
+  return schedules
+
+# Bring the refresh schedules of `reserved_events` in line with the group: one (paginated) ListSchedules, 
+# then only the differences are created/deleted, concurrently. With event_ids only those events' schedules 
+# are considered (e.g. [] with the id of a deleted event removes its schedules); without, every event 
+# schedule in the group is and those of events not in reserved_events are deleted. Other schedules 
+# (events_publish) are left alone. Returns {'created': [...], 'deleted': [...]}
+def reconcileReservedSchedules(reserved_events, target_arn, event_ids=None):
+  from concurrent.futures import ThreadPoolExecutor
+  group_name = f'reserved_rsvp_refresh_{env.MODE}'
+  client = boto3.client('scheduler', region_name='us-east-1')
+  desired = {}
+  for reserved_event in reserved_events:
+    if hasRefreshSchedules(reserved_event):
+      desired.update(desiredReservedSchedules(reserved_event, target_arn))
+
+  existing = set()
+  for page in client.get_paginator('list_schedules').paginate(GroupName=group_name):
+    for schedule in page['Schedules']:
+      match = RESERVED_SCHEDULE_NAME.match(schedule['Name'])
+      if match and (event_ids is None or match.group(2) in event_ids):
+        existing.add(schedule['Name'])
+
+  creates = [params for name, params in desired.items() if name not in existing]
+  deletes = sorted(existing - set(desired))
+
+  def create(params):
+    try:
+      client.create_schedule(**params)
     except Exception as err:
-      # if 'ParamValidationError' in str(err):
-      import sys
-      err_type  = sys.exc_info()[0]
-      print(json.dumps({
-        'ERROR': str(err),
-        'err_type': str(err_type),
-        'type': type,
-        '_action': _action,
-        'params': params,
-      }))
-      raise
+      # Created concurrently (same name, so the same time)
+      if 'ConflictException' not in str(err): raise
+    print(f'Create schedule {params['Name']} succeeded')
 
-# Check whether bgg image has already been pulled and send 
-# an SNS to trigger pulling/resizing/saving it if not
-def process_bgg_id(bgg_id):
-  global pull_bgg_pic
-  s3 = boto3.client('s3')
-  key = f'{bgg_id}.png'
-  if not key_exists(env.S3_BUCKET, key):
-    pull_bgg_pic = True
+  def delete(name):
+    try:
+      client.delete_schedule(Name=name, GroupName=group_name)
+    except Exception as err:
+      # Already ran (ActionAfterCompletion DELETE) or deleted concurrently
+      if 'ResourceNotFoundException' not in str(err): raise
+    print(f'Delete schedule {name} succeeded')
+
+  if creates or deletes:
+    with ThreadPoolExecutor(max_workers=SCHEDULE_WORKERS) as executor:
+      futures = [executor.submit(create, params) for params in creates] + [executor.submit(delete, name) for name in deletes]
+    errors = [future.exception() for future in futures if future.exception()]
+    if errors:
+      print(json.dumps({'ERROR': [str(err) for err in errors], 'group': group_name}))
+      raise errors[0]
+  result = {'created': sorted(params['Name'] for params in creates), 'deleted': deletes}
+  print(json.dumps({'reservedSchedules': result}))
+  return result
+
+# The refresh schedules of one event after it was created/modified (action 'create'/'update') or deleted 
+# or is no longer Reserved ('delete')
+def process_reserved_event_scheduled_tasks(reserved_event, action, target_arn):
+  return reconcileReservedSchedules(
+    [] if action == 'delete' else [reserved_event], 
+    target_arn, 
+    event_ids={reserved_event['event_id']}
+  )
+
+# Game images (<bgg_id>.png in the public bucket) are pulled by the bgg_picture function, which stamps 
+# image_ready on the game's events once the image is stored. Writes don't wait for it: an event whose 
+# image isn't ready yet is written with image_ready false and the picture is requested after the write
+def bggPicReady(bgg_id):
+  ids = gameImageIds()
+  if ids is not None and int(bgg_id) in ids:
+    return True
+  # Not in the (cached) manifest: the image may have been stored since it was read, or be missing from a 
+  # manifest that's being rebuilt, so only a HEAD of the image itself says it's missing
+  return key_exists(env.S3_BUCKET, f'{bgg_id}.png')
 
+# Manifest of the stored game images ({"bgg_ids": [...]}, next to them in the public bucket). bgg_picture 
+# adds each image it stores (conditional PUT); rebuildGameImages recreates it from a bucket listing
+GAME_IMAGES_KEY = 'game_images.json'
+_game_images = {'data': None, 'ids': None}
+
+# Set of bgg_ids with a stored image (from the cached manifest), or None while there is no manifest
+def gameImageIds():
+  try:
+    data = getJsonS3(env.S3_BUCKET, GAME_IMAGES_KEY, copy=False)
+  except botocore.exceptions.ClientError as e:
+    if e.response['Error']['Code'] not in ['NoSuchKey', '404']:
+      raise
+    return None
+  if data is not _game_images['data']:
+    _game_images.update(data=data, ids=frozenset(data['bgg_ids']))
+  return _game_images['ids']
+
+# The manifest is replaced with the listing through a conditional write, so an id bgg_picture adds 
+# meanwhile isn't lost: ids in the manifest but not in the listing are kept if their image exists
+def rebuildGameImages():
+  s3 = boto3.client('s3')
+  bgg_ids = set()
+  for page in s3.get_paginator('list_objects_v2').paginate(Bucket=env.S3_BUCKET):
+    for item in page.get('Contents', []):
+      match = re.fullmatch(r'(\d+)\.png', item['Key'])
+      if match: bgg_ids.add(int(match[1]))
+
+  def relist(current):
+    unlisted = set(current['bgg_ids']) - bgg_ids if current else set()
+    bgg_ids.update(bgg_id for bgg_id in unlisted if key_exists(env.S3_BUCKET, f'{bgg_id}.png'))
+    return {'bgg_ids': sorted(bgg_ids)}
+
+  updateJsonS3(env.S3_BUCKET, GAME_IMAGES_KEY, relist)
+  print(f'{GAME_IMAGES_KEY} rebuilt: {len(bgg_ids)} images')
+  return len(bgg_ids)
+
+# Image to show for an event: the game image once ready, otherwise its TBD picture (if any) as a placeholder
+def eventImage(event):
+  if event.get('bgg_id') and event.get('image_ready', True):
+    return {'image_ready': True, 'image': f"{event['bgg_id']}.png"}
+  return {'image_ready': False, 'image': event.get('tbd_pic')}
+
+def requestBggPic(bgg_id):
     # send message to SNS
     print(f"Sending message to SNS: '{bgg_id}#{env.SNS_TOPIC_ARN}'")
     sns = boto3.client('sns')
@@ -1500,145 +1927,479 @@ def process_bgg_id(bgg_id):
     )
 
 
+# Sort key of the event date indexes: `date` keeps the local (America/Denver) offset of the event, which
+# changes across DST, so range queries and conditions compare this UTC form instead ('YYYY-MM-DDTHH:MM:SSZ').
+# Accepts an ISO string, date or datetime; without an offset (incl. plain dates, at midnight) it is local time
+def utcSortKey(value):
+  if isinstance(value, str):
+    value = datetime.fromisoformat(value)
+  if not isinstance(value, datetime):
+    value = datetime(value.year, value.month, value.day)
+  if value.tzinfo is None:
+    value = value.replace(tzinfo=ZoneInfo('America/Denver'))
+  return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+# First and last UTC sort keys of a local calendar month, e.g. '2026-10'
+def monthSortKeys(month):
+  start = datetime.fromisoformat(f'{month}-01')
+  return utcSortKey(start), utcSortKey(start + relativedelta(months=1) - timedelta(seconds=1))
+
+# Event attributes stored in slots; anything else (e.g. attributes added by a newer release) 
+# is kept in _extra so nothing is lost when an item is read and written back
+EVENT_FIELDS = (
+  'event_id', 'event_type', 'date', 'date_utc', 'host', 'organizer', 'format', 'open_rsvp_eligibility', 'game', 
+  'bgg_id', 'total_spots', 'tbd_pic', 'image_ready', 'status', 'attending', 'not_attending', 'player_pool', 'organizer_pool', 
+  'player_pool_group', 'organizer_pool_group', 'reserved_event_type', 'finalScore', 'migrated',
+)
+_EVENT_SLOTS = frozenset(EVENT_FIELDS)
+# Attributes an event create/modify writes from the client's event (pools and index keys are derived)
+EVENT_WRITE_FIELDS = (
+  'event_id', 'event_type', 'date', 'host', 'organizer', 'format', 'open_rsvp_eligibility', 'game', 
+  'attending', 'not_attending', 'player_pool', 'finalScore', 'status', 'bgg_id', 'total_spots', 'tbd_pic', 'image_ready',
+)
+# Index-only attributes left out of the public events feed (pools are already resolved)
+EVENT_INTERNAL_FIELDS = frozenset({'date_utc', 'reserved_event_type', 'player_pool_group', 'organizer_pool_group'})
+# Default projection of bulk event reads: everything but finalScore (see getEvents' scores)
+EVENT_LIST_FIELDS = tuple(name for name in EVENT_FIELDS if name != 'finalScore')
+
+# Low-level DynamoDB AttributeValue -> native value (N as int/float rather than Decimal)
+def fromAttributeValue(value):
+  (kind, v), = value.items()
+  if kind == 'S' or kind == 'BOOL': return v
+  if kind == 'SS': return set(v)
+  if kind == 'N': return int(v) if v.lstrip('-').isdigit() else float(v)
+  if kind == 'L': return [fromAttributeValue(x) for x in v]
+  if kind == 'M': return {k: fromAttributeValue(x) for k, x in v.items()}
+  if kind == 'NS': return {int(x) if x.lstrip('-').isdigit() else float(x) for x in v}
+  if kind == 'NULL': return None
+  return v
+
+def toAttributeValue(value):
+  if isinstance(value, str): return {'S': value}
+  if isinstance(value, bool): return {'BOOL': value}
+  if isinstance(value, (int, float, Decimal)): return {'N': str(value)}
+  if isinstance(value, (set, frozenset)): return {'SS': list(value)}
+  if isinstance(value, (list, tuple)): return {'L': [toAttributeValue(x) for x in value]}
+  if isinstance(value, dict): return {'M': {k: toAttributeValue(x) for k, x in value.items()}}
+  if value is None: return {'NULL': True}
+  raise TypeError(f'Unsupported attribute value type: {type(value)}')
+
+# finalScore is stored as a native list/map; older events still hold it as a JSON string (see migrateEvents)
+def decodeFinalScore(value):
+  if 'S' in value:
+    return json.loads(value['S']) if value['S'] else ''
+  return fromAttributeValue(value)
+
+# Resource (TypeSerializer) form of a JSON-native value: floats as Decimal
+def toDynamoNative(value):
+  return json.loads(json.dumps(value), parse_float=Decimal)
+
+# JSON-native copy of an attribute value (sets become sorted lists)
+def _json_value(value):
+  if isinstance(value, (set, frozenset)): return sorted(value, key=str)
+  if isinstance(value, Decimal): return int(value) if value == value.to_integral_value() else float(value)
+  return value
+
+class Event(MutableMapping):
+  __slots__ = EVENT_LIST_FIELDS + ('_finalScore', '_finalScore_item', '_extra')
+
+  def __init__(self, **attributes):
+    self._extra = {}
+    self._finalScore_item = None
+    for name, value in attributes.items():
+      self[name] = value
+
+  # DynamoDB item (low-level AttributeValue map) -> Event, with the 'placeholder' set members stripped
+  @classmethod
+  def from_ddb(cls, item, projected=False):
+    event = cls.__new__(cls)
+    event._extra = {}
+    event._finalScore_item = None
+    for name, value in item.items():
+      if name == 'finalScore':
+        event._finalScore_item = value
+      else:
+        event[name] = fromAttributeValue(value)
+    for name in EVENT_PLACEHOLDER_SETS:
+      members = getattr(event, name, None)
+      if members is not None: members.discard('placeholder')
+    # host is omitted from the item when blank (it is an index key)
+    if not projected and not hasattr(event, 'host'):
+      event.host = ''
+    return event
+
+  # Event to write for a create/modify from a client supplied event: only EVENT_WRITE_FIELDS are kept, 
+  # defaults filled in and the derived pool markers / index keys set
+  @classmethod
+  def for_write(cls, eventDict):
+    event = cls(**{name: eventDict[name] for name in EVENT_WRITE_FIELDS if name in eventDict})
+    event.setdefault('event_type', 'GameKnight')
+    event.setdefault('organizer', '')
+    event.setdefault('open_rsvp_eligibility', False)
+    event.setdefault('not_attending', set())
+    # Open eligibility: store the group markers instead of copies of the groups
+    if isOpenEligibility(event):
+      event.player_pool = set()
+      for pool_key, group in OPEN_POOL_GROUPS.items():
+        event[f'{pool_key}_group'] = group
+    # Key of the sparse ReservedByDate index (only Reserved, not open_rsvp_eligibility, events)
+    if isReservedPoolEvent(event):
+      event.reserved_event_type = event.event_type
+    event.date_utc = utcSortKey(event.date)
+    return event
+
+  # finalScore is kept as its stored AttributeValue until it is first accessed
+  @property
+  def finalScore(self):
+    if self._finalScore_item is not None:
+      self._finalScore = decodeFinalScore(self._finalScore_item)
+      self._finalScore_item = None
+    return self._finalScore
+
+  @finalScore.setter
+  def finalScore(self, value):
+    self._finalScore_item = None
+    self._finalScore = value
+
+  @finalScore.deleter
+  def finalScore(self):
+    if self._finalScore_item is not None:
+      self._finalScore_item = None
+    else:
+      del self._finalScore
 
-def waitForBggPic(bgg_id):
-   # wait for 5 seconds at most
-  for i in range(15):
-    if key_exists(env.S3_BUCKET, f'{bgg_id}.png'):
-      return
+  # Read from the table with finalScore still in the old JSON string form (only valid before it is accessed)
+  def has_legacy_score(self):
+    return self._finalScore_item is not None and 'S' in self._finalScore_item
+
+  def to_ddb(self):
+    item = {}
+    for name in self:
+      if name == 'finalScore' and self._finalScore_item is not None and not self.has_legacy_score():
+        item[name] = self._finalScore_item
+        continue
+      value = self[name]
+      if name in EVENT_PLACEHOLDER_SETS:
+        value = {*value, 'placeholder'}
+      elif name in EVENT_SET_ATTRIBUTES:
+        value = set(value)
+        if not value: continue
+      elif name == 'finalScore':
+        if value == '' or value is None: continue
+      elif value is None or (name in EVENT_INDEX_KEYS and value == ''):
+        continue
+      item[name] = toAttributeValue(value)
+    return item
+
+  # JSON-native dict for API responses, optionally limited to the given attributes
+  def to_api(self, fields=None):
+    return {name: _json_value(value) for name, value in self.items() if fields is None or name in fields}
+
+  def to_public(self):
+    return {name: _json_value(value) for name, value in self.items() if name not in EVENT_INTERNAL_FIELDS}
+
+  def __getitem__(self, name):
+    if name in _EVENT_SLOTS:
+      try:
+        return getattr(self, name)
+      except AttributeError:
+        raise KeyError(name) from None
+    return self._extra[name]
+
+  def __setitem__(self, name, value):
+    if name in _EVENT_SLOTS:
+      setattr(self, name, value)
+    else:
+      self._extra[name] = value
+
+  def __delitem__(self, name):
+    if name in _EVENT_SLOTS:
+      try:
+        delattr(self, name)
+      except AttributeError:
+        raise KeyError(name) from None
     else:
-      print(f"Waiting for {bgg_id}.png to be pulled...")
-      time.sleep(.25)
+      del self._extra[name]
+
+  def __iter__(self):
+    for name in EVENT_FIELDS:
+      if name == 'finalScore':
+        if self._finalScore_item is not None or hasattr(self, '_finalScore'): yield name
+      elif hasattr(self, name): yield name
+    yield from self._extra
+
+  def __len__(self):
+    return sum(1 for _ in self)
+
+  def __repr__(self):
+    return f'Event({self.to_api()!r})'
+## end class Event
+
+# Events are converted to JSON-native values (to_api/to_public) first, so encoding needs no default= callback
+EVENT_JSON_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+def encodeEvents(events, fields=None):
+  return EVENT_JSON_ENCODER.encode([event.to_api(fields) for event in events])
 
 
 def createEvent(eventDict, process_bgg_id_image=True):
-  eventDict = deepcopy(eventDict)    
   event_id = eventDict['event_id'] if 'event_id' in eventDict else str(uuid.uuid4())  # temp: allow supplying event_id for 'Transfer' action. Remove on client side for 'Clone'
-  new_event = {
-    'event_id': {'S': event_id},
-    'event_type': {'S': eventDict['event_type'] if 'event_type' in eventDict else 'GameKnight'},
-    'date': {'S': eventDict['date']},
-    'host': {'S': eventDict['host']},
-    'organizer': {'S': eventDict['organizer']} if 'organizer' in eventDict else {'S': ''},
-    'format': {'S': eventDict['format']},
-    'open_rsvp_eligibility': {'BOOL': eventDict['open_rsvp_eligibility']} if 'open_rsvp_eligibility' in eventDict else {'BOOL': False},
-    'game': {'S': eventDict['game']},
-    'attending': {'SS': eventDict['attending']},
-    'player_pool': {'SS': eventDict['player_pool']}
-  }
-  if 'finalScore' in eventDict and eventDict['finalScore'] != '': new_event['finalScore'] = {'S': json.dumps(eventDict['finalScore'])}
-  if 'status' in eventDict: new_event['status'] = {'S': eventDict['status']}
-  if 'bgg_id' in eventDict: new_event['bgg_id'] = {'N': str(eventDict['bgg_id'])}
-  if 'total_spots' in eventDict:  new_event['total_spots'] = {'N': str(eventDict['total_spots'])}
-  if 'tbd_pic' in eventDict: new_event['tbd_pic'] = {'S': eventDict['tbd_pic']}
-  # if 'migrated' in eventDict: new_event['migrated'] = {'BOOL': eventDict['migrated']}
-  if 'not_attending' in eventDict: 
-    new_event['not_attending'] = {'SS': eventDict['not_attending']}
-  else :
-    new_event['not_attending'] = {'SS': ['placeholder']}
-
-  # Make sure 'placeholder' is in not_attending and attending sets (will be deduplicated)
-  if 'placeholder' not in new_event['not_attending']['SS']:
-    new_event['not_attending']['SS'].append('placeholder')
-  if 'placeholder' not in new_event['attending']['SS']:
-    new_event['attending']['SS'].append('placeholder')
-  if 'placeholder' not in new_event['player_pool']['SS']:
-    new_event['player_pool']['SS'].append('placeholder')
-
-  # Start processing download for new game image if necessary
+  new_event = Event.for_write({**eventDict, 'event_id': event_id})
+  pull_bgg_pic = False
   if process_bgg_id_image and 'bgg_id' in eventDict and eventDict['bgg_id']:
-    process_bgg_id(eventDict['bgg_id'])
+    new_event.image_ready = bggPicReady(eventDict['bgg_id'])
+    pull_bgg_pic = not new_event.image_ready
 
   ddb = boto3.client('dynamodb', region_name='us-east-1')
   response = ddb.put_item(
     TableName=env.TABLE_NAME,
-    Item={**new_event},
+    Item=new_event.to_ddb(),
     # Fail if item.event_id already exists
     ConditionExpression='attribute_not_exists(event_id)',
   )
   response['event_id'] = event_id
+  response['event'] = new_event
   print('Event Created')
+  # Start processing download for new game image if necessary
+  if pull_bgg_pic: requestBggPic(eventDict['bgg_id'])
+  syncAttendance(current=new_event)
 
   return response
 ## def createEvent(eventDict) 
 
 
 def modifyEvent(eventDict, process_bgg_id_image=True):  
-  eventDict = deepcopy(eventDict)             
-  modified_event = {
-    'event_id': {'S': eventDict['event_id']},
-    'event_type': {'S': eventDict['event_type']},
-    'date': {'S': eventDict['date']},
-    'host': {'S': eventDict['host']},
-    'organizer': {'S': eventDict['organizer']} if 'organizer' in eventDict else {'S': ''},
-    'format': {'S': eventDict['format']},
-    'open_rsvp_eligibility': {'BOOL': eventDict['open_rsvp_eligibility']} if 'open_rsvp_eligibility' in eventDict else {'BOOL': False},
-    'game': {'S': eventDict['game']},
-    'attending': {'SS': list(eventDict['attending'])},
-    'player_pool': {'SS': list(eventDict['player_pool'])},
-  }
-  if 'finalScore' in eventDict and  eventDict['finalScore'] != '': modified_event['finalScore'] = {'S': json.dumps(eventDict['finalScore'])}
-  if 'status' in eventDict: modified_event['status'] = {'S': eventDict['status']}
-  if 'bgg_id' in eventDict: modified_event['bgg_id'] = {'N': str(eventDict['bgg_id'])}
-  if 'total_spots' in eventDict: modified_event['total_spots'] = {'N': str(eventDict['total_spots'])}
-  if 'tbd_pic' in eventDict: modified_event['tbd_pic'] = {'S': eventDict['tbd_pic']}
-  # if 'migrated' in eventDict: modified_event['migrated'] = {'BOOL': eventDict['migrated']}
-  if 'not_attending' in eventDict: 
-    modified_event['not_attending'] = {'SS': list(eventDict['not_attending'])}
-  else :
-    modified_event['not_attending'] = {'SS': ['placeholder']}
-
-  # Make sure 'placeholder' is in not_attending and attending sets (will be deduplicated)
-  if 'placeholder' not in modified_event['not_attending']['SS']:
-    modified_event['not_attending']['SS'].append('placeholder')
-  if 'placeholder' not in modified_event['attending']['SS']:
-    modified_event['attending']['SS'].append('placeholder')
-  if 'placeholder' not in modified_event['player_pool']['SS']:
-    modified_event['player_pool']['SS'].append('placeholder')
-
+  modified_event = Event.for_write(eventDict)
+  pull_bgg_pic = False
   if process_bgg_id_image and 'bgg_id' in eventDict and eventDict['bgg_id'] and eventDict['bgg_id'] > 0:
     print(json.dumps({"process_bgg_id_image": process_bgg_id_image, "'bgg_id' in eventDict": 'bgg_id' in eventDict, "bgg_id": eventDict['bgg_id']}))
-    process_bgg_id(eventDict['bgg_id'])
+    modified_event.image_ready = bggPicReady(eventDict['bgg_id'])
+    pull_bgg_pic = not modified_event.image_ready
 
   # date = parser.parse(text).date().isoformat()
   ddb = boto3.client('dynamodb', region_name='us-east-1')
   response = ddb.put_item(
     TableName=env.TABLE_NAME,
-    Item={**modified_event},
+    Item=modified_event.to_ddb(),
     # Fail if item.event_id doesn't already exist
     ConditionExpression='attribute_exists(event_id)',
+    ReturnValues='ALL_OLD',
   )
   print('Event Updated')
+  response['event'] = modified_event
+  if pull_bgg_pic: requestBggPic(eventDict['bgg_id'])
+  previous = response.get('Attributes')
+  syncAttendance(previous=Event.from_ddb(previous) if previous else None, current=modified_event)
 
   return response
 ## modifyEvent(eventDict)
   
 ## Update specific attributes of an event
-def updateEvent(event_id, event_updates):
-  event_updates = deepcopy(event_updates)
-  if 'finalScore' in event_updates and event_updates['finalScore'] != '': event_updates['finalScore'] = json.dumps(event_updates['finalScore'])
+## If the current event is supplied, only the differences are written (see eventUpdateExpression)
+# With the current event (the pre-image the updates were made against), the RSVP set changes are 
+# conditioned on the members they change (see eventUpdateExpression). If a concurrent RSVP changed one 
+# of them, the event is read again and the changes are replayed onto it (rebaseRsvpUpdates)
+def updateEvent(event_id, event_updates, current=None, attempts=3):
   ddb = boto3.resource('dynamodb', region_name='us-east-1')
   table = ddb.Table(env.TABLE_NAME)
-  try:
-    response = table.update_item(
-      Key={ 'event_id': event_id },
-      UpdateExpression='SET ' + ', '.join([f'#{k} = :{k}' for k in event_updates.keys()]),
-      ConditionExpression=Attr('event_id').exists(),
-      ExpressionAttributeValues={
-        f':{k}': v for k, v in event_updates.items()
-      },
-      ExpressionAttributeNames={
-        f'#{k}': k for k in event_updates.keys()
-      }
-    )
-  except Exception as e:
-    print(e)
-    print(json.dumps({'event_updates': event_updates}, default=ddb_default))
-    raise e
+  # Attendance changes (or a new date) need the previous event to update the attendance index
+  sync_attendance = 'attending' in event_updates or 'date' in event_updates
+  for attempt in range(attempts):
+    expression = eventUpdateExpression(event_updates, current=current, conditioned=True)
+    if not expression:
+      print(f'Event {event_id} unchanged')
+      return None
+    condition = expression.pop('ConditionExpression', None)
+    try:
+      response = table.update_item(
+        Key={ 'event_id': event_id },
+        ConditionExpression=f'attribute_exists(event_id) AND {condition}' if condition else 'attribute_exists(event_id)',
+        **({'ReturnValues': 'ALL_OLD'} if sync_attendance else {}),
+        **expression
+      )
+      break
+    except Exception as e:
+      if (condition and attempt + 1 < attempts and isinstance(e, botocore.exceptions.ClientError) 
+          and e.response['Error']['Code'] == 'ConditionalCheckFailedException'):
+        print(f'Event {event_id} RSVPs changed concurrently; retrying ({attempt + 1})')
+        latest = getEvent(event_id, resolve_pools=True)
+        event_updates, current = rebaseRsvpUpdates(event_updates, current, latest), latest
+        continue
+      print(e)
+      print(json.dumps({'event_updates': event_updates, 'expression': expression}, default=ddb_default))
+      raise e
   print(f'Event {event_id} updated')
+  if sync_attendance:
+    previous = response.get('Attributes', {})
+    # The RSVP sets changed by their delta: members the condition didn't cover may differ from current
+    after = rebaseRsvpUpdates(event_updates, current, previous) if current is not None else event_updates
+    syncAttendance(previous=previous, current={**previous, **after})
   return response
 ## def updateEvent(event_id, event_updates)
 
+# String set attributes of an event. All but organizer_pool always carry a 'placeholder' 
+# member so the set is never empty (DynamoDB does not allow empty sets)
+EVENT_SET_ATTRIBUTES = {'attending', 'not_attending', 'player_pool', 'organizer_pool'}
+EVENT_PLACEHOLDER_SETS = {'attending', 'not_attending', 'player_pool'}
+# RSVP sets, each paired with the other one (a user is in at most one of them)
+EVENT_RSVP_SETS = {'attending': 'not_attending', 'not_attending': 'attending'}
+
+# Replay the RSVP set changes of event_updates (made against original) onto the current event: members 
+# added or removed are, the others keep their current RSVP. A user added to one set leaves the other
+def rebaseRsvpUpdates(event_updates, original, current):
+  rebased = dict(event_updates)
+  added = {}
+  for k in EVENT_RSVP_SETS:
+    if k in event_updates:
+      new = set(event_updates[k] or ()) - {'placeholder'}
+      old = set(original.get(k) or ()) - {'placeholder'}
+      added[k] = new - old
+      rebased[k] = (set(current.get(k) or ()) - {'placeholder'} - (old - new)) | added[k]
+  for k, other in EVENT_RSVP_SETS.items():
+    if added.get(k) and added[k] & set(rebased.get(other, current.get(other)) or ()):
+      rebased[other] = set(rebased.get(other, current.get(other)) or ()) - {'placeholder'} - added[k]
+  return rebased
+# Secondary index keys that may be blank on an event (stored by omitting the attribute)
+EVENT_INDEX_KEYS = {'host'}
+
+# Build the UpdateExpression, ExpressionAttributeNames and ExpressionAttributeValues for an 
+# event update. A value of None removes the attribute.
+# When the current event is supplied, unchanged attributes (per compareAttributes) are skipped 
+# and set attributes are updated with ADD/DELETE of only the members that changed, so the 
+# write is proportional to the change rather than the size of the set. DynamoDB does not allow 
+# ADD and DELETE on the same attribute in one expression, so a set that gains and loses 
+# members falls back to SET. An empty index key (host) is removed rather than set to ''.
+# With conditioned=True (and the current event), a ConditionExpression requires the RSVP sets to still 
+# hold the members the delta was computed from: each added member is in neither RSVP set, each removed 
+# one is still in its set and a set rewritten with SET has no other members.
+# Returns None if there is nothing to update
+def eventUpdateExpression(event_updates, current=None, conditioned=False):
+  # date_utc (the date index sort key) follows date
+  if event_updates.get('date') and 'date_utc' not in event_updates:
+    event_updates = {**event_updates, 'date_utc': utcSortKey(event_updates['date'])}
+  if current is not None:
+    diff = compareAttributes({k: current[k] for k in event_updates if k in current}, event_updates)
+    changed = {**diff['added'], **diff['modified']}
+    event_updates = {k: v for k, v in event_updates.items() if k in changed}
+
+  clauses = {'SET': [], 'ADD': [], 'DELETE': [], 'REMOVE': []}
+  names = {}
+  values = {}
+  conditions = []
+  condition_names = set()
+
+  def memberCondition(k, members, present):
+    names[f'#{k}'] = k
+    condition_names.add(f'#{k}')
+    for member in sorted(members):
+      value = f':{k}_{len(values)}'
+      values[value] = member
+      conditions.append(f'contains(#{k}, {value})' if present else f'NOT contains(#{k}, {value})')
+
+  for k, v in event_updates.items():
+    names[f'#{k}'] = k
+    if v is None or (k in EVENT_INDEX_KEYS and v == ''):
+      clauses['REMOVE'].append(f'#{k}')
+      continue
+    if k == 'finalScore' and v != '':
+      v = toDynamoNative(v)
+    if k in EVENT_SET_ATTRIBUTES and isinstance(v, (set, list, tuple)):
+      new = set(v) - {'placeholder'}
+      old = set(current[k]) - {'placeholder'} if current is not None and isinstance(current.get(k), (set, list)) else None
+      if conditioned and k in EVENT_RSVP_SETS and old is not None and new != old:
+        memberCondition(k, new - old, present=False)
+        memberCondition(k, old - new if not (new - old and old - new) else old, present=True)
+        other = EVENT_RSVP_SETS[k]
+        # Added members that were in the other set are conditioned there if the update removes them
+        memberCondition(other, (new - old) - set(current.get(other) or ()), present=False)
+        if new - old and old - new:
+          values[f':{k}_size'] = len(old) + 1
+          conditions.append(f'size(#{k}) <= :{k}_size')
+      if old is not None and not (new - old and old - new):
+        if new - old:
+          clauses['ADD'].append(f'#{k} :{k}')
+          values[f':{k}'] = new - old
+        elif old - new:
+          clauses['DELETE'].append(f'#{k} :{k}')
+          values[f':{k}'] = old - new
+        elif f'#{k}' not in condition_names:
+          del names[f'#{k}']
+        continue
+      if k in EVENT_PLACEHOLDER_SETS:
+        v = new | {'placeholder'}
+      elif not new:
+        clauses['REMOVE'].append(f'#{k}')
+        continue
+      else:
+        v = new
+    clauses['SET'].append(f'#{k} = :{k}')
+    values[f':{k}'] = v
+
+  update_expression = ' '.join(f'{action} {", ".join(parts)}' for action, parts in clauses.items() if parts)
+  if not update_expression:
+    return None
+  expression = {
+    'UpdateExpression': update_expression,
+    'ExpressionAttributeNames': names,
+  }
+  if values:
+    expression['ExpressionAttributeValues'] = values
+  if conditions:
+    expression['ConditionExpression'] = ' AND '.join(conditions)
+  return expression
+
+# Apply updates to multiple events. Updates are sent concurrently (bounded by max_workers) 
+# through a single low-level client (clients are thread safe, resources are not). With 
+# transactional=True each chunk of up to 100 events is written with TransactWriteItems, 
+# so a chunk is applied all-or-nothing
+def applyEventUpdates(event_updates, current_events={}, transactional=False, max_workers=8):
+  from concurrent.futures import ThreadPoolExecutor, as_completed
+  from boto3.dynamodb.types import TypeSerializer
+
+  serializer = TypeSerializer()
+  requests = {}
+  for event_id, event_update in event_updates.items():
+    if not event_update: 
+      print(f"No updates for event {event_id}")
+      continue
+    expression = eventUpdateExpression(event_update, current=current_events.get(event_id))
+    if not expression:
+      print(f"Event {event_id} unchanged")
+      continue
+    if 'ExpressionAttributeValues' in expression:
+      expression['ExpressionAttributeValues'] = {k: serializer.serialize(v) for k, v in expression['ExpressionAttributeValues'].items()}
+    requests[event_id] = {
+      'TableName': env.TABLE_NAME,
+      'Key': {'event_id': {'S': event_id}},
+      'ConditionExpression': 'attribute_exists(event_id)',
+      **expression
+    }
+  if not requests: return
+
+  ddb = boto3.client('dynamodb', region_name='us-east-1')
+  if transactional:
+    chunks = [list(requests.items())[i:i+100] for i in range(0, len(requests), 100)]
+    tasks = {
+      f'transaction {i+1}/{len(chunks)} ({len(chunk)} events)': (lambda chunk=chunk: ddb.transact_write_items(TransactItems=[{'Update': request} for _, request in chunk]))
+      for i, chunk in enumerate(chunks)
+    }
+  else:
+    tasks = {event_id: (lambda request=request: ddb.update_item(**request)) for event_id, request in requests.items()}
+
+  errors = {}
+  with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+    futures = {executor.submit(task): name for name, task in tasks.items()}
+    for future in as_completed(futures):
+      try:
+        future.result()
+        print(f'Event update {futures[future]} applied')
+      except Exception as e:
+        errors[futures[future]] = str(e)
+  if errors:
+    print(json.dumps({'ERROR': 'Event updates failed', 'errors': errors, 'event_updates': event_updates}, default=ddb_default))
+    raise Exception(f'{len(errors)} of {len(tasks)} event update(s) failed')
+## def applyEventUpdates(event_updates)
+
 
 def deleteEvent(event_id):   
   ddb = boto3.resource('dynamodb', region_name='us-east-1')
@@ -1646,125 +2407,388 @@ def deleteEvent(event_id):
   response = table.delete_item(
     Key={ 'event_id': event_id },
     ConditionExpression='attribute_exists (event_id)',
+    ReturnValues='ALL_OLD',
   )
+  syncAttendance(previous=response.get('Attributes'))
   return response
 ## def deleteEvent(event_id)
 
-def getEvent(event_id, attributes=[], as_json=False):
+def getEvent(event_id, attributes=[], as_json=False, resolve_pools=False):
   param = {
-    "KeyConditionExpression": Key('event_id').eq(event_id)
+    'TableName': env.TABLE_NAME,
+    'Key': {'event_id': {'S': event_id}},
   }
   if attributes:
-    param['ProjectionExpression'] = ','.join([f'#{k}' for k in attributes])
-    param['ExpressionAttributeNames'] = {f'#{k}': k for k in attributes}
+    param.update(projectionArgs(attributes))
 
-  ddb = boto3.resource('dynamodb', region_name='us-east-1')
-  table = ddb.Table(env.TABLE_NAME)
-  response = table.query(**param)
-  if len(response['Items']) > 1:
-    raise Exception('More than one event found with that ID')
-  elif len(response['Items']) == 0:
+  client = boto3.client('dynamodb', region_name='us-east-1')
+  response = client.get_item(**param)
+  if 'Item' not in response:
     raise Exception(f"No event found with ID '{event_id}'")
   
-  for event in response['Items']:
-    try:
-      if 'not_attending' in event and 'placeholder' in event['not_attending']: event['not_attending'].remove('placeholder') 
-      if 'attending' in event and 'placeholder' in event['attending']: event['attending'].remove('placeholder')
-      if 'player_pool' in event and 'placeholder' in event['player_pool']: event['player_pool'].remove('placeholder') 
-      if 'finalScore' in event and event['finalScore']: event['finalScore'] = json.loads(event['finalScore'])
-    except:
-      print(json.dumps(event, indent=2, default=ddb_default))
-      raise
+  event = Event.from_ddb(response['Item'], projected=bool(attributes))
+  if resolve_pools:
+    resolvePoolGroups([event])
   if as_json:
-     return json.dumps(response['Items'][0], default=ddb_default)
+    return EVENT_JSON_ENCODER.encode(event.to_api())
   else:
-    return response['Items'][0]
-
+    return event
+
+# ProjectionExpression for the given attributes (through placeholders, as several are reserved words)
+def projectionArgs(fields):
+  fields = sorted(fields)
+  return {
+    'ProjectionExpression': ', '.join(f'#f{i}' for i in range(len(fields))),
+    'ExpressionAttributeNames': {f'#f{i}': field for i, field in enumerate(fields)},
+  }
 
-def getEvents(dateGte = None, dateLte = None, event_type='GameKnight', as_json=False, tableType=env.MODE):  
+# Low-level Query arguments for boto3 Key(...)/Attr(...) conditions
+def conditionArgs(key_condition, filter_condition=None):
+  builder = ConditionExpressionBuilder()
+  serializer = TypeSerializer()
+  args = {'ExpressionAttributeNames': {}, 'ExpressionAttributeValues': {}}
+  for arg, condition in [('KeyConditionExpression', key_condition), ('FilterExpression', filter_condition)]:
+    if condition is None: continue
+    expression = builder.build_expression(condition, is_key_condition=(arg == 'KeyConditionExpression'))
+    args[arg] = expression.condition_expression
+    args['ExpressionAttributeNames'].update(expression.attribute_name_placeholders)
+    args['ExpressionAttributeValues'].update({name: serializer.serialize(value) for name, value in expression.attribute_value_placeholders.items()})
+  return args
+
+
+# Stage from which each events table index is read. An existing stack reaches the date_utc indexes one 
+# deploy at a time (a stack update can only create or delete one GSI): EventTypeByDateUtc is created at 
+# stage 1 and read from stage 2, after migrateEvents has backfilled date_utc; the legacy EventTypeByDate 
+# (sorted by the local `date`) is read until then and dropped at stage 5. Queries for an index that isn't 
+# there yet go to the event type index and filter instead
+EVENT_INDEX_STAGES = {'EventTypeByDateUtc': 2, 'ReservedByDate': 2, 'HostByDate': 3, 'BggIdByDate': 4}
+
+def eventIndexReady(index_name):
+  return env.EVENT_INDEX_STAGE >= EVENT_INDEX_STAGES.get(index_name, 0)
+
+# Local `date` bound for the legacy EventTypeByDate index from a utcSortKey
+def localDateKey(sort_key):
+  return datetime.fromisoformat(sort_key).astimezone(ZoneInfo('America/Denver')).isoformat()[:19]
+
+# reserved_only: query the sparse ReservedByDate index (see isReservedPoolEvent) instead of all events
+# fields: only project these attributes (the table/index keys are always included).
+# limit: return a single page of at most `limit` events as (events, cursor), where cursor is 
+# None on the last page and is passed back as `cursor` to continue. Otherwise all pages are read
+# host / bgg_id / player: only events hosted by, of the game, or attended by (via the attendance table) 
+# the given user/game. Each is read from its own index rather than filtering the whole date range
+# visible_to: drop Private events whose player pool doesn't include this user ('' drops all Private events)
+# scores: also read finalScore when no fields are given. Bulk reads leave it out by default; callers that 
+# write whole events back (modifyEvent) must pass scores=True or the scores would be dropped
+def getEvents(dateGte = None, dateLte = None, event_type='GameKnight', as_json=False, tableType=env.MODE, resolve_pools=False, reserved_only=False, month=None, fields=None, limit=None, cursor=None, host=None, bgg_id=None, player=None, visible_to=None, scores=False):  
 
   match tableType:
     case env.MODE: table_name=env.TABLE_NAME
     case 'prod': table_name=env.TABLE_NAME_PROD
     case _: raise Exception("Invalid table name")
       
-  KeyConditionExpression=(Key('event_type').eq(event_type))
-  if dateGte:
-    if not isinstance(dateGte, str):
-      dateGte = dateGte.isoformat()
-    KeyConditionExpression = KeyConditionExpression & Key('date').gte(dateGte)
-  if dateLte:
-    if not isinstance(dateLte, str):
-      dateLte = dateLte.isoformat()
-    KeyConditionExpression = KeyConditionExpression & Key('date').lte(dateLte)
+  filters = []
+  if player:
+    if tableType != env.MODE: raise Exception("Player filter is only available for the current table")
+    index_name = 'AttendanceByDate'
+    KeyConditionExpression=(Key('user_id').eq(player))
+  elif reserved_only and eventIndexReady('ReservedByDate'):
+    index_name = 'ReservedByDate'
+    KeyConditionExpression=(Key('reserved_event_type').eq(event_type))
+  elif host and eventIndexReady('HostByDate'):
+    index_name = 'HostByDate'
+    KeyConditionExpression=(Key('host').eq(host))
+  elif bgg_id and eventIndexReady('BggIdByDate'):
+    index_name = 'BggIdByDate'
+    KeyConditionExpression=(Key('bgg_id').eq(int(bgg_id)))
+  else:
+    index_name = 'EventTypeByDateUtc' if eventIndexReady('EventTypeByDateUtc') else 'EventTypeByDate'
+    KeyConditionExpression=(Key('event_type').eq(event_type))
+  # Filters the chosen index can't express as key conditions
+  if index_name in ['HostByDate', 'BggIdByDate', 'AttendanceByDate']:
+    filters.append(Attr('event_type').eq(event_type))
+  if host and index_name != 'HostByDate':
+    filters.append(Attr('host').eq(host))
+  if bgg_id and index_name != 'BggIdByDate':
+    filters.append(Attr('bgg_id').eq(int(bgg_id)))
+  if reserved_only and index_name != 'ReservedByDate':
+    filters.append(Attr('reserved_event_type').eq(event_type))
+  # The date range is a single condition on the UTC sort key (see utcSortKey); month is a local calendar month, e.g. '2026-10'
+  lower = utcSortKey(dateGte) if dateGte else None
+  upper = utcSortKey(dateLte) if dateLte else None
+  if month:
+    month_lower, month_upper = monthSortKeys(month)
+    lower = max(lower or month_lower, month_lower)
+    upper = min(upper or month_upper, month_upper)
+  date_key = 'date_utc'
+  if index_name == 'EventTypeByDate':
+    # '~' sorts after any offset, so an upper bound includes events at that local minute
+    date_key, lower, upper = 'date', lower and localDateKey(lower), upper and localDateKey(upper) + '~'
+  if lower and upper:
+    KeyConditionExpression = KeyConditionExpression & Key(date_key).between(lower, upper)
+  elif lower:
+    KeyConditionExpression = KeyConditionExpression & Key(date_key).gte(lower)
+  elif upper:
+    KeyConditionExpression = KeyConditionExpression & Key(date_key).lte(upper)
+
+
+  if player:
+    # Attendance items only carry the keys, date and event_type; host/bgg_id/visibility are checked on the events
+    filters = filters[:1]
+  elif visible_to == '':
+    filters.append(Attr('format').ne('Private'))
+  elif visible_to is not None:
+    filters.append(Attr('format').ne('Private') | Attr('player_pool').contains(visible_to))
+  FilterExpression = None
+  for condition in filters:
+    FilterExpression = condition if FilterExpression is None else FilterExpression & condition
+
+  query_args = {
+    'TableName': env.ATTENDANCE_TABLE_NAME if player else table_name,
+    'IndexName': index_name,
+    **conditionArgs(KeyConditionExpression, FilterExpression),
+  }
+  projection = None
+  if player:
+    projection = projectionArgs(['event_id'])
+  elif fields:
+    fields = {'event_id', 'event_type', 'date', *fields}
+    if reserved_only: fields.add('reserved_event_type')
+    # Group-marker pools can only be resolved if their markers are projected too
+    fields.update(f'{pool_key}_group' for pool_key in OPEN_POOL_GROUPS if pool_key in fields)
+    projection = projectionArgs(fields)
+  elif not scores:
+    projection = projectionArgs(EVENT_LIST_FIELDS)
+  if projection:
+    query_args['ProjectionExpression'] = projection['ProjectionExpression']
+    query_args['ExpressionAttributeNames'].update(projection['ExpressionAttributeNames'])
+  else:
+    query_args['Select'] = 'ALL_ATTRIBUTES'
+  if limit:
+    query_args['Limit'] = limit
+    if cursor:
+      query_args['ExclusiveStartKey'] = decodeCursor(cursor)
+
+  client = boto3.client('dynamodb', region_name='us-east-1')
+  response = client.query(**query_args)
+  items = response['Items']
+  while not limit and 'LastEvaluatedKey' in response:
+    response = client.query(**query_args, ExclusiveStartKey=response['LastEvaluatedKey'])
+    items.extend(response['Items'])
+  if player:
+    # The attributes filtered on here are always projected
+    event_fields = fields and {*fields, 'host', 'bgg_id', 'format', 'player_pool'}
+    events = [
+      event for event in getEventsByIds([item['event_id']['S'] for item in items], fields=event_fields, resolve_pools=resolve_pools, scores=scores)
+      if (not host or event.get('host') == host) 
+      and (not bgg_id or event.get('bgg_id') == int(bgg_id)) 
+      and isVisibleTo(event, visible_to)
+    ]
+  else:
+    events = [Event.from_ddb(item, projected=bool(fields)) for item in items]
+    if resolve_pools:
+      resolvePoolGroups(events)
+  if as_json:
+    events = encodeEvents(events)
+  if limit:
+    return events, encodeCursor(response.get('LastEvaluatedKey'))
+  return events
+
+# user_id None: no restriction
+def isVisibleTo(event, user_id):
+  return user_id is None or event.get('format') != 'Private' or user_id in event.get('player_pool', ())
+
+# Fetch a known set of events with BatchGetItem (up to 100 keys per request), optionally projected 
+# to `fields` (event_id is always included). UnprocessedKeys are retried with exponential backoff.
+# Events are returned in the order of event_ids; ids that don't exist are skipped. scores: as for getEvents
+def getEventsByIds(event_ids, fields=None, resolve_pools=False, max_attempts=8, scores=False):
+  import random
+  event_ids = list(dict.fromkeys(event_ids))
+  projection = {}
+  if fields:
+    fields = {'event_id', *fields}
+    fields.update(f'{pool_key}_group' for pool_key in OPEN_POOL_GROUPS if pool_key in fields)
+    projection = projectionArgs(fields)
+  elif not scores:
+    projection = projectionArgs(EVENT_LIST_FIELDS)
+
+  client = boto3.client('dynamodb', region_name='us-east-1')
+  found = {}
+  for i in range(0, len(event_ids), 100):
+    request_items = {env.TABLE_NAME: {'Keys': [{'event_id': {'S': event_id}} for event_id in event_ids[i:i+100]], **projection}}
+    attempt = 0
+    while request_items:
+      response = client.batch_get_item(RequestItems=request_items)
+      for item in response['Responses'].get(env.TABLE_NAME, []):
+        found[item['event_id']['S']] = item
+      request_items = response.get('UnprocessedKeys')
+      if request_items:
+        attempt += 1
+        if attempt >= max_attempts:
+          raise Exception(f"BatchGetItem: {len(request_items[env.TABLE_NAME]['Keys'])} keys still unprocessed after {attempt} attempts")
+        time.sleep(random.uniform(0, min(0.05 * 2 ** attempt, 2)))
+
+  events = [Event.from_ddb(found[event_id], projected=bool(fields)) for event_id in event_ids if event_id in found]
+  if resolve_pools:
+    resolvePoolGroups(events)
+  return events
+
+# Opaque pagination cursor for a (low-level) DynamoDB LastEvaluatedKey
+def encodeCursor(last_evaluated_key):
+  if not last_evaluated_key:
+    return None
+  return base64.urlsafe_b64encode(json.dumps(last_evaluated_key, separators=(',', ':')).encode('utf-8')).decode('utf-8')
+
+def decodeCursor(cursor):
+  return json.loads(base64.urlsafe_b64decode(cursor.encode('utf-8')))
+
+# Attendance index: one item per attending (user_id, event_id) with the event date, so the events 
+# a player attends are read from the AttendanceByDate index instead of scanning every event.
+# Kept in sync from the event/RSVP writes below; migrateEvents rebuilds it from the events table
+def attendanceItems(event):
+  if not event: return {}
+  return {
+    user_id: {'user_id': user_id, 'event_id': event['event_id'], 'date': event['date'], 'date_utc': utcSortKey(event['date']), 'event_type': event.get('event_type', 'GameKnight')}
+    for user_id in event.get('attending', ()) if user_id != 'placeholder'
+  }
 
+def syncAttendance(previous=None, current=None):
+  previous_items = attendanceItems(previous)
+  current_items = attendanceItems(current)
+  puts = [item for user_id, item in current_items.items() if previous_items.get(user_id) != item]
+  deletes = [item for user_id, item in previous_items.items() if user_id not in current_items]
+  if not puts and not deletes: return
+  ddb = boto3.resource('dynamodb', region_name='us-east-1')
+  table = ddb.Table(env.ATTENDANCE_TABLE_NAME)
+  # The event write has already succeeded; a failure here only leaves the index stale until migrateEvents
+  try:
+    with table.batch_writer() as batch:
+      for item in puts:
+        batch.put_item(Item=item)
+      for item in deletes:
+        batch.delete_item(Key={'user_id': item['user_id'], 'event_id': item['event_id']})
+  except Exception as e:
+    print(f"WARNING: attendance index not updated for event '{(current or previous)['event_id']}': {e}")
 
+def rebuildAttendance(events):
   ddb = boto3.resource('dynamodb', region_name='us-east-1')
-  table = ddb.Table(table_name)
-  response = table.query(
-    IndexName='EventTypeByDate',
-    Select='ALL_ATTRIBUTES',
-    KeyConditionExpression=KeyConditionExpression,
-  )
-  for event in response['Items']:
+  table = ddb.Table(env.ATTENDANCE_TABLE_NAME)
+  expected = {}
+  for event in events:
+    for user_id, item in attendanceItems(event).items():
+      expected[(user_id, event['event_id'])] = item
+  stale = []
+  scan_args = {'ProjectionExpression': 'user_id, event_id'}
+  while True:
+    response = table.scan(**scan_args)
+    stale.extend((item['user_id'], item['event_id']) for item in response['Items'] if (item['user_id'], item['event_id']) not in expected)
+    if 'LastEvaluatedKey' not in response: break
+    scan_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+  with table.batch_writer() as batch:
+    for item in expected.values():
+      batch.put_item(Item=item)
+    for user_id, event_id in stale:
+      batch.delete_item(Key={'user_id': user_id, 'event_id': event_id})
+  print(f'Attendance index rebuilt: {len(expected)} items, {len(stale)} stale items removed')
+
+
+# Public events are published as whole-month shards (events/YYYY-MM.json) starting with the month of the 
+# 14 day lookback, plus events/manifest.json listing each shard's key, sha256 and event count.
+# With changed_dates only the months containing those dates are re-queried and republished; 
+# otherwise (or while the legacy events.json is still published) every month is rebuilt and 
+# unchanged shards are skipped by the publish layer's hash check
+def eventShardKey(month):
+  return f'events/{month}.json'
+
+def updatePublicEventsJson(changed_dates=None):
+  upcoming_and_recent = datetime.now(ZoneInfo("America/Denver")).date() - timedelta(days=14)
+  first_month = upcoming_and_recent.isoformat()[:7]
+
+  manifest = None
+  if changed_dates is not None:
     try:
-      if 'placeholder' in event['not_attending']: event['not_attending'].remove('placeholder') 
-      if 'placeholder' in event['attending']: event['attending'].remove('placeholder')
-      if 'placeholder' in event['player_pool']: event['player_pool'].remove('placeholder') 
-      if 'finalScore' in event and event['finalScore']: event['finalScore'] = json.loads(event['finalScore'])
-    except Exception as e:
-      if 'finalScore' in event: print(event['finalScore'])
-      print(json.dumps(event, default=ddb_default))
-      raise
-  if as_json:
-     return json.dumps(response['Items'], default=ddb_default)
+      # Always revalidate: other containers may have just published other months
+      manifest = getJsonS3(env.S3_BUCKET, eventShardKey('manifest'), max_age=0)
+    except botocore.exceptions.ClientError as e:
+      if e.response['Error']['Code'] not in ['NoSuchKey', '404', 'AccessDenied']:
+        raise
+      print('events/manifest.json not found; rebuilding all shards')
+
+  full_rebuild = manifest is None
+  if full_rebuild:
+    future_events = getEvents(dateGte = f'{first_month}-01', resolve_pools=True, scores=True)
+    shards = {}
+    for event in future_events:
+      if event['format'] == 'Private': continue
+      shards.setdefault(event['date'][:7], []).append(event.to_public())
   else:
-    return response['Items']
-
-
-def updatePublicEventsJson():
-  upcoming_and_recent = datetime.now(ZoneInfo("America/Denver")).date() - timedelta(days=14)
-  future_events = getEvents(dateGte = upcoming_and_recent.isoformat())
-  future_events = [event for event in future_events if event['format'] != 'Private']
-  s3 = boto3.client('s3')
-  s3.put_object(
-    Body=json.dumps(future_events, default=ddb_default),
-    Bucket=env.S3_BUCKET,
-    Key='events.json',
-    ContentType='application/json',
-    CacheControl='no-cache',
-    # CacheControl='max-age=0, no-cache, no-store, must-revalidate',
-  )
-  print('events.json updated')
+    shards = {}
+    for month in sorted({date[:7] for date in changed_dates if date and date[:7] >= first_month}):
+      events = getEvents(month=month, resolve_pools=True, scores=True)
+      shards[month] = [event.to_public() for event in events if event['format'] != 'Private']
+
+  publishJsonS3(*[(env.S3_BUCKET, eventShardKey(month), events) for month, events in shards.items() if events])
+
+  published_shards = {
+    month: {
+      'key': eventShardKey(month),
+      'sha256': _s3_published[(env.S3_BUCKET, eventShardKey(month))]['sha256'],
+      'count': len(events),
+    }
+    for month, events in shards.items() if events
+  }
+  # A full rebuild replaces the manifest; otherwise the published months are merged into the current one 
+  # (conditionally, so months published meanwhile by other containers are kept). Months that left the 
+  # lookback window or no longer have events are dropped
+  def mergeManifest(current):
+    manifest_shards = {} if full_rebuild or current is None else current.get('shards', {})
+    manifest_shards = {month: shard for month, shard in manifest_shards.items() if month >= first_month and month not in shards}
+    manifest_shards.update(published_shards)
+    return {'first_month': first_month, 'shards': dict(sorted(manifest_shards.items()))}
+  updateJsonS3(env.S3_BUCKET, eventShardKey('manifest'), mergeManifest)
+
+  # The legacy events.json concatenates the shards the manifest lists: the months just queried and the 
+  # others as published (a conditional GET each). It's rebuilt from the manifest read inside the 
+  # conditional write, so a container that publishes it after another has also seen the other's months
+  def legacyEvents(current):
+    manifest = getJsonS3(env.S3_BUCKET, eventShardKey('manifest'), max_age=0, copy=False)
+    return [
+      event
+      for month in sorted(manifest['shards'])
+      for event in (shards[month] if month in shards else getJsonS3(env.S3_BUCKET, manifest['shards'][month]['key'], max_age=0, copy=False))
+      if event['date'] >= upcoming_and_recent.isoformat()
+    ]
+  if env.PUBLIC_EVENTS_LEGACY:
+    updateJsonS3(env.S3_BUCKET, 'events.json', legacyEvents)
 
 
 def updatePlayersGroupsJson(players_groups=None):
   if not players_groups:
     players_groups = getAllUsersInAllGroups()
-  s3 = boto3.client('s3')
-  s3.put_object(
-    Body=json.dumps(players_groups, indent=2, default=ddb_default),
-    Bucket=env.BACKEND_BUCKET,
-    Key='players_groups.json',
-    ContentType='application/json',
-    CacheControl='no-cache'
+  # Backend copy keeps full user details; the public copy is reduced
+  publishJsonS3(
+    (env.BACKEND_BUCKET, 'players_groups.json', players_groups),
+    (env.S3_BUCKET, 'players_groups.json', reduceUserAttrib(players_groups)),
   )
-  print('Backend players_groups.json updated')
-
-  s3.put_object(
-    Body=json.dumps(reduceUserAttrib(players_groups), indent=2, default=ddb_default),
-    Bucket=env.S3_BUCKET,
-    Key='players_groups.json',
-    ContentType='application/json',
-    CacheControl='no-cache'
-  )
-  print('Public players_groups.json updated')
   return players_groups
   
 
 
+# Condition for a user to change their own RSVP: the event exists, hasn't started and the user is 
+# in its player/organizer pool, either explicitly or through one of their groups (OPEN_POOL_GROUPS).
+# Group membership is read from the cached players_groups.json, the same roster updatePlayerPools 
+# fills the reserved pools from, not from the token's cognito:groups claim (stale until it expires).
+# Events without date_utc (not backfilled by migrateEvents yet) are checked against their local date
+def rsvpCondition(user_id):
+  now = utcSortKey(datetime.now(timezone.utc))
+  upcoming = (Attr('date_utc').exists() & Attr('date_utc').gte(now)) | (Attr('date_utc').not_exists() & Attr('date').gte(localDateKey(now)))
+  eligible = Attr('player_pool').contains(user_id) | Attr('organizer_pool').contains(user_id)
+  groups = getJsonS3(env.S3_BUCKET, 'players_groups.json', copy=False)['Groups']
+  user_groups = sorted(group for group in OPEN_POOL_GROUPS.values() if user_id in groups.get(group, ()))
+  if user_groups:
+    eligible = eligible | Attr('player_pool_group').is_in(user_groups) | Attr('organizer_pool_group').is_in(user_groups)
+  return Attr('event_id').exists() & upcoming & eligible
+
 def updateRSVP(event_id, user_id, rsvp):
-  now_iso_mt = datetime.now(ZoneInfo("America/Denver")).replace(microsecond=0).isoformat()
   if rsvp == 'attending':
     delete = 'not_attending'
   elif rsvp == 'not_attending':
@@ -1774,29 +2798,37 @@ def updateRSVP(event_id, user_id, rsvp):
   response = table.update_item(
     Key={ 'event_id': event_id },
     UpdateExpression=f'ADD {rsvp} :user_id DELETE {delete} :user_id',
-    ConditionExpression=(
-      Attr('event_id').exists() & Attr('date').gte(now_iso_mt) &
-      (Attr('player_pool').contains(user_id) | Attr('organizer_pool').contains(user_id))),
+    ConditionExpression=rsvpCondition(user_id),
     ExpressionAttributeValues={
       ':user_id': set([user_id])
-    }
+    },
+    # Return the pre-image so callers don't need a separate getEvent round trip
+    ReturnValues='ALL_OLD'
   )
+  previous = response['Attributes']
+  attending = set(previous.get('attending', set()))
+  if rsvp == 'attending':
+    attending.add(user_id)
+  else:
+    attending.discard(user_id)
+  syncAttendance(previous=previous, current={**previous, 'attending': attending})
   return response
 
 def deleteRSVP(event_id, user_id, rsvp):
-  now_iso_mt = datetime.now(ZoneInfo("America/Denver")).replace(microsecond=0).isoformat()
   ddb = boto3.resource('dynamodb', region_name='us-east-1')
   table = ddb.Table(env.TABLE_NAME)
   response = table.update_item(
     Key={ 'event_id': event_id },
     UpdateExpression=f'DELETE {rsvp} :user_id',
-    ConditionExpression=(
-      Attr('event_id').exists() & Attr('date').gte(now_iso_mt) &
-      (Attr('player_pool').contains(user_id) | Attr('organizer_pool').contains(user_id))),
+    ConditionExpression=rsvpCondition(user_id),
     ExpressionAttributeValues={
       ':user_id': set([user_id])
-    }
+    },
+    ReturnValues='ALL_OLD'
   )
+  if rsvp == 'attending':
+    previous = response['Attributes']
+    syncAttendance(previous=previous, current={**previous, 'attending': set(previous.get('attending', set())) - {user_id}})
   return response
 
 def is_after_sunday_midnight_of(given_date):
@@ -1820,19 +2852,179 @@ def is_after_6p_day_of(given_date):
     return datetime.now(tzinfo) > six_pm
   return datetime.now(ZoneInfo("America/Denver")) > six_pm
   
-def getJsonS3(bucket_name, file_path):
-  s3 = boto3.resource('s3')
-  content_object = s3.Object(bucket_name, file_path)
-  file_content = content_object.get()['Body'].read().decode('utf-8')
-  return json.loads(file_content)
+# Per-container cache of parsed S3 JSON documents, keyed by (bucket, key).
+# Entries younger than S3_JSON_CACHE_TTL seconds are served as-is; older entries are
+# revalidated with a conditional GET (If-None-Match) so unchanged documents skip the download and parse
+S3_JSON_CACHE_TTL = 15
+_s3_json_cache = {}
+
+def getJsonS3(bucket_name, file_path, copy=True, max_age=S3_JSON_CACHE_TTL):
+  cache_key = (bucket_name, file_path)
+  cached = _s3_json_cache.get(cache_key)
+  now = time.monotonic()
+  if cached is None or now - cached['checked'] >= max_age:
+    s3 = boto3.client('s3')
+    get_args = {'Bucket': bucket_name, 'Key': file_path}
+    if cached is not None and cached['etag']:
+      get_args['IfNoneMatch'] = cached['etag']
+    try:
+      response = s3.get_object(**get_args)
+      file_content = response['Body'].read().decode('utf-8')
+      cached = {'data': json.loads(file_content), 'etag': response.get('ETag'), 'checked': now}
+    except botocore.exceptions.ClientError as e:
+      if cached is None or e.response['Error']['Code'] not in ['304', 'NotModified']:
+        raise
+      cached['checked'] = now
+    _s3_json_cache[cache_key] = cached
+  # Callers that only read the document can skip the copy
+  return deepcopy(cached['data']) if copy else cached['data']
+
+# Write-through for documents we just uploaded, so the next read in this container doesn't go back to S3
+def cacheJsonS3(bucket_name, file_path, body, response):
+  _s3_json_cache[(bucket_name, file_path)] = {
+    'data': json.loads(body),
+    'etag': response.get('ETag'),
+    'checked': time.monotonic()
+  }
+
+# Content-addressed publishing of generated JSON artifacts.
+# Documents are serialized compactly and hashed; the PUT is skipped when the hash matches the 'sha256' 
+# metadata of the object currently in S3 (always HEADed: another container may have published since).
+# Public bucket artifacts also get precompressed copies (<key>.gz, and <key>.br when brotli is available)
+try:
+  import brotli
+except ImportError:
+  brotli = None
+_s3_published = {}
+
+def publish_default(obj):
+  # Sets are sorted so identical content always hashes the same
+  if isinstance(obj, set):
+    return sorted(obj, key=str)
+  return ddb_default(obj)
+
+def encodeJsonArtifact(data):
+  return json.dumps(data, separators=(',', ':'), default=publish_default).encode('utf-8')
+
+def publishedHash(s3, bucket_name, file_path):
+  try:
+    response = s3.head_object(Bucket=bucket_name, Key=file_path)
+  except botocore.exceptions.ClientError as e:
+    if e.response['Error']['Code'] in ['404', 'NoSuchKey', 'NotFound']:
+      _s3_published.pop((bucket_name, file_path), None)
+      return None
+    raise
+  sha256 = response.get('Metadata', {}).get('sha256')
+  _s3_published[(bucket_name, file_path)] = {'sha256': sha256, 'etag': response.get('ETag')}
+  return sha256
+
+# artifacts: (bucket_name, file_path, data) tuples. Returns {(bucket_name, file_path): True if uploaded, False if unchanged}
+def publishJsonS3(*artifacts, max_workers=8):
+  import gzip
+  import hashlib
+  from concurrent.futures import ThreadPoolExecutor
+
+  s3 = boto3.client('s3')
+  def check(artifact):
+    bucket_name, file_path, data = artifact
+    body = encodeJsonArtifact(data)
+    sha256 = hashlib.sha256(body).hexdigest()
+    return bucket_name, file_path, body, sha256, publishedHash(s3, bucket_name, file_path) == sha256
+
+  def put(bucket_name, file_path, body, sha256, content_encoding=None):
+    return putJsonArtifact(s3, bucket_name, file_path, body, sha256, content_encoding)
+
+  with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    checked = list(executor.map(check, artifacts))
+    puts = {}
+    encoded_puts = []
+    for bucket_name, file_path, body, sha256, unchanged in checked:
+      if unchanged:
+        print(f"{file_path} unchanged in {bucket_name}. Skipping")
+        continue
+      puts[(bucket_name, file_path)] = executor.submit(put, bucket_name, file_path, body, sha256)
+      if bucket_name == env.S3_BUCKET:
+        encoded_puts.append(executor.submit(put, bucket_name, f"{file_path}.gz", gzip.compress(body, mtime=0), sha256, 'gzip'))
+        if brotli is not None:
+          encoded_puts.append(executor.submit(put, bucket_name, f"{file_path}.br", brotli.compress(body), sha256, 'br'))
+  # Leaving the executor waits for every PUT; .result() re-raises any failure
+  for future in encoded_puts:
+    future.result()
+  results = {}
+  for bucket_name, file_path, body, sha256, unchanged in checked:
+    if unchanged:
+      published = _s3_published[(bucket_name, file_path)]
+    else:
+      response = puts[(bucket_name, file_path)].result()
+      published = _s3_published[(bucket_name, file_path)] = {'sha256': sha256, 'etag': response.get('ETag')}
+      print(f"{file_path} published to {bucket_name}")
+    cacheJsonS3(bucket_name, file_path, body, published)
+    results[(bucket_name, file_path)] = not unchanged
+  return results
+
+def putJsonArtifact(s3, bucket_name, file_path, body, sha256, content_encoding=None, **conditions):
+  put_args = {
+    'Body': body,
+    'Bucket': bucket_name,
+    'Key': file_path,
+    'ContentType': 'application/json',
+    'CacheControl': 'no-cache',
+    'Metadata': {'sha256': sha256},
+    **conditions,
+  }
+  if content_encoding:
+    put_args['ContentEncoding'] = content_encoding
+  return s3.put_object(**put_args)
+
+# Read-modify-write of a JSON document that several containers (or functions) update: update(current) 
+# gets the current document (None if there is none) and returns the new one, which is PUT only if the 
+# object is still the version read (If-Match its ETag, If-None-Match when creating); otherwise the 
+# document is read again and update retried. Returns True if uploaded, False if unchanged
+def updateJsonS3(bucket_name, file_path, update, attempts=10):
+  import gzip
+  import hashlib
+
+  s3 = boto3.client('s3')
+  for attempt in range(attempts):
+    try:
+      response = s3.get_object(Bucket=bucket_name, Key=file_path)
+      current, etag = json.loads(response['Body'].read()), response['ETag']
+    except botocore.exceptions.ClientError as e:
+      if e.response['Error']['Code'] not in ['NoSuchKey', '404']:
+        raise
+      current, etag = None, None
+    body = encodeJsonArtifact(update(deepcopy(current)))
+    sha256 = hashlib.sha256(body).hexdigest()
+    if current is not None and body == encodeJsonArtifact(current):
+      print(f"{file_path} unchanged in {bucket_name}. Skipping")
+      cacheJsonS3(bucket_name, file_path, body, {'ETag': etag})
+      return False
+    try:
+      response = putJsonArtifact(s3, bucket_name, file_path, body, sha256, **({'IfMatch': etag} if etag else {'IfNoneMatch': '*'}))
+      break
+    except botocore.exceptions.ClientError as e:
+      if e.response['Error']['Code'] not in ['PreconditionFailed', 'ConditionalRequestConflict', '412', '409']:
+        raise
+      print(f"{file_path} changed concurrently; retrying ({attempt + 1})")
+  else:
+    raise Exception(f"Could not update {file_path} in {bucket_name} after {attempts} attempts")
+  _s3_published[(bucket_name, file_path)] = {'sha256': sha256, 'etag': response.get('ETag')}
+  cacheJsonS3(bucket_name, file_path, body, response)
+  if bucket_name == env.S3_BUCKET:
+    # Precompressed copies of the version just written (a concurrent update may leave them one version behind)
+    putJsonArtifact(s3, bucket_name, f"{file_path}.gz", gzip.compress(body, mtime=0), sha256, 'gzip')
+    if brotli is not None:
+      putJsonArtifact(s3, bucket_name, f"{file_path}.br", brotli.compress(body), sha256, 'br')
+  print(f"{file_path} published to {bucket_name}")
+  return True
 
 def updatePrevSubEvents(events=[], user_cache=True):
   if events == []:
-    events = getEvents() # All
+    events = getEvents(scores=True) # All
   updated_events = set()
 
   if user_cache:
-    user_dict = getJsonS3(env.BACKEND_BUCKET, 'players_groups.json')
+    user_dict = getJsonS3(env.BACKEND_BUCKET, 'players_groups.json', copy=False)
   else:
     user_dict = getAllUsersInAllGroups()
   user_prev_sub_dict = {info['attrib']['custom:prev_sub']: player_id for player_id, info in user_dict['Users'].items() if info['attrib'].get('custom:prev_sub', '') != ''}
@@ -1869,6 +3061,50 @@ def updatePrevSubEvents(events=[], user_cache=True):
       modifyEvent(event,process_bgg_id_image=False)
   return updated_events
 
+# Bring existing events up to the current item layout (idempotent; safe to re-run):
+# - 'reserved_event_type' key of the sparse ReservedByDate index
+# - pool group markers in place of full pools on open eligibility events
+# - finalScore as a native list/map instead of a JSON string
+# - 'date_utc' sort key of the date indexes. Events without it aren't returned by date queries, so
+#   this reads the table with a scan rather than getEvents
+def migrateEvents():
+  events = scanEvents()
+  event_updates = {}
+  for event in events:
+    event_update = {}
+    if event.get('date_utc') != utcSortKey(event['date']):
+      event_update['date_utc'] = utcSortKey(event['date'])
+    if event.has_legacy_score():
+      # Popped so the update isn't diffed away against the (equal) decoded current value
+      event_update['finalScore'] = event.pop('finalScore') or None
+    reserved_event_type = event['event_type'] if isReservedPoolEvent(event) else None
+    if event.get('reserved_event_type') != reserved_event_type:
+      event_update['reserved_event_type'] = reserved_event_type
+    if isOpenEligibility(event):
+      for pool_key, group in OPEN_POOL_GROUPS.items():
+        if event.get(f'{pool_key}_group') != group:
+          event_update[f'{pool_key}_group'] = group
+        if any(user != 'placeholder' for user in event.get(pool_key, ())):
+          event_update[pool_key] = set() if pool_key in EVENT_PLACEHOLDER_SETS else None
+    if event_update:
+      event_updates[event['event_id']] = event_update
+  print(json.dumps({'migrateEvents': event_updates}, default=ddb_default))
+  applyEventUpdates(event_updates, current_events={event['event_id']: event for event in events})
+  rebuildAttendance(events)
+  return list(event_updates)
+
+# Every event in the table (maintenance only; reads use the date indexes)
+def scanEvents():
+  client = boto3.client('dynamodb', region_name='us-east-1')
+  scan_args = {'TableName': env.TABLE_NAME}
+  events = []
+  while True:
+    response = client.scan(**scan_args)
+    events.extend(Event.from_ddb(item) for item in response['Items'])
+    if 'LastEvaluatedKey' not in response: break
+    scan_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+  return events
+
 def admin_set_user_password(user_id, user_pool=env.MODE):
   match user_pool:
     case env.MODE: user_pool_id = env.COGNITO_POOL_ID
@@ -1882,111 +3118,181 @@ def admin_set_user_password(user_id, user_pool=env.MODE):
       Permanent=True
   )
 
-def updatePlayerPools():
-  from collections import defaultdict 
-  players_groups = getJsonS3(env.S3_BUCKET, 'players_groups.json')
+def updatePlayerPools(changed_event_ids=None, changed_users=None, transactional=False):
+  players_groups = getJsonS3(env.S3_BUCKET, 'players_groups.json', copy=False)
   players = players_groups['Groups']['player']
   organizers = players_groups['Groups']['organizer']
+  # Only Reserved events have allocated pools (open events carry group markers set on write)
+  upcomingEvents = getEvents(dateGte=datetime.now(timezone.utc), reserved_only=True)
+  # upcomingEvents = getEvents(dateGte=datetime.now(ZoneInfo("America/Denver")).date()) # 
+
+  event_updates = computePlayerPoolUpdates(
+    upcomingEvents, players, organizers, 
+    changed_event_ids=changed_event_ids, changed_users=changed_users
+  )
+  print(json.dumps({"final event_updates": event_updates}, default=ddb_default))
+  # input("Pause")
+  current_events = {event['event_id']: event for event in upcomingEvents}
+  applyEventUpdates(
+    event_updates, 
+    current_events=current_events, 
+    transactional=transactional
+  )
+  # Dates of the events whose pools changed, so only their public shards are republished
+  return {current_events[event_id]['date'] for event_id in event_updates}
+## end def updatePlayerPools()
+
+# Compute the player/organizer pool (and organizer) updates for the upcoming events.
+# With no delta this is a full recompute of every pool. When the changed events and/or 
+# users are supplied, the (order dependent) organizer allocation pass still runs over the 
+# Reserved events, but pools are only materialized and compared for the changed events 
+# and for events where membership of an affected user can differ from what is stored. 
+# Assumes the stored pools were consistent with a full recompute before the change 
+# (the scheduled 'updatePlayerPools' action still performs the full recompute).
+def computePlayerPoolUpdates(upcomingEvents, players, organizers, changed_event_ids=None, changed_users=None):
+  from collections import defaultdict 
+  players = frozenset(players)
+  organizers = frozenset(organizers)
+  incremental = changed_event_ids is not None or changed_users is not None
+  changed_event_ids = frozenset(changed_event_ids or ())
+  # Users whose pool membership may have changed. Organizer (re)assignments are added below
+  affected_users = set(changed_users or ())
   players_spent = set()
   organizers_spent = set()
   event_updates = defaultdict(dict)
-  upcomingEvents = getEvents(dateGte=datetime.now(ZoneInfo("America/Denver")).isoformat()[:19])
-  # upcomingEvents = getEvents(dateGte=datetime.now(ZoneInfo("America/Denver")).date()) # 
+  # Working copy of each event's organizer (the events themselves are left untouched)
+  event_organizer = {event['event_id']: event.get('organizer', '') for event in upcomingEvents}
 
-  # print(json.dumps({
-  #   "upcomingEvents": [{'event_id': event['event_id'], 'format': event['format'], 'date': event['date']}  for event in upcomingEvents],
-  #   "now": datetime.now(ZoneInfo("America/Denver")).isoformat()[:19],
-  #   "in2hr": (datetime.now(ZoneInfo("America/Denver")) + timedelta(hours=2)).isoformat()[:19],
-  #   "date": datetime.now(ZoneInfo("America/Denver")).date().isoformat()[:19]
-  # }, default=ddb_default))
+  # Open and open_rsvp_eligibility events are eligible to all players and organizers (see OPEN_POOL_GROUPS)
+  open_events = []
+  # Reserved (but not open_rsvp_eligibility) events, in date order
+  reserved_events = []
+  for event in upcomingEvents:
+    if isOpenEligibility(event):
+      open_events.append(event)
+    elif event['format'] == 'Reserved':
+      reserved_events.append(event)
 
   ## First round: organizers_spent
-  for event in upcomingEvents:
-    # Open and open_rsvp_eligibility should have all available players and organizers in their pools
-    if (
-      event['format'] == 'Open' or 
-      (event['format'] == 'Reserved' and 'open_rsvp_eligibility' in event and event['open_rsvp_eligibility'] == True)
-    ):
-      if set(players) != set(event['player_pool']):
-        print(f"event {event['event_id']} update 1")
-        event_updates[event['event_id']]['player_pool'] = set(players)
-      if 'organizer_pool' not in event or set(organizers) != set(event["organizer_pool"]):
-        print(f"event {event['event_id']} update 2")
-        event_updates[event['event_id']]['organizer_pool'] = set(organizers)
-      
-    # If Reserved (but not open_rsvp_eligibility)...
-    if event['format'] != 'Reserved': continue
-    if 'open_rsvp_eligibility' in event and event['open_rsvp_eligibility'] == True: continue
+  for event in reserved_events:
+    organizer = event_organizer[event['event_id']]
     # Clear the event organizer if they are not attending or they're now the host
-    if event['organizer'] != '' and (event['organizer'] not in event['attending'] or event['organizer'] == event['host']):
-      event['organizer'] = ''
-      print(f"event {event['event_id']} update 3")
+    if organizer != '' and (organizer not in event['attending'] or organizer == event['host']):
+      affected_users.add(organizer)
+      event_organizer[event['event_id']] = ''
       event_updates[event['event_id']]['organizer'] = ''
       continue
     # Otherwise add the organizer to organizers_spent 
-    if event['organizer'] != '': 
-      organizers_spent.add(event['organizer'])
-
-  print(json.dumps({"round 1 event_updates": event_updates}, default=ddb_default))
+    if organizer != '': 
+      organizers_spent.add(organizer)
 
   ## Second round: players_spent and event organizer + organizers_spent
-  for event in upcomingEvents:
-    # If Reserved (but not open_rsvp_eligibility)...
-    if event['format'] != 'Reserved': continue
-    if 'open_rsvp_eligibility' in event and event['open_rsvp_eligibility'] == True: continue
+  for event in reserved_events:
     for player in event['attending']:
       if player == event['host']: continue
       # If attending player is an organizer, organizer isnt already being updated, and player isn't already a spent organizer, 
       # add them as the organizer (and as spent)
       if player in organizers:
-        if event['organizer'] == '' and player not in organizers_spent:
-          event['organizer'] = player
-          print(f"event {event['event_id']} update 4")
+        if event_organizer[event['event_id']] == '' and player not in organizers_spent:
+          event_organizer[event['event_id']] = player
+          affected_users.add(player)
           event_updates[event['event_id']]['organizer'] = player
           organizers_spent.add(player)
           continue
         # Add player as organizers_spent
-        elif event['organizer'] == player:
+        elif event_organizer[event['event_id']] == player:
           organizers_spent.add(player)
           continue
       # Add player as players_spent
       players_spent.add(player)
 
-  print(json.dumps({"round 2 event_updates": event_updates}, default=ddb_default))
+  # Only the changed events (or every event for a full recompute) need a full pool comparison. 
+  # Otherwise a pool can only differ from what is stored in the membership of an affected user
+  def pool_differs(event, pool_key, is_member, build_pool):
+    # Event is switching from a group marker back to an explicit pool
+    if event.get(f'{pool_key}_group'):
+      return True
+    # An empty organizer_pool is stored by omitting the attribute
+    pool = set(event.get(pool_key) or ())
+    if not incremental or event['event_id'] in changed_event_ids:
+      return build_pool() != pool
+    return any(is_member(user) != (user in pool) for user in affected_users)
+
+  def update_pools(event, player_member, build_player_pool, organizer_member, build_organizer_pool):
+    for pool_key, is_member, build_pool in [
+      ('player_pool', player_member, build_player_pool), 
+      ('organizer_pool', organizer_member, build_organizer_pool)
+    ]:
+      if pool_differs(event, pool_key, is_member, build_pool):
+        event_updates[event['event_id']][pool_key] = set(build_pool())
+      if event.get(f'{pool_key}_group'):
+        event_updates[event['event_id']][f'{pool_key}_group'] = None
+
+  all_players = (players.__contains__, lambda: players)
+  all_organizers = (organizers.__contains__, lambda: organizers)
+
+  # Open events only carry the group markers. Their pools don't depend on the group membership, 
+  # so roster changes never fan out to them
+  for event in open_events:
+    for pool_key, group in OPEN_POOL_GROUPS.items():
+      if event.get(f'{pool_key}_group') != group:
+        event_updates[event['event_id']][f'{pool_key}_group'] = group
+      if any(user != 'placeholder' for user in event.get(pool_key, ())):
+        event_updates[event['event_id']][pool_key] = set() if pool_key in EVENT_PLACEHOLDER_SETS else None
 
   # Round 3. Update Player and Organizer pools
-  for event in upcomingEvents:
-    # If Reserved (but not open_rsvp_eligibility)...
-    if event['format'] != 'Reserved': continue
-    if 'open_rsvp_eligibility' in event and event['open_rsvp_eligibility'] == True: continue
-    
+  for event in reserved_events:
     # If its after midnight the sunday before the event, open the player and organizer pool if not already
     if is_after_sunday_midnight_of(datetime.fromisoformat(event['date']).replace(tzinfo=ZoneInfo("America/Denver"))):
-      if set(players) != set(event["player_pool"]):
-        print(f"event {event['event_id']} update 5")
-        event_updates[event['event_id']]['player_pool'] = set(players)
-      if 'organizer_pool' not in event or set(organizers) != set(event["organizer_pool"]):
-        print(f"event {event['event_id']} update 6")
-        event_updates[event['event_id']]['organizer_pool'] = set(organizers)
+      update_pools(event, *all_players, *all_organizers)
     # Otherwise set each event's player & organizer pool as total_players - spent_players + attending_players
     else:
-      player_pool = set(players) - players_spent
-      player_pool.update(event['attending'])
-      organizer_pool = set(organizers) - organizers_spent
-      if event['organizer'] != '': organizer_pool.add(event['organizer'])
-      if player_pool != set(event["player_pool"]):
-        print(f"event {event['event_id']} update 7")
-        event_updates[event['event_id']]['player_pool'] = set(player_pool)
-      if 'organizer_pool' not in event or organizer_pool != set(event["organizer_pool"]):
-        print(f"event {event['event_id']} update 8")
-        event_updates[event['event_id']]['organizer_pool'] = set(organizer_pool)
-  
-  print(json.dumps({"final event_updates": event_updates}, default=ddb_default))
-  # input("Pause")
-  for event_id, event_update in event_updates.items():
-    if not event_update: print(f"No updates for event {event_id}")
-    updateEvent(event_id, event_update)
-## end def updatePlayerPools()
+      attending = event['attending']
+      organizer = event_organizer[event['event_id']]
+      update_pools(
+        event,
+        lambda user: (user in players and user not in players_spent) or user in attending,
+        lambda: (players - players_spent).union(attending),
+        lambda user: (user in organizers and user not in organizers_spent) or (user != '' and user == organizer),
+        lambda: (organizers - organizers_spent).union([organizer] if organizer != '' else []),
+      )
+
+  return dict(event_updates)
+## end def computePlayerPoolUpdates()
+
+# Open (and open_rsvp_eligibility) events are eligible to every member of these groups. Rather than
+# copying the groups into each event's pools, the event stores the group name ('player_pool_group', 
+# 'organizer_pool_group') and the pools are resolved at read time (resolvePoolGroups) and 
+# authorization time (the updateRSVP/deleteRSVP condition expressions)
+OPEN_POOL_GROUPS = {'player_pool': 'player', 'organizer_pool': 'organizer'}
+
+def isOpenEligibility(event):
+  return event['format'] == 'Open' or (event['format'] == 'Reserved' and event.get('open_rsvp_eligibility') == True)
+
+# Reserved events whose pools are allocated by updatePlayerPools. Only these events carry the 
+# 'reserved_event_type' attribute, so only they are projected into the sparse ReservedByDate index
+def isReservedPoolEvent(event):
+  return event['format'] == 'Reserved' and not isOpenEligibility(event)
+
+# Expand group-marker pools to the current group members (for API responses and the public events.json)
+def resolvePoolGroups(events, players_groups=None):
+  for event in events:
+    for pool_key in OPEN_POOL_GROUPS:
+      group = event.get(f'{pool_key}_group')
+      if not group: continue
+      if players_groups is None:
+        players_groups = getJsonS3(env.S3_BUCKET, 'players_groups.json', copy=False)
+      event[pool_key] = set(event.get(pool_key, set())).union(players_groups['Groups'].get(group, []))
+  return events
+
+# Users whose pool eligibility can be affected by a change to (or removal of) the given event(s)
+def poolDeltaUsers(*events):
+  users = set()
+  for event in events:
+    if not event: continue
+    users.update(event.get('attending', []))
+    users.update(user for user in [event.get('host', ''), event.get('organizer', '')] if user)
+  return users
 
 def list_groups_for_user(user_id): 
   client = boto3.client('cognito-idp', region_name='us-east-1')
@@ -2090,7 +3396,7 @@ def updateDates():
 def replaceUserId(old_user_id, new_user_id, events=None):
   update_log = []
   if events is None:
-    events = getEvents() # All
+    events = getEvents(scores=True) # All
   for event in events:
     update = False
     if old_user_id in event['attending']:
@@ -2135,15 +3441,7 @@ def getGameTutorials():
       raise
 
 def updateGameTutorials(game_tutorials):
-  s3 = boto3.client('s3')
-  s3.put_object(
-    Body=json.dumps(game_tutorials, indent=2, default=ddb_default),
-    Bucket=env.S3_BUCKET,
-    Key='game_tutorials.json',
-    ContentType='application/json',
-    CacheControl='no-cache'
-  )
-  print('game_tutorials.json updated')
+  publishJsonS3((env.S3_BUCKET, 'game_tutorials.json', game_tutorials))
 
 def refactorGameTutorials():
   game_tutorials = getGameTutorials()
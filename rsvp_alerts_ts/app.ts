@@ -2,7 +2,14 @@ import { APIGatewayProxyEvent, APIGatewayProxyResult } from "aws-lambda";
 import { SQSClient, ReceiveMessageCommand, Message, DeleteMessageCommand } from "@aws-sdk/client-sqs";
 import { S3Client, GetObjectCommand } from "@aws-sdk/client-s3";
 import { SESv2Client, SendEmailCommand } from "@aws-sdk/client-sesv2";
-import { GetItemCommand, GetItemInput, DynamoDBClient } from "@aws-sdk/client-dynamodb";
+import { SchedulerClient, GetScheduleCommand, UpdateScheduleCommand } from "@aws-sdk/client-scheduler";
+import {
+  GetItemCommand,
+  GetItemInput,
+  BatchGetItemCommand,
+  BatchGetItemCommandOutput,
+  DynamoDBClient,
+} from "@aws-sdk/client-dynamodb";
 import { marshall, unmarshall } from "@aws-sdk/util-dynamodb";
 import { NodeJsClient } from "@smithy/types";
 import inlineCss from "inline-css";
@@ -46,6 +53,7 @@ const sqs = new SQSClient(config);
 const s3 = new S3Client(config) as NodeJsClient<S3Client>;
 const ses = new SESv2Client(config);
 const ddb = new DynamoDBClient(config);
+const scheduler = new SchedulerClient(config);
 
 // Retrieve GameKnightEvent from DynamoDB
 async function getEvent(
@@ -93,6 +101,33 @@ async function getEvent(
   }
 }
 
+// Retrieve several GameKnightEvents with BatchGetItem (100 keys per request),
+// retrying UnprocessedKeys with exponential backoff
+async function getEvents(event_ids: string[], maxAttempts = 8): Promise<ExistingGameKnightEventDDB[]> {
+  const events: ExistingGameKnightEventDDB[] = [];
+  const uniqueIds = [...new Set(event_ids)];
+  for (let i = 0; i < uniqueIds.length; i += 100) {
+    let keys: BatchGetItemCommandOutput["UnprocessedKeys"] = {
+      [TABLE_NAME]: { Keys: uniqueIds.slice(i, i + 100).map((event_id) => marshall({ event_id: event_id })) },
+    };
+    for (let attempt = 0; keys && keys[TABLE_NAME]; attempt++) {
+      if (attempt >= maxAttempts) throw new Error(`BatchGetItem: keys still unprocessed after ${attempt} attempts`);
+      if (attempt > 0)
+        await new Promise((resolve) => setTimeout(resolve, Math.random() * Math.min(50 * 2 ** attempt, 2000)));
+      const response: BatchGetItemCommandOutput = await ddb.send(new BatchGetItemCommand({ RequestItems: keys }));
+      for (const item of response.Responses?.[TABLE_NAME] ?? []) {
+        const event = unmarshall(item) as ExistingGameKnightEventDDB;
+        event.not_attending.delete("placeholder");
+        event.attending.delete("placeholder");
+        event.player_pool.delete("placeholder");
+        events.push(event);
+      }
+      keys = response.UnprocessedKeys;
+    }
+  }
+  return events;
+}
+
 // run myMain() when running the script directly from local dev cli
 if (typeof require !== "undefined" && require.main === module) {
   myMain();
@@ -195,17 +230,54 @@ async function GetS3Object(Key: string, Bucket: string) {
   return body;
 }
 
+// Public events are published as monthly shards listed in events/manifest.json.
+// Only the shards for the given months (YYYY-MM) are downloaded
+async function GetPublicEvents(months: string[]): Promise<ExistingGameKnightEvent[]> {
+  const manifest: EventsManifest = JSON.parse(await GetS3Object("events/manifest.json", S3_BUCKET));
+  const shards = await Promise.all(
+    [...new Set(months)]
+      .filter((month) => month in manifest.shards)
+      .map((month) => GetS3Object(manifest.shards[month].key, S3_BUCKET))
+  );
+  return shards.flatMap((shard) => JSON.parse(shard) as ExistingGameKnightEvent[]);
+}
+
 const DeleteMessage = (ReceiptHandle: string) =>
   new DeleteMessageCommand({
     QueueUrl: RSVP_SQS_URL,
     ReceiptHandle: ReceiptHandle,
   });
 
-const ReceiveMessage = () =>
+// RSVPs are grouped per event (MessageGroupId = event_id), so a receive can return fewer than 10 messages
+// while other events' messages are still queued. Drain until a receive comes back empty: only the first
+// receive long polls, and MAX_RECEIVES bounds a batch run while RSVPs keep arriving
+const MAX_RECEIVES = 50;
+
+// Re-arm this function's one-time schedule (the one manage_events sets after an RSVP) to pick up the
+// messages a run left queued. Otherwise they'd wait for the next RSVP to schedule a run
+async function rearmSchedule() {
+  const Name = `rsvp_alerts_schedule_${MODE}`;
+  const GroupName = `rsvp_alerts_${MODE}`;
+  const at = new Date(Date.now() + (MODE == "prod" ? 60 : 30) * 1000).toISOString().slice(0, 19);
+  const { Target } = await scheduler.send(new GetScheduleCommand({ Name, GroupName }));
+  if (!Target) throw new Error(`Schedule ${Name} has no target`);
+  await scheduler.send(
+    new UpdateScheduleCommand({
+      Name,
+      GroupName,
+      ScheduleExpression: `at(${at})`,
+      Target,
+      FlexibleTimeWindow: { Mode: "OFF" },
+    })
+  );
+  console.log(`Scheduled the next RSVP alert batch run at ${at}`);
+}
+
+const ReceiveMessage = (WaitTimeSeconds: number) =>
   new ReceiveMessageCommand({
     QueueUrl: RSVP_SQS_URL, // required
     MaxNumberOfMessages: 10,
-    WaitTimeSeconds: 10,
+    WaitTimeSeconds: WaitTimeSeconds,
   });
 
 export const lambdaHandler = async (lambdaEvent: APIGatewayProxyEvent): Promise<APIGatewayProxyResult> => {
@@ -216,13 +288,21 @@ export const lambdaHandler = async (lambdaEvent: APIGatewayProxyEvent): Promise<
     let start = true;
     let response;
     let i = 1; // Message sequence number
-    while (start || (response!.Messages && response!.Messages.length == 10)) {
+    for (let receives = 0; start || (response!.Messages && response!.Messages.length > 0); receives++) {
+      if (receives == MAX_RECEIVES) {
+        console.warn(`Stopped after ${MAX_RECEIVES} receives; the rest are processed by the next scheduled run`);
+        // The messages received so far are deleted, so send their alerts even if the re-arm fails
+        await rearmSchedule().catch((error) => console.error("RSVP alert schedule not re-armed", error));
+        break;
+      }
       console.log("Retrieving Messages");
-      response = await sqs.send(ReceiveMessage());
-      if (response.Messages) {
+      response = await sqs.send(ReceiveMessage(start ? 10 : 1));
+      if (response.Messages && response.Messages.length > 0) {
         console.log(`response.Messages count: ${response.Messages.length}`);
         // messages.push(...response.Messages);
 
+        // Delete before the next receive: a group's later messages are only handed out once its earlier
+        // ones are gone, which keeps each event's RSVPs in order across receives
         let awaitDeleteMessages = [];
         for (const message of response.Messages) {
           rsvpLogs.push({ num: i, ...JSON.parse(message.Body!) });
@@ -240,13 +320,13 @@ export const lambdaHandler = async (lambdaEvent: APIGatewayProxyEvent): Promise<
     // console.log(messages);
 
     const RetrieveS3 = await Promise.allSettled([
-      GetS3Object("events.json", S3_BUCKET),
+      GetPublicEvents(rsvpLogs.map((log) => log.date.slice(0, 7))),
       GetS3Object("players_groups.json", BACKEND_BUCKET),
       GetS3Object("email_alert_preferences.json", BACKEND_BUCKET),
       GetS3Object("template.html", BACKEND_BUCKET),
     ]);
     console.log("%j", { RetrieveS3: RetrieveS3 });
-    const events: ExistingGameKnightEvent[] = RetrieveS3[0].status === "fulfilled" && JSON.parse(RetrieveS3[0].value);
+    const events: ExistingGameKnightEvent[] = RetrieveS3[0].status === "fulfilled" ? RetrieveS3[0].value : [];
     const players_groups: PlayersGroups = RetrieveS3[1].status === "fulfilled" && JSON.parse(RetrieveS3[1].value);
     const email_alert_preferences: AllEmailAlertPreferences =
       RetrieveS3[2].status === "fulfilled" && JSON.parse(RetrieveS3[2].value);
@@ -255,24 +335,24 @@ export const lambdaHandler = async (lambdaEvent: APIGatewayProxyEvent): Promise<
     const eventsDict: EventDict = Object.fromEntries(events.map((event) => [event.event_id, event]));
     const playersDict = players_groups.Users;
 
-    // Pull events that aren't in the public s3 events.json (such as Private Events)
-    const getEventPromises = [...new Set(rsvpLogs.map((log) => log.event_id))]
-      .map((event_id) => !(event_id in eventsDict) && getEvent(event_id))
-      .filter((x) => x); // !== null && x !== undefined);
-    console.log(`getEventPromises: ${getEventPromises.length}`);
-    if (getEventPromises.length > 0) {
+    // Pull events that aren't in the public s3 event shards (such as Private Events)
+    const missingEventIds = [...new Set(rsvpLogs.map((log) => log.event_id))].filter(
+      (event_id) => !(event_id in eventsDict)
+    );
+    console.log(`missingEventIds: ${missingEventIds.length}`);
+    if (missingEventIds.length > 0) {
       console.log("Retrieving Events");
-      const retrievedEvents = await Promise.allSettled(getEventPromises);
-      console.log("%j", { retrievedEvents: retrievedEvents });
-      for (const result of retrievedEvents) {
-        if (result.status === "fulfilled") {
-          if (result.value) eventsDict[result.value.event_id] = result.value;
-          else console.error(result);
-        } else console.error("%j", result);
+      try {
+        const retrievedEvents = await getEvents(missingEventIds);
+        console.log("%j", { retrievedEvents: retrievedEvents });
+        for (const event of retrievedEvents) eventsDict[event.event_id] = event;
+      } catch (err) {
+        console.error(err);
       }
+      for (const event_id of missingEventIds) if (!(event_id in eventsDict)) console.warn(`Event ${event_id} not found`);
     }
 
-    // Sort RSVP Logs by Event Date (but preserves original order of operations otherwise)
+    // Sort RSVP Logs by Event Date (stable sort, so each event's RSVPs stay in their message group order)
     rsvpLogs.sort(function (a, b) {
       if (eventsDict[a.event_id].date < eventsDict[b.event_id].date) return -1;
       if (eventsDict[a.event_id].date > eventsDict[b.event_id].date) return 1;
@@ -589,6 +669,13 @@ export type PlayerGet = {
   };
 };
 
+type EventsManifest = {
+  first_month: string;
+  shards: {
+    [month: string]: { key: string; sha256: string; count: number };
+  };
+};
+
 export interface EventDict {
   [key: ExistingGameKnightEvent["event_id"]]: ExistingGameKnightEvent | ExistingGameKnightEventDDB;
 }
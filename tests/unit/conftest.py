@@ -0,0 +1,56 @@
+import io
+import os
+
+import botocore
+import pytest
+
+# manage_events.app reads its configuration from the Lambda environment at import time
+for name in [
+  'table_name_prod', 'table_name', 's3_bucket', 'rsvp_sqs_url', 'sns_topic', 'backend_bucket',
+  'bgg_picture_fn', 'user_pool_id', 'user_pool_id_prod', 'cognito_cloudwatch_role', 'attendance_table',
+  'locks_table',
+]:
+  os.environ.setdefault(name, f'test_{name}')
+os.environ.setdefault('mode', 'dev')
+os.environ.setdefault('event_index_stage', '5')
+
+
+# S3 for the publish layer (publishJsonS3, updateJsonS3): stores the objects written, with an ETag per
+# version, and enforces the conditional PUT parameters
+class FakePublishS3:
+  def __init__(self):
+    self.objects = {}
+    self.puts = []
+
+  def head_object(self, Bucket, Key):
+    if (Bucket, Key) not in self.objects:
+      raise botocore.exceptions.ClientError({'Error': {'Code': '404', 'Message': 'Not Found'}}, 'HeadObject')
+    return {'Metadata': self.objects[(Bucket, Key)]['Metadata'], 'ETag': self.etag(Bucket, Key)}
+
+  def get_object(self, Bucket, Key, **kwargs):
+    if (Bucket, Key) not in self.objects:
+      raise botocore.exceptions.ClientError({'Error': {'Code': 'NoSuchKey', 'Message': 'Not Found'}}, 'GetObject')
+    return {'Body': io.BytesIO(self.objects[(Bucket, Key)]['Body']), 'ETag': self.etag(Bucket, Key)}
+
+  def etag(self, Bucket, Key):
+    return self.objects[(Bucket, Key)].get('ETag', '"external"')
+
+  def put_object(self, **kwargs):
+    key = (kwargs['Bucket'], kwargs['Key'])
+    if ('IfMatch' in kwargs and (key not in self.objects or self.etag(*key) != kwargs['IfMatch'])) or ('IfNoneMatch' in kwargs and key in self.objects):
+      raise botocore.exceptions.ClientError({'Error': {'Code': 'PreconditionFailed', 'Message': 'At least one of the pre-conditions you specified did not hold'}}, 'PutObject')
+    self.puts.append(kwargs)
+    self.objects[key] = {**kwargs, 'ETag': f'"{len(self.puts)}"'}
+    return {'ETag': f'"{len(self.puts)}"'}
+
+
+@pytest.fixture
+def publish_s3(mocker):
+  from manage_events import app
+  app._s3_json_cache.clear()
+  app._s3_published.clear()
+  fake = FakePublishS3()
+  mocker.patch.object(app.boto3, 'client', return_value=fake)
+  yield fake
+  app._s3_json_cache.clear()
+  app._s3_published.clear()
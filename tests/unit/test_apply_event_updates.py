@@ -0,0 +1,68 @@
+import json
+import threading
+from unittest.mock import MagicMock
+
+import botocore
+import pytest
+
+from manage_events import app
+
+
+@pytest.fixture
+def ddb(mocker):
+  ddb = MagicMock()
+  ddb.update_item.return_value = {}
+  ddb.transact_write_items.return_value = {}
+  mocker.patch.object(app.boto3, 'client', return_value=ddb)
+  return ddb
+
+
+def pools(count):
+  return {f'e{n}': {'player_pool': {f'u{n}'}} for n in range(count)}
+
+
+def test_updates_are_sent_concurrently(ddb):
+  # Every worker waits for the others: sequential updates would never get past the barrier
+  barrier = threading.Barrier(4, timeout=5)
+  ddb.update_item.side_effect = lambda **request: barrier.wait() and {}
+  app.applyEventUpdates(pools(4), max_workers=4)
+  requests = {call.kwargs['Key']['event_id']['S']: call.kwargs for call in ddb.update_item.call_args_list}
+  assert sorted(requests) == ['e0', 'e1', 'e2', 'e3']
+  assert requests['e2']['ConditionExpression'] == 'attribute_exists(event_id)'
+  assert sorted(requests['e2']['ExpressionAttributeValues'][':player_pool']['SS']) == ['placeholder', 'u2']
+  assert not ddb.transact_write_items.called
+
+
+def test_empty_and_unchanged_updates_are_not_sent(ddb):
+  app.applyEventUpdates({'e0': {}, 'e1': {'game': 'Azul'}}, current_events={'e1': {'game': 'Azul'}})
+  assert not ddb.update_item.called
+
+
+def test_transactions_are_chunked_by_100(ddb):
+  app.applyEventUpdates(pools(250), transactional=True)
+  chunks = [call.kwargs['TransactItems'] for call in ddb.transact_write_items.call_args_list]
+  assert sorted(len(chunk) for chunk in chunks) == [50, 100, 100]
+  event_ids = [item['Update']['Key']['event_id']['S'] for chunk in chunks for item in chunk]
+  assert sorted(event_ids) == sorted(pools(250))
+  assert not ddb.update_item.called
+
+
+def test_failures_are_collected_and_reported(ddb, capsys):
+  def update_item(**request):
+    if request['Key']['event_id']['S'] in ['e1', 'e3']:
+      raise botocore.exceptions.ClientError({'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'gone'}}, 'UpdateItem')
+    return {}
+  ddb.update_item.side_effect = update_item
+  with pytest.raises(Exception, match='2 of 5 event update'):
+    app.applyEventUpdates(pools(5))
+  # The other updates are still applied
+  assert ddb.update_item.call_count == 5
+  report = next(json.loads(line) for line in capsys.readouterr().out.splitlines() if 'Event updates failed' in line)
+  assert sorted(report['errors']) == ['e1', 'e3']
+
+
+def test_failed_transaction_chunk_is_reported(ddb):
+  ddb.transact_write_items.side_effect = [{}, Exception('TransactionCanceledException')]
+  with pytest.raises(Exception, match='1 of 2 event update'):
+    app.applyEventUpdates(pools(150), transactional=True, max_workers=1)
+  assert ddb.transact_write_items.call_count == 2
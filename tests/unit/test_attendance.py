@@ -0,0 +1,54 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from manage_events import app
+
+
+@pytest.fixture
+def batch(mocker):
+  table = MagicMock()
+  mocker.patch.object(app.boto3, 'resource').return_value.Table.return_value = table
+  return table.batch_writer.return_value.__enter__.return_value
+
+
+def event(attending, date='2026-10-20T18:00:00-06:00'):
+  return {'event_id': 'e1', 'event_type': 'GameKnight', 'date': date, 'attending': set(attending) | {'placeholder'}}
+
+
+def test_only_changed_attendance_is_written(batch):
+  app.syncAttendance(previous=event({'a', 'b'}), current=event({'b', 'c'}))
+  assert [call.kwargs['Item']['user_id'] for call in batch.put_item.call_args_list] == ['c']
+  assert [call.kwargs['Key'] for call in batch.delete_item.call_args_list] == [{'user_id': 'a', 'event_id': 'e1'}]
+
+
+def test_new_date_rewrites_every_attendee(batch):
+  app.syncAttendance(previous=event({'a', 'b'}), current=event({'a', 'b'}, date='2026-10-27T18:00:00-06:00'))
+  assert sorted(call.kwargs['Item']['user_id'] for call in batch.put_item.call_args_list) == ['a', 'b']
+  assert not batch.delete_item.called
+
+
+def test_deleted_event_removes_attendance(batch):
+  app.syncAttendance(previous=event({'a'}))
+  assert [call.kwargs['Key'] for call in batch.delete_item.call_args_list] == [{'user_id': 'a', 'event_id': 'e1'}]
+
+
+def test_unchanged_attendance_skips_the_table(mocker):
+  resource = mocker.patch.object(app.boto3, 'resource')
+  app.syncAttendance(previous=event({'a'}), current=event({'a'}))
+  assert not resource.called
+
+
+def test_player_filter_reads_attendance_index(mocker):
+  client = mocker.patch.object(app.boto3, 'client').return_value
+  client.query.return_value = {'Items': [{'event_id': {'S': 'e1'}}, {'event_id': {'S': 'e2'}}]}
+  get_events_by_ids = mocker.patch.object(app, 'getEventsByIds', return_value=[
+    app.Event(event_id='e1', format='Open', player_pool=set()),
+    app.Event(event_id='e2', format='Private', player_pool={'b'}),
+  ])
+
+  result = app.getEvents(player='a', visible_to='a')
+  assert client.query.call_args.kwargs['TableName'] == app.env.ATTENDANCE_TABLE_NAME
+  assert client.query.call_args.kwargs['IndexName'] == 'AttendanceByDate'
+  assert get_events_by_ids.call_args.args[0] == ['e1', 'e2']
+  assert [event['event_id'] for event in result] == ['e1']
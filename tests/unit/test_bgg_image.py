@@ -0,0 +1,123 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from manage_events import app
+
+
+@pytest.fixture
+def clients(mocker):
+  ddb, sns = MagicMock(), MagicMock()
+  calls = []
+  ddb.put_item.side_effect = lambda **kwargs: calls.append('put') or {}
+  sns.publish.side_effect = lambda **kwargs: calls.append('sns') or {}
+  mocker.patch.object(app.boto3, 'client', side_effect=lambda service, **kwargs: sns if service == 'sns' else ddb)
+  mocker.patch.object(app, 'syncAttendance')
+  mocker.patch.object(app, 'gameImageIds', return_value=None)
+  return ddb, sns, calls
+
+
+def new_event(**attributes):
+  return {'date': '2026-10-20T18:00:00-06:00', 'host': 'h', 'format': 'Open', 'game': 'Azul', 'bgg_id': 230802,
+          'attending': [], 'player_pool': [], 'tbd_pic': 'Game_TBD_1.jpeg', **attributes}
+
+
+def test_missing_image_is_requested_after_the_write(clients, mocker):
+  ddb, sns, calls = clients
+  key_exists = mocker.patch.object(app, 'key_exists', return_value=False)
+  response = app.createEvent(new_event())
+  assert key_exists.call_count == 1
+  assert ddb.put_item.call_args.kwargs['Item']['image_ready'] == {'BOOL': False}
+  assert calls == ['put', 'sns']
+  assert app.eventImage(response['event']) == {'image_ready': False, 'image': 'Game_TBD_1.jpeg'}
+
+
+def test_existing_image_is_ready(clients, mocker):
+  ddb, sns, calls = clients
+  mocker.patch.object(app, 'key_exists', return_value=True)
+  response = app.createEvent(new_event())
+  assert ddb.put_item.call_args.kwargs['Item']['image_ready'] == {'BOOL': True}
+  assert calls == ['put']
+  assert app.eventImage(response['event']) == {'image_ready': True, 'image': '230802.png'}
+
+
+def test_older_events_without_the_flag_show_the_game_image():
+  assert app.eventImage({'bgg_id': 13})['image'] == '13.png'
+  assert app.eventImage({'tbd_pic': 'Game_TBD_2.jpeg'}) == {'image_ready': False, 'image': 'Game_TBD_2.jpeg'}
+
+
+def test_readiness_is_read_from_the_manifest(publish_s3, mocker):
+  key_exists = mocker.patch.object(app, 'key_exists', return_value=True)
+  app.publishJsonS3((app.env.S3_BUCKET, app.GAME_IMAGES_KEY, {'bgg_ids': [13, 230802]}))
+  assert app.bggPicReady(230802) and app.bggPicReady('13')
+  assert not key_exists.called
+  key_exists.return_value = False
+  assert not app.bggPicReady(1)
+  key_exists.assert_called_once_with(app.env.S3_BUCKET, '1.png')
+
+
+def test_image_stored_after_the_manifest_was_read_is_ready(publish_s3, mocker):
+  key_exists = mocker.patch.object(app, 'key_exists', return_value=True)
+  app.publishJsonS3((app.env.S3_BUCKET, app.GAME_IMAGES_KEY, {'bgg_ids': [13]}))
+  assert app.bggPicReady(230802)
+
+
+def test_missing_manifest_falls_back_to_head(publish_s3, mocker):
+  key_exists = mocker.patch.object(app, 'key_exists', return_value=True)
+  assert app.bggPicReady(13)
+  key_exists.assert_called_once_with(app.env.S3_BUCKET, '13.png')
+
+
+def test_rebuild_lists_the_bucket(publish_s3, mocker):
+  paginator = MagicMock()
+  paginator.paginate.return_value = [
+    {'Contents': [{'Key': '13.png'}, {'Key': 'events.json'}, {'Key': 'Game_TBD_1.jpeg'}]},
+    {'Contents': [{'Key': '230802.png'}, {'Key': '13.png.gz'}]},
+  ]
+  publish_s3.get_paginator = lambda name: paginator
+  assert app.rebuildGameImages() == 2
+  assert json.loads(publish_s3.objects[(app.env.S3_BUCKET, app.GAME_IMAGES_KEY)]['Body']) == {'bgg_ids': [13, 230802]}
+
+
+def test_rebuild_keeps_ids_added_while_listing(publish_s3, mocker):
+  app.publishJsonS3((app.env.S3_BUCKET, app.GAME_IMAGES_KEY, {'bgg_ids': [13, 99, 174430]}))
+  mocker.patch.object(app, 'key_exists', side_effect=lambda bucket, key: key == '174430.png')
+  paginator = MagicMock()
+  paginator.paginate.return_value = [{'Contents': [{'Key': '13.png'}, {'Key': '230802.png'}]}]
+  publish_s3.get_paginator = lambda name: paginator
+  assert app.rebuildGameImages() == 3
+  assert json.loads(publish_s3.objects[(app.env.S3_BUCKET, app.GAME_IMAGES_KEY)]['Body']) == {'bgg_ids': [13, 174430, 230802]}
+
+
+def test_bootstrap_fan_out_dedupes_and_chunks(mocker):
+  lam = MagicMock()
+  lam.invoke.side_effect = lambda **kwargs: {'StatusCode': 202}
+  mocker.patch.object(app.boto3, 'client', return_value=lam)
+  mocker.patch.object(app, 'BGG_PICTURE_CHUNK', 2)
+  results = app.invokeBggPictures([5, 1, 5, 2, 3, 1])
+  assert results == [{'bgg_ids': [5, 1], 'status': 202}, {'bgg_ids': [2, 3], 'status': 202}]
+  for call in lam.invoke.call_args_list:
+    assert call.kwargs['InvocationType'] == 'Event'
+  sent = [[r['Sns']['MessageAttributes']['bgg_id']['Value'] for r in json.loads(call.kwargs['Payload'])['Records']] for call in lam.invoke.call_args_list]
+  assert sorted(sent) == [[2, 3], [5, 1]]
+
+
+def test_bootstrap_fan_out_reports_failed_chunks(mocker):
+  lam = MagicMock()
+  def invoke(**kwargs):
+    if '"Value": 2' in kwargs['Payload']:
+      raise Exception('throttled')
+    return {'StatusCode': 202}
+  lam.invoke.side_effect = invoke
+  mocker.patch.object(app.boto3, 'client', return_value=lam)
+  mocker.patch.object(app, 'BGG_PICTURE_CHUNK', 1)
+  assert app.invokeBggPictures([1, 2]) == [{'bgg_ids': [1], 'status': 202}, {'bgg_ids': [2], 'error': 'throttled'}]
+
+
+def test_publish_action_republishes_the_stamped_months(mocker):
+  publish = mocker.patch.object(app, 'updatePublicEventsJson')
+  app.lambda_handler({'action': 'publishEvents', 'changed_dates': ['2026-11-20T18:00:00-07:00']}, None)
+  publish.assert_called_once_with(changed_dates={'2026-11-20T18:00:00-07:00'})
+  app.lambda_handler({'action': 'publishEvents'}, None)
+  publish.assert_called_with(changed_dates=None)
@@ -0,0 +1,80 @@
+from datetime import date, datetime, timezone
+
+from manage_events import app
+from .test_get_events_paging import FakeClient, fake_events
+
+
+def test_offsets_across_dst_sort_in_time_order():
+  # 1:30 MDT and 1:10 MST on the night DST ends: the local strings sort the wrong way round
+  before, after = '2026-11-01T01:30:00-06:00', '2026-11-01T01:10:00-07:00'
+  assert before > after
+  assert app.utcSortKey(before) == '2026-11-01T07:30:00Z'
+  assert app.utcSortKey(before) < app.utcSortKey(after)
+
+
+def test_naive_values_are_local_time():
+  assert app.utcSortKey('2026-07-01') == '2026-07-01T06:00:00Z'
+  assert app.utcSortKey(date(2026, 12, 1)) == '2026-12-01T07:00:00Z'
+  assert app.utcSortKey(datetime(2026, 12, 1, 12, tzinfo=timezone.utc)) == '2026-12-01T12:00:00Z'
+
+
+def test_month_and_range_are_one_key_condition(mocker):
+  client = FakeClient(fake_events(1), page_size=10)
+  mocker.patch.object(app.boto3, 'client', return_value=client)
+  app.getEvents(month='2026-10', dateGte='2026-10-15')
+  query = client.calls[0]
+  assert query['KeyConditionExpression'].count('BETWEEN') == 1
+  assert sorted(value['S'] for value in query['ExpressionAttributeValues'].values())[:2] == ['2026-10-15T06:00:00Z', '2026-11-01T05:59:59Z']
+
+
+def test_written_events_carry_the_sort_key():
+  event = app.Event.for_write({'event_id': 'e1', 'date': '2026-12-05T18:00:00-07:00', 'format': 'Open', 'player_pool': set()})
+  assert event['date_utc'] == '2026-12-06T01:00:00Z'
+  assert app.eventUpdateExpression({'date': '2026-12-05T19:00:00-07:00'})['ExpressionAttributeValues'][':date_utc'] == '2026-12-06T02:00:00Z'
+
+
+def test_reads_follow_the_index_stage(mocker):
+  client = FakeClient(fake_events(1), page_size=10)
+  mocker.patch.object(app.boto3, 'client', return_value=client)
+  mocker.patch.object(app.env, 'EVENT_INDEX_STAGE', 1)
+  app.getEvents(dateGte='2026-10-15', reserved_only=True)
+  legacy = client.calls[-1]
+  assert legacy['IndexName'] == 'EventTypeByDate'
+  assert '2026-10-15T00:00:00' in [value.get('S') for value in legacy['ExpressionAttributeValues'].values()]
+  assert 'reserved_event_type' in legacy['ExpressionAttributeNames'].values()
+
+  mocker.patch.object(app.env, 'EVENT_INDEX_STAGE', 2)
+  app.getEvents(dateGte='2026-10-15')
+  assert client.calls[-1]['IndexName'] == 'EventTypeByDateUtc'
+  app.getEvents(dateGte='2026-10-15', reserved_only=True)
+  assert client.calls[-1]['IndexName'] == 'ReservedByDate'
+
+
+def test_host_and_game_filters_before_their_indexes_exist(mocker):
+  client = FakeClient(fake_events(1), page_size=10)
+  mocker.patch.object(app.boto3, 'client', return_value=client)
+  mocker.patch.object(app.env, 'EVENT_INDEX_STAGE', 3)
+  app.getEvents(host='h1')
+  assert client.calls[-1]['IndexName'] == 'HostByDate'
+  app.getEvents(bgg_id=13)
+  query = client.calls[-1]
+  assert query['IndexName'] == 'EventTypeByDateUtc'
+  assert 'bgg_id' in query['ExpressionAttributeNames'].values()
+  mocker.patch.object(app.env, 'EVENT_INDEX_STAGE', 4)
+  app.getEvents(bgg_id=13)
+  assert client.calls[-1]['IndexName'] == 'BggIdByDate'
+
+
+def test_rsvp_condition_accepts_events_not_backfilled(mocker):
+  from boto3.dynamodb.conditions import ConditionExpressionBuilder
+  mocker.patch.object(app, 'getJsonS3', return_value={'Groups': {}})
+  condition = ConditionExpressionBuilder().build_expression(app.rsvpCondition('u1'))
+  names = {placeholder: name for placeholder, name in condition.attribute_name_placeholders.items()}
+  expression = condition.condition_expression
+  for placeholder, name in names.items():
+    expression = expression.replace(placeholder, name)
+  assert 'attribute_not_exists(date_utc)' in expression and 'date >= ' in expression
+  # Events without date_utc are compared on their local date (no offset, like the legacy index bounds)
+  values = [value for value in condition.attribute_value_placeholders.values() if value != 'u1']
+  assert sorted(len(value) for value in values) == [19, 20]
+  assert app.localDateKey(max(values)) == min(values)
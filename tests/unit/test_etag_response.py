@@ -0,0 +1,21 @@
+from manage_events import app
+
+
+def test_matching_if_none_match_returns_304():
+  body = '[{"event_id": "1"}]'
+  response = app.etagResponse({'headers': {}}, '*', body)
+  assert response['statusCode'] == 200
+  assert response['body'] == body
+  etag = response['headers']['ETag']
+
+  not_modified = app.etagResponse({'headers': {'If-None-Match': f'"other", W/{etag}'}}, '*', body)
+  assert not_modified['statusCode'] == 304
+  assert 'body' not in not_modified
+  assert not_modified['headers']['ETag'] == etag
+
+
+def test_changed_body_gets_new_etag():
+  first = app.etagResponse({'headers': None}, '*', '[]')
+  second = app.etagResponse({'headers': {'if-none-match': first['headers']['ETag']}}, '*', '[{}]')
+  assert second['statusCode'] == 200
+  assert second['headers']['ETag'] != first['headers']['ETag']
@@ -0,0 +1,79 @@
+import json
+
+from manage_events import app
+
+
+def stored_item():
+  return {
+    'event_id': {'S': 'e1'}, 'event_type': {'S': 'GameKnight'}, 'date': {'S': '2026-10-20T18:00:00-06:00'},
+    'format': {'S': 'Reserved'}, 'total_spots': {'N': '6'}, 'bgg_id': {'N': '13'},
+    'attending': {'SS': ['placeholder', 'a']}, 'not_attending': {'SS': ['placeholder']}, 'player_pool': {'SS': ['placeholder', 'a', 'b']},
+    'finalScore': {'L': [{'M': {'place': {'N': '1'}, 'player': {'S': 'a'}}}]}, 'legacy_note': {'S': 'kept'},
+  }
+
+
+def test_from_ddb_returns_native_values():
+  event = app.Event.from_ddb(stored_item())
+  assert event['total_spots'] == 6 and isinstance(event['total_spots'], int)
+  assert event['attending'] == {'a'}
+  assert event['not_attending'] == set()
+  assert event['finalScore'] == [{'place': 1, 'player': 'a'}]
+  assert event['host'] == ''
+  assert event['legacy_note'] == 'kept'
+  assert 'host' not in app.Event.from_ddb({'event_id': {'S': 'e1'}}, projected=True)
+
+
+def test_to_ddb_round_trip():
+  item = app.Event.from_ddb(stored_item()).to_ddb()
+  assert set(item['attending']['SS']) == {'placeholder', 'a'}
+  assert item['not_attending'] == {'SS': ['placeholder']}
+  assert item['total_spots'] == {'N': '6'}
+  assert 'host' not in item
+  assert app.Event.from_ddb(item).to_api() == app.Event.from_ddb(stored_item()).to_api()
+
+
+def test_for_write_keeps_only_write_fields():
+  event = app.Event.for_write({
+    'event_id': 'e1', 'date': '2026-10-20T18:00:00-06:00', 'format': 'Reserved', 'host': 'h',
+    'attending': {'a'}, 'player_pool': {'a', 'b'}, 'reserved_event_type': 'spoofed', 'unknown': 1,
+  })
+  assert 'unknown' not in event
+  assert event['reserved_event_type'] == 'GameKnight'
+  assert event['organizer'] == '' and event['not_attending'] == set()
+
+
+def test_encoders_emit_json_native_values():
+  event = app.Event.from_ddb(stored_item())
+  event['player_pool_group'] = 'player'
+  assert json.loads(app.encodeEvents([event], fields={'event_id', 'player_pool'})) == [{'event_id': 'e1', 'player_pool': ['a', 'b']}]
+  assert 'player_pool_group' not in event.to_public()
+  assert json.dumps(event, default=app.ddb_default) == json.dumps(event.to_api())
+
+
+def test_final_score_is_decoded_on_access():
+  event = app.Event.from_ddb(stored_item())
+  assert event._finalScore_item is not None
+  assert event.to_ddb()['finalScore'] == stored_item()['finalScore']
+  assert event['finalScore'] == [{'place': 1, 'player': 'a'}]
+  assert event._finalScore_item is None
+
+
+def test_legacy_string_score_is_still_read():
+  event = app.Event.from_ddb({**stored_item(), 'finalScore': {'S': '[{"place": 1, "player": "a"}]'}})
+  assert event.has_legacy_score()
+  assert event['finalScore'] == [{'place': 1, 'player': 'a'}]
+  assert event.to_ddb()['finalScore'] == stored_item()['finalScore']
+
+
+def test_migration_stores_legacy_scores_natively(mocker):
+  legacy = app.Event.from_ddb({**stored_item(), 'finalScore': {'S': '[{"place": 1, "player": "a", "score": 9.5}]'}})
+  native = app.Event.from_ddb({**stored_item(), 'event_id': {'S': 'e2'}})
+  mocker.patch.object(app, 'scanEvents', return_value=[legacy, native])
+  apply = mocker.patch.object(app, 'applyEventUpdates')
+  mocker.patch.object(app, 'rebuildAttendance')
+  app.migrateEvents()
+  event_updates, current_events = apply.call_args.args[0], apply.call_args.kwargs['current_events']
+  assert event_updates['e1']['finalScore'] == [{'place': 1, 'player': 'a', 'score': 9.5}]
+  assert 'finalScore' not in event_updates.get('e2', {})
+  expression = app.eventUpdateExpression(event_updates['e1'], current=current_events['e1'])
+  assert expression['ExpressionAttributeValues'][':finalScore'] == [{'place': 1, 'player': 'a', 'score': app.Decimal('9.5')}]
@@ -0,0 +1,59 @@
+import pytest
+
+from manage_events import app
+
+
+class FakeDynamoDB:
+  def __init__(self, unprocessed_rounds=0):
+    self.unprocessed_rounds = unprocessed_rounds
+    self.requests = []
+
+  def batch_get_item(self, RequestItems):
+    self.requests.append(RequestItems)
+    request = RequestItems[app.env.TABLE_NAME]
+    keys = request['Keys']
+    if self.unprocessed_rounds:
+      self.unprocessed_rounds -= 1
+      processed, unprocessed = keys[:1], keys[1:]
+    else:
+      processed, unprocessed = keys, []
+    items = [
+      {'event_id': key['event_id'], 'attending': {'SS': ['placeholder', 'a']}, 'not_attending': {'SS': ['placeholder']}, 'total_spots': {'N': '8'}}
+      for key in processed if key['event_id']['S'] != 'missing'
+    ]
+    response = {'Responses': {app.env.TABLE_NAME: items}}
+    if unprocessed:
+      response['UnprocessedKeys'] = {app.env.TABLE_NAME: {**request, 'Keys': unprocessed}}
+    return response
+
+
+@pytest.fixture
+def ddb(mocker):
+  fake = FakeDynamoDB()
+  mocker.patch.object(app.boto3, 'client', return_value=fake)
+  mocker.patch.object(app.time, 'sleep')
+  return fake
+
+
+def test_keys_are_chunked_and_order_is_kept(ddb):
+  event_ids = [f'e{i}' for i in range(250)] + ['missing', 'e3']
+  events = app.getEventsByIds(event_ids)
+  assert [len(request[app.env.TABLE_NAME]['Keys']) for request in ddb.requests] == [100, 100, 51]
+  assert [event['event_id'] for event in events] == [f'e{i}' for i in range(250)]
+  assert events[0]['attending'] == {'a'}
+  assert events[0]['total_spots'] == 8 and isinstance(events[0]['total_spots'], int)
+
+
+def test_unprocessed_keys_are_retried(ddb):
+  ddb.unprocessed_rounds = 2
+  events = app.getEventsByIds(['e1', 'e2', 'e3'], fields={'game'})
+  assert [event['event_id'] for event in events] == ['e1', 'e2', 'e3']
+  assert len(ddb.requests) == 3
+  assert set(ddb.requests[-1][app.env.TABLE_NAME]['ExpressionAttributeNames'].values()) == {'event_id', 'game'}
+  assert app.time.sleep.call_count == 2
+
+
+def test_gives_up_after_max_attempts(ddb):
+  ddb.unprocessed_rounds = 10
+  with pytest.raises(Exception, match='unprocessed'):
+    app.getEventsByIds([f'e{i}' for i in range(10)], max_attempts=3)
@@ -0,0 +1,62 @@
+from manage_events import app
+
+
+class FakeClient:
+  def __init__(self, items, page_size):
+    self.items = items
+    self.page_size = page_size
+    self.calls = []
+
+  def query(self, **kwargs):
+    self.calls.append(kwargs)
+    start = 0
+    if 'ExclusiveStartKey' in kwargs:
+      start = next(i for i, item in enumerate(self.items) if item['event_id'] == kwargs['ExclusiveStartKey']['event_id']) + 1
+    size = min(kwargs.get('Limit', self.page_size), self.page_size)
+    page = [dict(item) for item in self.items[start:start + size]]
+    response = {'Items': page}
+    if start + size < len(self.items):
+      last = page[-1]
+      response['LastEvaluatedKey'] = {'event_id': last['event_id'], 'event_type': last['event_type'], 'date': last['date']}
+    return response
+
+
+def fake_events(count):
+  return [
+    {'event_id': {'S': str(i)}, 'event_type': {'S': 'GameKnight'}, 'date': {'S': f'2026-10-{i + 1:02d}'}, 'format': {'S': 'Open'},
+     'attending': {'SS': ['placeholder']}, 'not_attending': {'SS': ['placeholder']}, 'player_pool': {'SS': ['placeholder']}}
+    for i in range(count)
+  ]
+
+
+def test_all_pages_are_read_without_limit(mocker):
+  client = FakeClient(fake_events(5), page_size=2)
+  mocker.patch.object(app.boto3, 'client', return_value=client)
+  events = app.getEvents(scores=True)
+  assert [event['event_id'] for event in events] == ['0', '1', '2', '3', '4']
+  assert events[0]['attending'] == set()
+  assert client.calls[0]['Select'] == 'ALL_ATTRIBUTES'
+  assert client.calls[0]['ExpressionAttributeValues'][':v0'] == {'S': 'GameKnight'}
+
+
+def test_limit_returns_page_and_cursor(mocker):
+  client = FakeClient(fake_events(5), page_size=10)
+  mocker.patch.object(app.boto3, 'client', return_value=client)
+  events, cursor = app.getEvents(limit=3, fields={'game', 'player_pool'})
+  assert [event['event_id'] for event in events] == ['0', '1', '2']
+  names = [name for placeholder, name in client.calls[0]['ExpressionAttributeNames'].items() if placeholder.startswith('#f')]
+  assert set(names) == {'event_id', 'event_type', 'date', 'game', 'player_pool', 'player_pool_group'}
+  assert 'Select' not in client.calls[0]
+
+  events, cursor = app.getEvents(limit=3, cursor=cursor)
+  assert [event['event_id'] for event in events] == ['3', '4']
+  assert cursor is None
+
+
+def test_scores_are_not_read_by_default(mocker):
+  client = FakeClient(fake_events(2), page_size=10)
+  mocker.patch.object(app.boto3, 'client', return_value=client)
+  events = app.getEvents()
+  names = client.calls[0]['ExpressionAttributeNames'].values()
+  assert 'finalScore' not in names and 'game' in names
+  assert events[0]['host'] == ''
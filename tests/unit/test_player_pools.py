@@ -0,0 +1,145 @@
+import random
+from copy import deepcopy
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from manage_events import app
+
+
+def random_state(rng):
+  users = [f'user{i}' for i in range(rng.randint(4, 14))]
+  players = set(rng.sample(users, rng.randint(2, len(users))))
+  organizers = set(rng.sample(users, rng.randint(0, len(users) // 2)))
+  now = datetime.now(ZoneInfo('America/Denver'))
+  events = []
+  for i in range(rng.randint(1, 12)):
+    date = now + timedelta(days=rng.randint(1, 40), hours=rng.randint(0, 23))
+    attending = set(rng.sample(users, rng.randint(0, min(5, len(users)))))
+    events.append({
+      'event_id': f'event{i}',
+      'date': date.replace(microsecond=0).isoformat(),
+      'format': rng.choice(['Reserved', 'Reserved', 'Reserved', 'Open', 'Private']),
+      'open_rsvp_eligibility': rng.random() < 0.15,
+      'host': rng.choice(users),
+      'organizer': rng.choice([''] + sorted(attending)),
+      'attending': attending,
+      'player_pool': set(),
+      'organizer_pool': set(),
+    })
+  events.sort(key=lambda event: event['date'])
+  return users, players, organizers, events
+
+
+def apply_updates(events, event_updates):
+  for event in events:
+    for key, value in event_updates.get(event['event_id'], {}).items():
+      # An empty organizer_pool is stored by removing the attribute (see eventUpdateExpression)
+      if value is None or (key == 'organizer_pool' and not value):
+        event.pop(key, None)
+      else:
+        event[key] = deepcopy(value)
+
+
+def settle(events, players, organizers):
+  # Bring the stored state to a fixed point of the full recompute
+  for _ in range(10):
+    event_updates = app.computePlayerPoolUpdates(deepcopy(events), players, organizers)
+    if not event_updates:
+      return
+    apply_updates(events, event_updates)
+  pytest.fail('full recompute did not settle')
+
+
+def random_delta(rng, users, players, organizers, events):
+  kind = rng.choice(['rsvp', 'rsvp', 'rsvp', 'group', 'event'])
+  event = rng.choice(events)
+  if kind == 'rsvp':
+    user = rng.choice(users)
+    event['attending'] ^= {user}
+    return {event['event_id']}, {user}
+  if kind == 'group':
+    user = rng.choice(users)
+    rng.choice([players, organizers]).symmetric_difference_update({user})
+    return set(), {user}
+  before = deepcopy(event)
+  event['format'] = rng.choice(['Reserved', 'Open', 'Private'])
+  event['host'] = rng.choice(users)
+  return {event['event_id']}, app.poolDeltaUsers(before, event)
+
+
+def final_state(events, event_updates):
+  events = deepcopy(events)
+  apply_updates(events, event_updates)
+  return {
+    event['event_id']: (
+      event['organizer'],
+      set(event['player_pool']), set(event.get('organizer_pool', set())),
+      event.get('player_pool_group'), event.get('organizer_pool_group'),
+    )
+    for event in events
+  }
+
+
+@pytest.mark.parametrize('seed', range(300))
+def test_incremental_matches_full_recompute(seed):
+  rng = random.Random(seed)
+  users, players, organizers, events = random_state(rng)
+  settle(events, players, organizers)
+  changed_event_ids, changed_users = random_delta(rng, users, players, organizers, events)
+
+  full = app.computePlayerPoolUpdates(deepcopy(events), players, organizers)
+  incremental = app.computePlayerPoolUpdates(
+    deepcopy(events), players, organizers,
+    changed_event_ids=changed_event_ids, changed_users=changed_users
+  )
+  assert final_state(events, incremental) == final_state(events, full)
+
+
+def test_no_delta_is_a_noop_on_settled_state():
+  rng = random.Random(1234)
+  users, players, organizers, events = random_state(rng)
+  settle(events, players, organizers)
+  assert app.computePlayerPoolUpdates(deepcopy(events), players, organizers, changed_event_ids=set(), changed_users=set()) == {}
+
+
+def test_open_events_carry_group_markers_not_rosters():
+  events = [{
+    'event_id': 'open', 'date': '2099-01-01T18:00:00-07:00', 'format': 'Open', 'host': 'a', 'organizer': '',
+    'attending': {'a'}, 'player_pool': {'a', 'b', 'c'}, 'organizer_pool': {'b'},
+  }]
+  event_updates = app.computePlayerPoolUpdates(events, {'a', 'b', 'c'}, {'b'})
+  assert event_updates == {'open': {
+    'player_pool_group': 'player', 'player_pool': set(),
+    'organizer_pool_group': 'organizer', 'organizer_pool': None,
+  }}
+  apply_updates(events, event_updates)
+
+  # Roster changes no longer touch the event
+  assert app.computePlayerPoolUpdates(deepcopy(events), {'a', 'b', 'c', 'd'}, {'b', 'd'}) == {}
+  assert app.resolvePoolGroups(events, {'Groups': {'player': ['a', 'd'], 'organizer': ['d']}})[0]['player_pool'] == {'a', 'd'}
+
+
+def test_rsvp_groups_come_from_the_cached_roster(mocker):
+  from boto3.dynamodb.conditions import ConditionExpressionBuilder
+  groups = {'Groups': {'player': ['a', 'b'], 'organizer': ['b'], 'admin': ['a', 'c']}}
+  mocker.patch.object(app, 'getJsonS3', return_value=groups)
+
+  def group_values(user_id):
+    condition = ConditionExpressionBuilder().build_expression(app.rsvpCondition(user_id))
+    return {value for value in condition.attribute_value_placeholders.values() if value in ['player', 'organizer', 'admin']}
+
+  assert group_values('a') == {'player'}
+  assert group_values('b') == {'player', 'organizer'}
+  # Not in an open pool group (whatever its token claims): only explicit pool membership counts
+  assert group_values('c') == set()
+
+
+def test_missing_organizer_pool_is_an_empty_pool():
+  events = [{
+    'event_id': 'reserved', 'date': '2099-01-01T18:00:00-07:00', 'format': 'Reserved', 'host': 'a', 'organizer': '',
+    'attending': {'a'}, 'player_pool': {'a', 'b'},
+  }]
+  assert app.computePlayerPoolUpdates(deepcopy(events), {'a', 'b'}, set()) == {}
+  assert app.computePlayerPoolUpdates(deepcopy(events), {'a', 'b'}, set(), changed_event_ids={'reserved'}, changed_users={'a'}) == {}
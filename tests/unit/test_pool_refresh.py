@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from manage_events import app
+
+TARGET_ARN = 'arn:aws:lambda:us-east-1:123456789012:function:manage_events_dev'
+
+
+class FakeScheduler:
+  def __init__(self, pending=None):
+    self.pending = pending
+    self.calls = []
+
+  def create_schedule(self, **params):
+    self.calls.append(('create', params))
+    if self.pending is not None:
+      raise Exception('An error occurred (ConflictException) when calling the CreateSchedule operation')
+    self.pending = params['ScheduleExpression']
+
+  def get_schedule(self, Name, GroupName):
+    self.calls.append(('get', Name))
+    if self.pending is None:
+      raise Exception('An error occurred (ResourceNotFoundException) when calling the GetSchedule operation')
+    return {'ScheduleExpression': self.pending}
+
+  def update_schedule(self, **params):
+    self.calls.append(('update', params))
+    self.pending = params['ScheduleExpression']
+
+
+def at(seconds):
+  return f"at({(datetime.now(ZoneInfo('America/Denver')) + timedelta(seconds=seconds)).isoformat()[:19]})"
+
+
+@pytest.fixture
+def coalesced(mocker):
+  mocker.patch.object(app.env, 'PUBLISH_DELAY', 60)
+  pools = mocker.patch.object(app, 'updatePlayerPools', return_value=set())
+  publish = mocker.patch.object(app, 'updatePublicEventsJson')
+  return pools, publish
+
+
+def test_burst_of_writes_arms_one_publish(coalesced, mocker):
+  scheduler = FakeScheduler()
+  mocker.patch.object(app.boto3, 'client', return_value=scheduler)
+  for _ in range(3):
+    app.refreshPoolsAndFeed(TARGET_ARN, changed_users={'a'})
+  assert [call[0] for call in scheduler.calls] == ['create', 'create', 'get', 'create', 'get']
+  params = scheduler.calls[0][1]
+  assert params['Name'] == 'events_publish' and params['GroupName'] == 'reserved_rsvp_refresh_dev'
+  assert params['Target']['Input'] == '{"action": "publishEvents"}'
+  pools, publish = coalesced
+  assert not publish.called
+
+
+def test_pools_are_updated_inline_even_when_the_publish_is_deferred(coalesced, mocker):
+  mocker.patch.object(app.boto3, 'client', return_value=FakeScheduler())
+  app.refreshPoolsAndFeed(TARGET_ARN, changed_event_ids={'e1'}, changed_users={'a'})
+  pools, publish = coalesced
+  pools.assert_called_once_with(changed_event_ids={'e1'}, changed_users={'a'})
+  assert not publish.called
+
+
+def test_publish_that_already_fired_is_rearmed(coalesced, mocker):
+  scheduler = FakeScheduler(pending=at(-5))
+  mocker.patch.object(app.boto3, 'client', return_value=scheduler)
+  app.refreshPoolsAndFeed(TARGET_ARN, changed_users={'a'})
+  assert [call[0] for call in scheduler.calls] == ['create', 'get', 'update']
+  assert scheduler.pending > at(30)
+
+
+def test_scheduler_failure_falls_back_to_inline(coalesced, mocker):
+  mocker.patch.object(app.boto3, 'client').return_value.create_schedule.side_effect = Exception('ThrottlingException')
+  app.refreshPoolsAndFeed(TARGET_ARN, changed_event_ids={'e1'}, changed_dates={'2026-10-20T18:00:00-06:00'})
+  pools, publish = coalesced
+  pools.assert_called_once_with(changed_event_ids={'e1'}, changed_users=None)
+  publish.assert_called_once_with(changed_dates={'2026-10-20T18:00:00-06:00'})
+
+
+def test_inline_without_delay(coalesced, mocker):
+  mocker.patch.object(app.env, 'PUBLISH_DELAY', 0)
+  client = mocker.patch.object(app.boto3, 'client')
+  pools, publish = coalesced
+  pools.return_value = {'2026-11-01T18:00:00-06:00'}
+  app.refreshPoolsAndFeed(TARGET_ARN, changed_users={'a'}, changed_dates={'2026-10-20T18:00:00-06:00'})
+  assert not client.called
+  publish.assert_called_once_with(changed_dates={'2026-10-20T18:00:00-06:00', '2026-11-01T18:00:00-06:00'})
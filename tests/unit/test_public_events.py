@@ -0,0 +1,99 @@
+import json
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from manage_events import app
+
+
+def month_offset(months):
+  today = datetime.now(ZoneInfo("America/Denver")).date().replace(day=15)
+  return (today + timedelta(days=31 * months)).isoformat()[:7]
+
+
+def make_events(*months):
+  events = []
+  for i, month in enumerate(months):
+    events.append(app.Event(event_id=str(i), date=f'{month}-20T18:00:00-06:00', format='Open'))
+  events.append(app.Event(event_id='private', date=f'{months[0]}-21T18:00:00-06:00', format='Private'))
+  return events
+
+
+def stored(fake, key):
+  return json.loads(fake.objects[(app.env.S3_BUCKET, key)]['Body'])
+
+
+def test_full_publish_writes_month_shards_and_manifest(publish_s3, mocker):
+  mocker.patch.object(app.env, 'PUBLIC_EVENTS_LEGACY', True)
+  this_month, next_month = month_offset(0), month_offset(1)
+  mocker.patch.object(app, 'getEvents', return_value=make_events(this_month, next_month))
+  app.updatePublicEventsJson()
+
+  manifest = stored(publish_s3, 'events/manifest.json')
+  assert sorted(manifest['shards']) == [this_month, next_month]
+  assert [event['event_id'] for event in stored(publish_s3, f'events/{this_month}.json')] == ['0']
+  assert manifest['shards'][next_month]['count'] == 1
+  assert [event['event_id'] for event in stored(publish_s3, 'events.json')] == ['0', '1']
+
+
+def test_changed_dates_only_republish_touched_months(publish_s3, mocker):
+  mocker.patch.object(app.env, 'PUBLIC_EVENTS_LEGACY', False)
+  this_month, next_month = month_offset(0), month_offset(1)
+  mocker.patch.object(app, 'getEvents', return_value=make_events(this_month, next_month))
+  app.updatePublicEventsJson()
+  put_count = len(publish_s3.puts)
+
+  get_events = mocker.patch.object(app, 'getEvents', return_value=[
+    app.Event(event_id='1', date=f'{next_month}-20T18:00:00-06:00', format='Open', attending={'a'}),
+  ])
+  app.updatePublicEventsJson(changed_dates={f'{next_month}-20T18:00:00-06:00'})
+  get_events.assert_called_once_with(month=next_month, resolve_pools=True, scores=True)
+  assert {put['Key'] for put in publish_s3.puts[put_count:]} == {
+    f'events/{next_month}.json', f'events/{next_month}.json.gz', 'events/manifest.json', 'events/manifest.json.gz'
+  }
+  manifest = stored(publish_s3, 'events/manifest.json')
+  assert sorted(manifest['shards']) == [this_month, next_month]
+  assert 'events.json' not in {key for bucket, key in publish_s3.objects}
+
+
+def test_manifest_merge_keeps_months_published_concurrently(publish_s3, mocker):
+  mocker.patch.object(app.env, 'PUBLIC_EVENTS_LEGACY', False)
+  this_month, next_month, later_month = month_offset(0), month_offset(1), month_offset(2)
+  mocker.patch.object(app, 'getEvents', return_value=make_events(this_month, next_month))
+  app.updatePublicEventsJson()
+
+  # Another container merges later_month between this container's read and write of the manifest
+  put_object = publish_s3.put_object
+  def racing_put(**kwargs):
+    if kwargs['Key'] == 'events/manifest.json' and not racing_put.raced:
+      racing_put.raced = True
+      other = stored(publish_s3, 'events/manifest.json')
+      other['shards'][later_month] = {'key': f'events/{later_month}.json', 'sha256': 'x', 'count': 1}
+      put_object(Bucket=app.env.S3_BUCKET, Key='events/manifest.json', Body=json.dumps(other).encode(), Metadata={})
+    return put_object(**kwargs)
+  racing_put.raced = False
+  publish_s3.put_object = racing_put
+
+  mocker.patch.object(app, 'getEvents', return_value=[
+    app.Event(event_id='1', date=f'{next_month}-20T18:00:00-06:00', format='Open', attending={'a'}),
+  ])
+  app.updatePublicEventsJson(changed_dates={f'{next_month}-20T18:00:00-06:00'})
+  manifest = stored(publish_s3, 'events/manifest.json')
+  assert sorted(manifest['shards']) == [this_month, next_month, later_month]
+  assert manifest['shards'][next_month]['sha256'] == publish_s3.objects[(app.env.S3_BUCKET, f'events/{next_month}.json')]['Metadata']['sha256']
+
+
+def test_legacy_feed_is_assembled_from_the_shards(publish_s3, mocker):
+  mocker.patch.object(app.env, 'PUBLIC_EVENTS_LEGACY', True)
+  this_month, next_month = month_offset(0), month_offset(1)
+  mocker.patch.object(app, 'getEvents', return_value=make_events(this_month, next_month))
+  app.updatePublicEventsJson()
+
+  get_events = mocker.patch.object(app, 'getEvents', return_value=[
+    app.Event(event_id='1', date=f'{next_month}-20T18:00:00-06:00', format='Open', attending={'a'}),
+  ])
+  app.updatePublicEventsJson(changed_dates={f'{next_month}-20T18:00:00-06:00'})
+  # Only the changed month is queried; the other month comes from its published shard
+  get_events.assert_called_once_with(month=next_month, resolve_pools=True, scores=True)
+  feed = stored(publish_s3, 'events.json')
+  assert [event['event_id'] for event in feed] == ['0', '1']
+  assert feed[1]['attending'] == ['a']
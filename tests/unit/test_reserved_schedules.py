@@ -0,0 +1,108 @@
+import json
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from manage_events import app
+
+TARGET_ARN = 'arn:aws:lambda:us-east-1:123456789012:function:manage_events_test'
+GROUP = f'reserved_rsvp_refresh_{app.env.MODE}'
+
+
+class FakeScheduler:
+  def __init__(self, names=()):
+    self.names = set(names)
+    self.created = []
+    self.deleted = []
+    self.list_calls = 0
+
+  def get_paginator(self, name):
+    assert name == 'list_schedules'
+    return self
+
+  def paginate(self, GroupName):
+    assert GroupName == GROUP
+    self.list_calls += 1
+    names = sorted(self.names)
+    return [{'Schedules': [{'Name': name} for name in names[i:i + 2]]} for i in range(0, len(names), 2)]
+
+  def create_schedule(self, **params):
+    self.created.append(params)
+    self.names.add(params['Name'])
+
+  def delete_schedule(self, Name, GroupName):
+    self.deleted.append(Name)
+    self.names.discard(Name)
+
+
+def reserved(event_id, days):
+  date = (datetime.now(ZoneInfo('America/Denver')) + timedelta(days=days)).replace(hour=18, minute=30, second=0, microsecond=0)
+  return {'event_id': event_id, 'format': 'Reserved', 'date': date.isoformat()}
+
+
+def names(event):
+  return set(app.desiredReservedSchedules(event, TARGET_ARN))
+
+
+@pytest.fixture
+def scheduler(mocker):
+  fake = FakeScheduler()
+  mocker.patch.object(app.boto3, 'client', return_value=fake)
+  return fake
+
+
+def test_names_encode_the_schedule_time():
+  event = reserved('e1', 20)
+  date = datetime.fromisoformat(event['date'])
+  assert f"event_start_e1_{date.strftime('%Y%m%dT%H%M')}" in names(event)
+  assert all(len(name) <= 64 for name in names(reserved('0f8e4c2a-9a51-4f5e-8d7c-1b2a3c4d5e6f', 20)))
+
+
+def test_in_sync_costs_only_the_listing(scheduler):
+  events = [reserved('e1', 20), reserved('e2', 30)]
+  scheduler.names = names(events[0]) | names(events[1]) | {'events_publish'}
+  assert app.reconcileReservedSchedules(events, TARGET_ARN) == {'created': [], 'deleted': []}
+  assert scheduler.list_calls == 1
+  assert scheduler.created == [] and scheduler.deleted == []
+
+
+def test_full_reconcile_applies_only_the_differences(scheduler):
+  kept, moved, new = reserved('e1', 20), reserved('e2', 30), reserved('e3', 40)
+  stale = names(reserved('e2', 25))
+  scheduler.names = names(kept) | stale | {'event_start_gone_20200101T1830', 'sunday_prior_legacy', 'events_publish'}
+  result = app.reconcileReservedSchedules([kept, moved, new], TARGET_ARN)
+  assert set(result['created']) == names(moved) | names(new)
+  assert set(result['deleted']) == stale | {'event_start_gone_20200101T1830', 'sunday_prior_legacy'}
+  assert scheduler.names == names(kept) | names(moved) | names(new) | {'events_publish'}
+  assert all(params['GroupName'] == GROUP and params['ActionAfterCompletion'] == 'DELETE' for params in scheduler.created)
+
+
+def test_single_event_leaves_other_events_alone(scheduler):
+  other = names(reserved('e2', 30))
+  scheduler.names = set(other)
+  app.process_reserved_event_scheduled_tasks(reserved('e1', 20), 'create', TARGET_ARN)
+  assert scheduler.names == other | names(reserved('e1', 20))
+  app.process_reserved_event_scheduled_tasks(reserved('e1', 20), 'delete', TARGET_ARN)
+  assert scheduler.names == other
+
+
+def test_past_times_are_not_scheduled():
+  assert {name.split('_e1_')[0] for name in names(reserved('e1', 20))} == {'sunday_prior', 'event_start'}
+  assert names(reserved('e1', -1)) == set()
+
+
+def test_full_reconcile_keeps_open_eligibility_reserved_events(scheduler, mocker):
+  gated, open_eligibility, open_event = reserved('e1', 20), {**reserved('e2', 30), 'open_rsvp_eligibility': True}, {**reserved('e3', 40), 'format': 'Open'}
+  # The per-event path created schedules for both Reserved events
+  app.process_reserved_event_scheduled_tasks(gated, 'create', TARGET_ARN)
+  app.process_reserved_event_scheduled_tasks(open_eligibility, 'create', TARGET_ARN)
+  app.process_reserved_event_scheduled_tasks(open_event, 'create', TARGET_ARN)
+  assert scheduler.names == names(gated) | names(open_eligibility)
+
+  get_events = mocker.patch.object(app, 'getEvents', return_value=[app.Event(**event) for event in [gated, open_eligibility, open_event]])
+  context = mocker.Mock(invoked_function_arn=TARGET_ARN)
+  response = app.lambda_handler({'action': 'ProcessAllReservedSchedules'}, context)
+  assert json.loads(response['body']) == {'created': [], 'deleted': []}
+  assert not get_events.call_args.kwargs.get('reserved_only')
+  assert scheduler.names == names(gated) | names(open_eligibility)
@@ -0,0 +1,75 @@
+from unittest.mock import MagicMock
+
+import botocore
+import pytest
+
+from manage_events import app
+
+
+def conflict(scheduled_at):
+  return botocore.exceptions.ClientError({
+    'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'The conditional request failed'},
+    'Item': {'lock_id': {'S': 'rsvp_alerts'}, 'scheduled_at': {'S': scheduled_at}},
+  }, 'PutItem')
+
+
+@pytest.fixture
+def clients(mocker):
+  app._rsvp_alert_task.update(at=None, target=None)
+  ddb = MagicMock()
+  scheduler = MagicMock()
+  scheduler.get_schedule.return_value = {'Target': {'Arn': 'arn:rsvp_alerts'}, 'ScheduleExpression': 'at(2000-01-01T00:00:00)'}
+  mocker.patch.object(app.boto3, 'client', side_effect=lambda name, **kwargs: {'dynamodb': ddb, 'scheduler': scheduler}[name])
+  yield ddb, scheduler
+  app._rsvp_alert_task.update(at=None, target=None)
+
+
+def test_first_rsvp_claims_the_window_and_schedules(clients):
+  ddb, scheduler = clients
+  app.process_rsvp_alert_task()
+  assert ddb.put_item.call_args.kwargs['TableName'] == app.env.LOCKS_TABLE_NAME
+  at = ddb.put_item.call_args.kwargs['Item']['scheduled_at']['S']
+  assert scheduler.update_schedule.call_args.kwargs['ScheduleExpression'] == f'at({at})'
+  assert scheduler.update_schedule.call_args.kwargs['Target'] == {'Arn': 'arn:rsvp_alerts'}
+  assert app._rsvp_alert_task['at'] == at
+
+
+def test_pending_window_skips_every_api_call(clients):
+  ddb, scheduler = clients
+  app.process_rsvp_alert_task()
+  app.process_rsvp_alert_task()
+  app.process_rsvp_alert_task()
+  assert ddb.put_item.call_count == 1
+  assert scheduler.update_schedule.call_count == 1
+
+
+def test_window_claimed_by_another_container(clients):
+  ddb, scheduler = clients
+  ddb.put_item.side_effect = conflict('2999-01-01T00:00:00')
+  app.process_rsvp_alert_task()
+  assert not scheduler.update_schedule.called
+  # The other container's window isn't cached: it may still release it
+  assert app._rsvp_alert_task['at'] is None
+  ddb.put_item.side_effect = None
+  app.process_rsvp_alert_task()
+  assert ddb.put_item.call_count == 2
+  assert scheduler.update_schedule.call_count == 1
+
+
+def test_target_is_fetched_once_per_container(clients):
+  ddb, scheduler = clients
+  app.process_rsvp_alert_task()
+  app._rsvp_alert_task['at'] = '2000-01-01T00:00:00'
+  app.process_rsvp_alert_task()
+  assert scheduler.get_schedule.call_count == 1
+  assert scheduler.update_schedule.call_count == 2
+
+
+def test_failed_schedule_releases_the_window(clients):
+  ddb, scheduler = clients
+  scheduler.update_schedule.side_effect = Exception('throttled')
+  with pytest.raises(Exception, match='throttled'):
+    app.process_rsvp_alert_task()
+  at = ddb.put_item.call_args.kwargs['Item']['scheduled_at']['S']
+  assert ddb.delete_item.call_args.kwargs['ExpressionAttributeValues'] == {':at': {'S': at}}
+  assert app._rsvp_alert_task == {'at': None, 'target': None}
@@ -0,0 +1,63 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from manage_events import app
+
+
+def rsvp(user_id, action='add', rsvp='attending', event_id='e1'):
+  return {'log_type': 'rsvp', 'auth_sub': 'host', 'auth_type': 'host', 'event_id': event_id, 'date': '2024-05-01T18:00:00-05:00',
+          'user_id': user_id, 'action': action, 'rsvp': rsvp}
+
+
+@pytest.fixture
+def sqs(mocker):
+  sqs = MagicMock()
+  sqs.send_message_batch.side_effect = lambda QueueUrl, Entries: {'Successful': [{'Id': e['Id']} for e in Entries]}
+  mocker.patch.object(app.boto3, 'client', return_value=sqs)
+  return sqs
+
+
+def test_flush_batches_by_ten(sqs):
+  outbox = app.RsvpOutbox('req-1', [rsvp(f'u{n}') for n in range(23)])
+  assert outbox.flush() == 23
+  assert [len(call.kwargs['Entries']) for call in sqs.send_message_batch.call_args_list] == [10, 10, 3]
+  bodies = [json.loads(e['MessageBody']) for call in sqs.send_message_batch.call_args_list for e in call.kwargs['Entries']]
+  assert [body['user_id'] for body in bodies] == [f'u{n}' for n in range(23)]
+  assert all('timestamp' in body for body in bodies)
+  assert len(outbox) == 0
+
+
+def test_dedup_ids_are_deterministic():
+  first = app.RsvpOutbox('req-1')
+  again = app.RsvpOutbox('req-1')
+  assert first.dedupId(rsvp('a')) == again.dedupId(rsvp('a'))
+  assert first.dedupId(rsvp('a')) != first.dedupId(rsvp('b'))
+  assert first.dedupId(rsvp('a')) != first.dedupId(rsvp('a', action='delete'))
+  assert first.dedupId(rsvp('a')) != app.RsvpOutbox('req-2').dedupId(rsvp('a'))
+
+
+def test_failed_entries_are_resent_with_the_same_dedup_id(sqs):
+  responses = iter([
+    {'Successful': [{'Id': '0'}], 'Failed': [{'Id': '1', 'SenderFault': False, 'Code': 'InternalError'}]},
+    {'Successful': [{'Id': '1'}]},
+  ])
+  sqs.send_message_batch.side_effect = lambda QueueUrl, Entries: next(responses)
+  outbox = app.RsvpOutbox('req-1', [rsvp('a'), rsvp('b')])
+  assert outbox.flush() == 2
+  first, retry = sqs.send_message_batch.call_args_list
+  assert retry.kwargs['Entries'] == [first.kwargs['Entries'][1]]
+
+
+def test_sender_faults_are_raised(sqs):
+  sqs.send_message_batch.side_effect = lambda QueueUrl, Entries: {'Failed': [{'Id': '0', 'SenderFault': True, 'Code': 'InvalidParameterValue'}]}
+  with pytest.raises(Exception, match='rejected'):
+    app.RsvpOutbox('req-1', [rsvp('a')]).flush()
+  assert sqs.send_message_batch.call_count == 1
+
+
+def test_message_group_per_event(sqs):
+  app.RsvpOutbox('req-1', [rsvp('a', event_id='e1'), rsvp('a', event_id='e2'), rsvp('b', event_id='e1')]).flush()
+  entries = sqs.send_message_batch.call_args.kwargs['Entries']
+  assert [e['MessageGroupId'] for e in entries] == ['e1', 'e2', 'e1']
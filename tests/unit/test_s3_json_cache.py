@@ -0,0 +1,103 @@
+import hashlib
+import io
+import json
+
+import botocore
+import pytest
+
+from manage_events import app
+
+
+class FakeS3:
+  def __init__(self, document, etag='"v1"'):
+    self.document = document
+    self.etag = etag
+    self.calls = []
+
+  def get_object(self, **kwargs):
+    self.calls.append(kwargs)
+    if kwargs.get('IfNoneMatch') == self.etag:
+      raise botocore.exceptions.ClientError({'Error': {'Code': '304', 'Message': 'Not Modified'}}, 'GetObject')
+    return {'Body': io.BytesIO(json.dumps(self.document).encode('utf-8')), 'ETag': self.etag}
+
+
+@pytest.fixture
+def s3(mocker):
+  app._s3_json_cache.clear()
+  fake = FakeS3({'Groups': {'player': ['a']}})
+  mocker.patch.object(app.boto3, 'client', return_value=fake)
+  clock = mocker.patch.object(app.time, 'monotonic', return_value=100.0)
+  yield fake, clock
+  app._s3_json_cache.clear()
+
+
+def test_fresh_entry_skips_s3(s3):
+  fake, clock = s3
+  assert app.getJsonS3('bucket', 'players_groups.json') == {'Groups': {'player': ['a']}}
+  clock.return_value += app.S3_JSON_CACHE_TTL - 1
+  assert app.getJsonS3('bucket', 'players_groups.json', copy=False) == {'Groups': {'player': ['a']}}
+  assert len(fake.calls) == 1
+
+
+def test_stale_entry_is_revalidated_with_etag(s3):
+  fake, clock = s3
+  app.getJsonS3('bucket', 'players_groups.json')
+  clock.return_value += app.S3_JSON_CACHE_TTL
+  assert app.getJsonS3('bucket', 'players_groups.json') == {'Groups': {'player': ['a']}}
+  assert fake.calls[-1]['IfNoneMatch'] == '"v1"'
+
+  fake.document, fake.etag = {'Groups': {'player': ['a', 'b']}}, '"v2"'
+  clock.return_value += app.S3_JSON_CACHE_TTL
+  assert app.getJsonS3('bucket', 'players_groups.json') == {'Groups': {'player': ['a', 'b']}}
+
+
+def test_copies_do_not_leak_into_cache(s3):
+  user_dict = app.getJsonS3('bucket', 'players_groups.json')
+  user_dict['Groups']['player'].append('z')
+  assert app.getJsonS3('bucket', 'players_groups.json') == {'Groups': {'player': ['a']}}
+
+
+def test_write_through_replaces_entry(s3):
+  fake, clock = s3
+  app.getJsonS3('bucket', 'players_groups.json')
+  app.cacheJsonS3('bucket', 'players_groups.json', json.dumps({'Groups': {}}), {'ETag': '"v3"'})
+  assert app.getJsonS3('bucket', 'players_groups.json') == {'Groups': {}}
+  assert len(fake.calls) == 1
+
+
+def test_publish_skips_unchanged_content(publish_s3):
+  events = [{'event_id': '1', 'attending': {'b', 'a', 'c'}}]
+  assert app.publishJsonS3((app.env.BACKEND_BUCKET, 'events.json', events)) == {(app.env.BACKEND_BUCKET, 'events.json'): True}
+  body = publish_s3.puts[0]['Body']
+  assert json.loads(body) == [{'event_id': '1', 'attending': ['a', 'b', 'c']}]
+  assert b' ' not in body
+
+  # Same content (sets in any order) is not uploaded again, even from a cold container
+  app._s3_published.clear()
+  assert app.publishJsonS3((app.env.BACKEND_BUCKET, 'events.json', [{'event_id': '1', 'attending': {'c', 'a', 'b'}}])) == {(app.env.BACKEND_BUCKET, 'events.json'): False}
+  assert len(publish_s3.puts) == 1
+  assert app.getJsonS3(app.env.BACKEND_BUCKET, 'events.json') == [{'event_id': '1', 'attending': ['a', 'b', 'c']}]
+
+
+def test_publish_rechecks_content_another_container_replaced(publish_s3):
+  key = (app.env.BACKEND_BUCKET, 'players_groups.json')
+  assert app.publishJsonS3((*key, {'Groups': {'x': []}}))[key]
+  # Another container publishes different content
+  other = app.encodeJsonArtifact({'Groups': {'y': []}})
+  publish_s3.objects[key] = {'Body': other, 'Metadata': {'sha256': hashlib.sha256(other).hexdigest()}}
+  # Publishing the first content again must not be skipped on this container's memory of it
+  assert app.publishJsonS3((*key, {'Groups': {'x': []}}))[key]
+  assert json.loads(publish_s3.objects[key]['Body']) == {'Groups': {'x': []}}
+
+
+def test_public_artifacts_get_precompressed_copies(publish_s3):
+  import gzip
+  app.publishJsonS3(
+    (app.env.S3_BUCKET, 'players_groups.json', {'Groups': {'player': ['a']}}),
+    (app.env.BACKEND_BUCKET, 'players_groups.json', {'Groups': {'player': ['a']}, 'Users': {}}),
+  )
+  public_keys = {put['Key']: put for put in publish_s3.puts if put['Bucket'] == app.env.S3_BUCKET}
+  backend_keys = [put['Key'] for put in publish_s3.puts if put['Bucket'] == app.env.BACKEND_BUCKET]
+  assert backend_keys == ['players_groups.json']
+  assert public_keys['players_groups.json.gz']['ContentEncoding'] == 'gzip'
+  assert gzip.decompress(public_keys['players_groups.json.gz']['Body']) == public_keys['players_groups.json']['Body']
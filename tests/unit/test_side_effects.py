@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+from manage_events import app
+
+
+def test_side_effects_run_concurrently():
+  barrier = threading.Barrier(3, timeout=2)
+  results = app.runSideEffects({name: (lambda name=name: (barrier.wait(), name)[1]) for name in ['a', 'b', 'c']})
+  assert results == {'a': 'a', 'b': 'b', 'c': 'c'}
+
+
+def test_errors_are_aggregated():
+  def fail(message):
+    raise Exception(message)
+  with pytest.raises(app.SideEffectError) as excinfo:
+    app.runSideEffects({'ok': lambda: 1, 'sqs': lambda: fail('sqs down'), 'schedule': lambda: fail('throttled')})
+  assert set(excinfo.value.errors) == {'sqs', 'schedule'}
+  assert excinfo.value.results == {'ok': 1}
+
+
+def test_optional_failures_and_timeouts_are_only_logged():
+  release = threading.Event()
+  start = time.monotonic()
+  results = app.runSideEffects({
+    'pools_and_feed': lambda: 'done',
+    'bgg_pic': (lambda: release.wait(5), 0.1),
+  }, required={'pools_and_feed'})
+  release.set()
+  assert results == {'pools_and_feed': 'done'}
+  assert time.monotonic() - start < 2
+
+
+def test_required_tasks_are_waited_for_past_their_timeout(mocker):
+  context = mocker.Mock(get_remaining_time_in_millis=lambda: 30000)
+  results = app.runSideEffects({'slow': (lambda: time.sleep(0.3) or 'done', 0.1)}, context=context)
+  assert results == {'slow': 'done'}
+
+
+def test_required_timeout_at_the_function_deadline_raises(mocker):
+  mocker.patch.object(app, 'SIDE_EFFECT_DEADLINE_MARGIN', 0)
+  context = mocker.Mock(get_remaining_time_in_millis=lambda: 100)
+  release = threading.Event()
+  start = time.monotonic()
+  with pytest.raises(app.SideEffectError) as excinfo:
+    app.runSideEffects({'slow': lambda: release.wait(5)}, context=context)
+  release.set()
+  assert isinstance(excinfo.value.errors['slow'], TimeoutError)
+  assert time.monotonic() - start < 2
+
+
+def test_each_worker_creates_clients_from_its_own_session():
+  barrier = threading.Barrier(2, timeout=2)
+  def session():
+    barrier.wait()
+    return app.boto3.DEFAULT_SESSION.session(), app.boto3.DEFAULT_SESSION.session()
+  results = app.runSideEffects({'a': session, 'b': session})
+  (a, a_again), (b, _) = results['a'], results['b']
+  assert isinstance(app.boto3.DEFAULT_SESSION, app.ThreadSessions)
+  assert a is a_again and a is not b
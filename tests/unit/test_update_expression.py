@@ -0,0 +1,86 @@
+from manage_events import app
+
+
+def test_set_members_are_added_or_deleted_not_rewritten():
+  current = {'player_pool': {'a', 'b', 'c'}, 'organizer_pool': {'x', 'y'}, 'game': 'Catan'}
+  expression = app.eventUpdateExpression(
+    {'player_pool': {'a', 'b', 'c', 'd'}, 'organizer_pool': {'x'}, 'game': 'Catan'},
+    current=current
+  )
+  assert expression['UpdateExpression'] == 'ADD #player_pool :player_pool DELETE #organizer_pool :organizer_pool'
+  assert expression['ExpressionAttributeValues'] == {':player_pool': {'d'}, ':organizer_pool': {'y'}}
+  assert expression['ExpressionAttributeNames'] == {'#player_pool': 'player_pool', '#organizer_pool': 'organizer_pool'}
+
+
+def test_set_gaining_and_losing_members_falls_back_to_set():
+  expression = app.eventUpdateExpression({'player_pool': ['a', 'd']}, current={'player_pool': {'a', 'b'}})
+  assert expression['UpdateExpression'] == 'SET #player_pool = :player_pool'
+  assert expression['ExpressionAttributeValues'] == {':player_pool': {'a', 'd', 'placeholder'}}
+
+
+def test_only_changed_scalars_are_set():
+  expression = app.eventUpdateExpression(
+    {'organizer': 'x', 'game': 'Catan'},
+    current={'organizer': '', 'game': 'Catan'}
+  )
+  assert expression['UpdateExpression'] == 'SET #organizer = :organizer'
+  assert app.eventUpdateExpression({'game': 'Catan'}, current={'game': 'Catan'}) is None
+
+
+def test_placeholder_only_difference_is_not_written():
+  assert app.eventUpdateExpression({'attending': {'a'}}, current={'attending': {'a', 'placeholder'}}) is None
+
+
+def test_empty_and_removed_attributes():
+  expression = app.eventUpdateExpression({'organizer_pool': set(), 'tbd_pic': None})
+  assert expression['UpdateExpression'] == 'REMOVE #organizer_pool, #tbd_pic'
+  assert 'ExpressionAttributeValues' not in expression
+
+
+def test_rsvp_deltas_are_conditioned_on_their_members():
+  current = {'attending': {'a', 'b'}, 'not_attending': {'c'}}
+  expression = app.eventUpdateExpression({'attending': {'a', 'b', 'c', 'd'}, 'not_attending': set()}, current=current, conditioned=True)
+  assert expression['UpdateExpression'] == 'ADD #attending :attending DELETE #not_attending :not_attending'
+  condition = expression['ConditionExpression']
+  for placeholder, value in sorted(expression['ExpressionAttributeValues'].items(), reverse=True):
+    if isinstance(value, str): condition = condition.replace(placeholder, value)
+  # Added members aren't attending yet, d isn't declined either, and c is still declined
+  assert sorted(condition.split(' AND ')) == [
+    'NOT contains(#attending, c)', 'NOT contains(#attending, d)', 'NOT contains(#not_attending, d)', 'contains(#not_attending, c)',
+  ]
+  assert 'ConditionExpression' not in app.eventUpdateExpression({'attending': {'a', 'b', 'd'}}, current=current)
+
+
+def test_rsvp_set_rewrite_requires_the_same_members():
+  expression = app.eventUpdateExpression({'attending': {'a', 'd'}}, current={'attending': {'a', 'b'}, 'not_attending': set()}, conditioned=True)
+  assert expression['UpdateExpression'] == 'SET #attending = :attending'
+  assert 'size(#attending) <= :attending_size' in expression['ConditionExpression']
+  assert expression['ExpressionAttributeValues'][':attending_size'] == 3
+  assert expression['ConditionExpression'].count('contains(#attending') == 3
+
+
+def test_concurrent_rsvp_is_kept_on_retry(mocker):
+  import botocore
+  table = mocker.MagicMock()
+  responses = iter([
+    botocore.exceptions.ClientError({'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'failed'}}, 'UpdateItem'),
+    {'Attributes': {'event_id': 'e1', 'attending': {'a', 'x', 'placeholder'}, 'not_attending': {'placeholder'}}},
+  ])
+
+  def update_item(**kwargs):
+    response = next(responses)
+    if isinstance(response, Exception): raise response
+    return response
+  table.update_item.side_effect = update_item
+  mocker.patch.object(app.boto3, 'resource').return_value.Table.return_value = table
+  # x RSVPed between the host's read and write
+  mocker.patch.object(app, 'getEvent', return_value={'event_id': 'e1', 'attending': {'a', 'x'}, 'not_attending': set()})
+  sync = mocker.patch.object(app, 'syncAttendance')
+
+  app.updateEvent('e1', {'attending': {'a', 'h'}}, current={'event_id': 'e1', 'attending': {'a'}, 'not_attending': set()})
+  first, retry = table.update_item.call_args_list
+  assert first.kwargs['UpdateExpression'] == 'ADD #attending :attending'
+  # The retry adds h again rather than rewriting the set without x
+  assert retry.kwargs['UpdateExpression'] == 'ADD #attending :attending'
+  assert retry.kwargs['ExpressionAttributeValues'][':attending'] == {'h'}
+  assert set(sync.call_args.kwargs['current']['attending']) == {'a', 'x', 'h'}